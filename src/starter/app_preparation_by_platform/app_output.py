@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""The output of the started app.
+
+- inherit: the app writes to the Starter's stdout/stderr directly
+- log: the output is streamed to a rotating log file of the app
+- ring: the last N KiB of the output are kept in memory(reported if the
+  app fails)
+
+The pipe(stdout and stderr merged) is drained by a reader thread in
+bounded chunks, so the app never blocks on a full pipe and the memory
+stays bounded no matter how much the app writes.
+"""
+
+import logging
+import logging.handlers
+import threading
+from collections import deque
+from pathlib import Path
+from subprocess import PIPE, STDOUT
+
+__all__ = ['AppOutput', 'OUTPUT_MODES']
+
+OUTPUT_INHERIT = "inherit"
+OUTPUT_LOG = "log"
+OUTPUT_RING = "ring"
+OUTPUT_MODES = [OUTPUT_INHERIT, OUTPUT_LOG, OUTPUT_RING]
+# The size of a single read from the pipe
+CHUNK_SIZE = 8192
+# The size of the ring buffer
+RING_SIZE = 64 * 1024
+# The rotation of the log file
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+LOG_SUFFIX = ".log"
+
+logger = logging.getLogger(__name__)
+
+
+class AppOutput():
+    """Handles the output of the single app process."""
+    def __init__(self, /, **kwargs):
+        self.mode = kwargs.get("mode", None) or OUTPUT_RING
+        if self.mode not in OUTPUT_MODES:
+            logger.warning("Unknown app output mode '%s', using '%s'.",
+                           self.mode, OUTPUT_RING)
+            self.mode = OUTPUT_RING
+        # The folder of the log files(the 'log' mode)
+        self.logs_folder = kwargs.get("logs_folder", None)
+        self.name = kwargs.get("name", None) or "app"
+        self.ring_size = kwargs.get("ring_size", None) or RING_SIZE
+        self.ring = deque()
+        self.ring_bytes = 0
+        self.log_handler = None
+        self.reader = None
+        if self.mode == OUTPUT_LOG and not self.logs_folder:
+            logger.warning("No folder for the app logs, using '%s'.",
+                           OUTPUT_RING)
+            self.mode = OUTPUT_RING
+
+    def get_popen_streams(self) -> dict:
+        """Get the stdout/stderr arguments of the Popen."""
+        if self.mode == OUTPUT_INHERIT:
+            return {"stdout": None, "stderr": None}
+        return {"stdout": PIPE, "stderr": STDOUT}
+
+    def get_log_file(self) -> str | None:
+        """Returns the log file of the app(the 'log' mode)."""
+        if self.mode == OUTPUT_LOG:
+            return str(Path(self.logs_folder).joinpath(
+                self.name + LOG_SUFFIX))
+        return None
+
+    def attach(self, process):
+        """Start draining the output of the started process.
+
+        Args:
+        process = the Popen instance
+        """
+        if self.mode == OUTPUT_INHERIT or process.stdout is None:
+            return
+        if self.mode == OUTPUT_LOG:
+            Path(self.logs_folder).mkdir(parents=True, exist_ok=True)
+            self.log_handler = logging.handlers.RotatingFileHandler(
+                self.get_log_file(), maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+        self.reader = threading.Thread(
+            target=self.read_output, args=(process.stdout,), daemon=True)
+        self.reader.start()
+
+    def read_output(self, stream):
+        """Read the pipe in bounded chunks until EOF."""
+        try:
+            for chunk in iter(lambda: stream.readline(CHUNK_SIZE), b""):
+                if self.log_handler:
+                    self.write_log(chunk)
+                else:
+                    self.write_ring(chunk)
+        except Exception as e:
+            logger.error("Reading the output of the app failed(%s).", e)
+        finally:
+            if self.log_handler:
+                self.log_handler.close()
+
+    def write_log(self, chunk: bytes):
+        """Write the chunk to the rotating log file."""
+        record = logging.LogRecord(
+            self.name, logging.INFO, "", 0,
+            chunk.decode("utf-8", errors="replace").rstrip("\r\n"),
+            None, None)
+        self.log_handler.emit(record)
+
+    def write_ring(self, chunk: bytes):
+        """Keep the chunk, drop the oldest ones over the size."""
+        self.ring.append(chunk)
+        self.ring_bytes += len(chunk)
+        while self.ring_bytes > self.ring_size and len(self.ring) > 1:
+            self.ring_bytes -= len(self.ring.popleft())
+
+    def wait(self, timeout: float | None = None):
+        """Wait until the output is drained."""
+        if self.reader:
+            self.reader.join(timeout)
+
+    def get_tail(self) -> str:
+        """Get the last output of the app(the 'ring' mode)."""
+        return b"".join(self.ring)[-self.ring_size:].decode(
+            "utf-8", errors="replace")
+
+    def describe(self) -> str:
+        """Describe where the output is(for the failure report)."""
+        if self.mode == OUTPUT_LOG:
+            return "see %s" % self.get_log_file()
+        if self.mode == OUTPUT_RING:
+            return self.get_tail()
+        return "see the output above"
@@ -2,39 +2,335 @@
 """Common methods."""
 
 import logging
+import os
+import shutil
+import traceback
+from pathlib import Path
 from subprocess import PIPE, Popen
 
+from starter.app_preparation_by_platform.app_output import AppOutput
+from starter.app_preparation_by_platform.worker import MaginicianWorker
+from starter.tracing import trace
+from starter.venv_metadata import get_unsatisfied_requirements
+
 __all__ = ['CommonPreparationByPlatform']
 
 logger = logging.getLogger(__name__)
 
 
 class CommonPreparationByPlatform():
-    def __init__(self):
-        """Just pass."""
-        pass
+    def __init__(self, /, **kwargs):
+        """Set up the shared state of the platform handlers."""
+        # The decoded pip is cached here(offline bootstrap)
+        self.pip_cache_folder = kwargs.get("pip_cache_folder", None)
+        # Reinstall even the satisfied dependencies
+        self.force_reinstall = kwargs.get("force_reinstall", False)
+        # The wheels downloaded/built by pip are kept here
+        self.wheelhouse_folder = kwargs.get("wheelhouse_folder", None)
+        # The output of the app(inherit, log or ring) and its log folder
+        self.app_output = kwargs.get("app_output", None)
+        self.app_logs_folder = kwargs.get("app_logs_folder", None)
+        # The 'maginician' script copied to the venv
+        self.maginician = None
+        # One worker per venv for the whole preparation
+        self.worker = None
+        # Called once right before the app starts(e.g. switch the venv)
+        self.before_start = None
+        # The started commands(for the launch plan), whatever their exit
+        # code is
+        self.started_apps = []
+        # Called right before the Starter process is replaced by the app
+        self.before_exec = []
+        # Called right after the app process is spawned(e.g. store the
+        # launch plan of the long-running app)
+        self.after_start = []
+        # Set and the callbacks called if any app exited with an error
+        self.app_failed = False
+        self.after_failure = []
+
+    def prepare_maginician(self) -> Path | None:
+        """Copy the 'maginician' script to the venv.
+
+        Returns:
+        Path to the script in the venv or None
+        """
+        bin_path = self.context_handler.get_context().bin_path
+        maginician = "maginician.py"
+        future_maginician = Path(bin_path).joinpath(maginician)
+        if self.maginician == future_maginician and \
+                future_maginician.exists():
+            # Already copied
+            return future_maginician
+        try:
+            # Copy from the correct source --> IDE vs. PyInstaller
+            current_maginician = str(Path(self.cwd).parent.joinpath(
+                maginician))
+            if Path(bin_path).exists():
+                shutil.copy(current_maginician, bin_path)
+                logger.info("""Copying the 'maginician' script from
+                            '%s' was successfully
+                            completed.""", current_maginician)
+        except Exception:
+            # Try a different approach because of PyInstaller
+            current_maginician = str(Path(self.cwd).parents[1]
+                                     .joinpath(maginician))
+            if Path(bin_path).exists():
+                shutil.copy(current_maginician, bin_path)
+                logger.info("""Copying the 'maginician' script from
+                            '%s' was successfully
+                            completed.""", current_maginician)
+        if future_maginician.exists():
+            self.maginician = future_maginician
+            return future_maginician
+        logger.error("""The script '%s' does not exist.""",
+                     future_maginician)
+        return None
+
+    def run_maginician(self, names: list, uninstall: bool = False) -> bool:
+        """Install(or uninstall) the dependencies using the 'maginician'.
+
+        The worker process is used if possible, the one-off run of the
+        script otherwise(e.g. bootstrap of pip).
+
+        Args:
+        names (list)= the dependencies (e.g. wheel==0.0.0 or wheel)
+        uninstall (bool)= uninstall the dependencies
+
+        Returns:
+        True if the operation succeeded, otherwise False
+        """
+        name = ", ".join(names)
+        try:
+            bin_path = self.context_handler.get_context().bin_path
+            future_maginician = self.prepare_maginician()
+            # Prepare the args for installation
+            if future_maginician:
+                python = self.get_valid_python()
+                if python:
+                    # pip must be bootstrapped before the worker starts
+                    if list(names) != ["pip"]:
+                        worker = self.get_worker(
+                            python, future_maginician, bin_path)
+                        succeeded = worker.run(
+                            "uninstall" if uninstall else "install", names,
+                            self.force_reinstall)
+                        if succeeded is not None:
+                            return succeeded
+                    extra_args = ["--uninstall"] if uninstall else []
+                    if self.force_reinstall:
+                        extra_args.append("--force")
+                    if not uninstall:
+                        extra_args += self.get_wheelhouse_args()
+                    if list(names) == ["pip"] and self.pip_cache_folder:
+                        extra_args += ["--cache", str(self.pip_cache_folder)]
+                    # The dependencies go last, the rest of the args
+                    # belong to them
+                    args = [python, str(future_maginician)] + \
+                        extra_args + ["--dependencies"] + list(names)
+                    return self.install(name, args, str(bin_path))
+                else:
+                    logger.error(
+                        "Cannot install the app: no python.exe found.")
+        except Exception as e:
+            logger.error(
+                "Cannot install dependency '%s'. Error: %s", name, e)
+            logger.error(traceback.format_exc())
+            raise
+        return False
+
+    def install_dependencies(self, dependencies: list = []) -> list:
+        """Install the list of dependencies.
+
+        The whole list is installed by a single pip invocation(one
+        startup, one resolver run). If it fails, every dependency is
+        installed separately to report the failed ones.
+
+        Args:
+        dependencies (list)= a list of dependencies to be installed
+
+        Returns:
+        A list of dependencies which failed to install
+        """
+        failed = []
+        if dependencies:
+            dependencies = self.get_unsatisfied_dependencies(dependencies)
+            if not dependencies:
+                logger.info("All dependencies are already satisfied.")
+                return failed
+            try:
+                if len(dependencies) > 1 and \
+                        self.run_maginician(dependencies):
+                    return failed
+                if len(dependencies) > 1:
+                    logger.warning("""The batch installation failed, installing
+                                   the dependencies one by one.""")
+                for dependency in dependencies:
+                    if not self.install_dependency(dependency):
+                        logger.error(
+                            "Installation of dependency %s has failed.",
+                            dependency)
+                        failed.append(dependency)
+            except Exception:
+                logger.error("Installation of dependencies %s has failed.",
+                             dependencies)
+                logger.error(traceback.format_exc())
+                raise
+        else:
+            logger.info("No dependencies to install.")
+        return failed
+
+    def uninstall_dependencies(self, dependencies: list = []) -> list:
+        """Uninstall the list of dependencies.
+
+        Args:
+        dependencies (list)= a list of names of dependencies to be removed
+
+        Returns:
+        A list of dependencies which failed to uninstall
+        """
+        failed = []
+        if dependencies:
+            dependencies = list(dependencies)
+            try:
+                if not self.run_maginician(dependencies, uninstall=True):
+                    failed = dependencies
+            except Exception:
+                logger.error("Uninstallation of dependencies %s has failed.",
+                             dependencies)
+                logger.error(traceback.format_exc())
+                raise
+        return failed
+
+    def install_dependency(self, name: str = None) -> bool:
+        """Install a dependency.
+
+        Args:
+        name (str)= the dependency to be installed (e.g. wheel==0.0.0 or wheel)
+
+        Returns:
+        True if the installation succeeded, otherwise False
+        """
+        if name and self.context_handler:
+            if not self.get_unsatisfied_dependencies([name]):
+                logger.info("The dependency %s is already satisfied.", name)
+                return True
+            return self.run_maginician([name])
+        logger.info("No dependency to install.")
+        return False
+
+    def get_worker(self, python: str, script: str, cwd: str):
+        """Get the running worker for the venv(start it if needed).
+
+        Args:
+        python (str)= the python of the venv
+        script (str)= the 'maginician' script in the venv
+        cwd (str)= the cwd of the worker
+
+        Returns:
+        The worker instance
+        """
+        if self.worker and (self.worker.python != python
+                            or self.worker.script != str(script)):
+            # Different venv
+            self.stop_worker()
+        if self.worker is None:
+            self.worker = MaginicianWorker(
+                python=python, script=str(script), cwd=cwd,
+                args=self.get_wheelhouse_args())
+        return self.worker
+
+    def get_wheelhouse_args(self) -> list:
+        """Get the args of the 'maginician' for the wheelhouse."""
+        wheelhouse_folder = self.wheelhouse_folder
+        if wheelhouse_folder:
+            return ["--wheelhouse", str(wheelhouse_folder)]
+        return []
+
+    def get_pip_environment(self) -> dict:
+        """Get the environment variables for pip.
+
+        The wheelhouse is a find-links source of every pip run.
+        """
+        environment = os.environ.copy()
+        wheelhouse_folder = self.wheelhouse_folder
+        if wheelhouse_folder and Path(wheelhouse_folder).exists():
+            environment["PIP_FIND_LINKS"] = str(wheelhouse_folder)
+        return environment
+
+    def get_unsatisfied_dependencies(self, dependencies) -> list:
+        """Filter out the dependencies already satisfied in the venv.
+
+        Nothing is filtered if the reinstall is forced.
+
+        Args:
+        dependencies = the dependencies to be installed
+        """
+        dependencies = list(dependencies)
+        env_dir = None
+        if self.context_handler:
+            env_dir = self.context_handler.get_value_for_key("env_dir")
+        if self.force_reinstall or not env_dir:
+            return dependencies
+        return get_unsatisfied_requirements(
+            dependencies, env_dir, self.context_handler,
+            self.check_requirements)
 
-    def install(self, name: str, args: list, cwd: str):
+    def check_requirements(self, requirements: list) -> list | None:
+        """Check the requirements by pip's rules in the worker.
+
+        Args:
+        requirements (list)= the requirements to check
+
+        Returns:
+        A list of the unsatisfied requirements or None if the worker is
+        not available
+        """
+        future_maginician = self.prepare_maginician()
+        python = self.get_valid_python() if future_maginician else None
+        if not python:
+            return None
+        bin_path = self.context_handler.get_context().bin_path
+        return self.get_worker(python, future_maginician,
+                               bin_path).unsatisfied(requirements)
+
+    def stop_worker(self):
+        """Stop the worker, if exists."""
+        if self.worker:
+            self.worker.stop()
+            self.worker = None
+
+    def install(self, name: str, args: list, cwd: str) -> bool:
         """Install the necessary components.
 
         Args:
         name (str) = item is to be installed
         args (list) = installation command string
         cwd (str)= the cwd where the installation will run
+
+        Returns:
+        True if the installation succeeded, otherwise False
         """
+        succeeded = False
         try:
             if args and cwd and name:
                 logger.info("Installing '%s'.", name)
-                with Popen(args, stderr=PIPE, stdout=PIPE, cwd=cwd) as p:
-                    stderr = p.stderr.read()
-                    if stderr:
+                with trace("install", name=name), \
+                        Popen(args, stderr=PIPE, stdout=PIPE, cwd=cwd,
+                              env=self.get_pip_environment()) as p:
+                    _, stderr = p.communicate()
+                    if p.returncode != 0:
                         logger.error(
                             "The 'install' for %s failed(%s).",
                             name, stderr)
                     else:
+                        succeeded = True
                         logger.info(
                             "The 'install' for %s finished.",
                             name)
+                        if stderr:
+                            logger.warning(
+                                "The 'install' for %s reported: %s",
+                                name, stderr)
             else:
                 logger.warning("""Cannot proceed with the 'install' operation.
                                Some required params are missing
@@ -43,23 +339,102 @@ class CommonPreparationByPlatform():
         except Exception as e:
             logger.error("Installation of %s failed(%s).", name, e)
             raise
+        return succeeded
+
+    def build_wheel(self, requirement: str, wheelhouse_folder: str) -> bool:
+        """Build(or download) the wheel of the requirement.
+
+        The dependencies of the requirement aren't built, every build
+        runs in its own pip process.
 
-    def start_of_app(self, name: str, args: list, cwd: str):
+        Args:
+        requirement (str)= the requirement, e.g. numpy==2.0.0
+        wheelhouse_folder (str)= where the wheel is stored
+
+        Returns:
+        True if the wheel is in the wheelhouse
+        """
+        try:
+            python = self.get_valid_python()
+            bin_path = self.context_handler.get_context().bin_path
+            if python and requirement and wheelhouse_folder:
+                args = [python, "-m", "pip", "wheel", "--no-deps",
+                        "--wheel-dir", str(wheelhouse_folder), requirement]
+                return self.install("wheel of %s" % requirement, args,
+                                    bin_path)
+        except Exception as e:
+            logger.error("Building the wheel of %s failed(%s).",
+                         requirement, e)
+        return False
+
+    def launch_app(self, name: str, args: list, cwd: str) -> bool:
+        """Launch the app(as a child process by default).
+
+        Args:
+        name (str)= the name of the app
+        args (list)= the command of the app
+        cwd (str)= the cwd of the app
+
+        Returns:
+        True if the app was started
+        """
+        return self.start_of_app(name, args, cwd)
+
+    def run_callbacks(self, callbacks: list, event: str):
+        """Call the callbacks(their errors are only logged).
+
+        Args:
+        callbacks (list)= the callbacks
+        event (str)= the description for the log, e.g. 'after the start'
+        """
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error("The callback %s failed(%s).", event, e)
+
+    def start_of_app(self, name: str, args: list, cwd: str) -> bool:
         """Start the app.
 
         Args:
         name (str)= the to be installed
         args (list)= the installation string
         cwd (str)= the cwd where the installation will run
+
+        Returns:
+        True if the app was started(even if it reported errors)
         """
+        started = False
+        # The preparation is done
+        self.stop_worker()
         if name and args and cwd:
+            if self.before_start:
+                before_start, self.before_start = self.before_start, None
+                before_start()
+            output = AppOutput(
+                mode=self.app_output,
+                logs_folder=self.app_logs_folder,
+                name=Path(str(args[1])).stem if len(args) > 1 else name)
             try:
-                with Popen(args, stderr=PIPE, stdout=PIPE, cwd=cwd) as p:
-                    stderr = p.stderr.read()
-                    if stderr:
+                with trace("app_launch", name=name), \
+                        Popen(args, cwd=cwd,
+                              **output.get_popen_streams()) as p:
+                    started = True
+                    output.attach(p)
+                    self.started_apps.append(
+                        {"args": [str(arg) for arg in args],
+                         "cwd": str(cwd)})
+                    self.run_callbacks(self.after_start, "after the start")
+                    returncode = p.wait()
+                    output.wait()
+                    if returncode != 0:
                         logger.error(
-                            "The 'start of app' operation for %s failed(%s).",
-                            name, stderr)
+                            "The 'start of app' operation for %s failed"
+                            "(exit code %s): %s", name, returncode,
+                            output.describe())
+                        self.app_failed = True
+                        self.run_callbacks(self.after_failure,
+                                           "after the failure")
                     else:
                         logger.info(
                             "The 'start of app' operation for %s has finished.",
@@ -72,3 +447,4 @@ class CommonPreparationByPlatform():
                            Some required params are missing
                            name:%s, args:%s, cwd:%s.""",
                            name, args, cwd)
+        return started
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""Incremental sync of the PyInstaller's files to the venv.
+
+The manifest of the last sync(size, mtime and hash of every source file)
+is stored in the target folder, so only the missing or stale files are
+copied. The large shared libraries are hardlinked(or symlinked) instead
+of duplicated in every venv.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+from pathlib import Path
+
+from starter.app_preparation_by_type.manifest import (
+    MANIFEST_HASH,
+    MANIFEST_MTIME,
+    MANIFEST_SIZE,
+    hash_file
+)
+
+__all__ = ['sync_folder', 'sync_file']
+
+SYNC_MANIFEST_FILE = ".starter_sync.json"
+SHARED_LIBRARY_REGEX = r"\.(so(\.\d+)*|dll|pyd|dylib)$"
+# Smaller libraries are simply copied
+LINK_MIN_SIZE = 256 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def load_sync_manifest(target: Path) -> dict:
+    """Load the manifest of the last sync to the target folder."""
+    manifest_file = target.joinpath(SYNC_MANIFEST_FILE)
+    if manifest_file.exists():
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f_out:
+                return json.loads(f_out.read())
+        except Exception as e:
+            logger.warning("The sync manifest %s is not valid(%s).",
+                           manifest_file, e)
+    return {}
+
+
+def save_sync_manifest(target: Path, manifest: dict):
+    """Store the manifest of the sync to the target folder.
+
+    The file is replaced(not rewritten), it may be hardlinked.
+    """
+    manifest_file = target.joinpath(SYNC_MANIFEST_FILE)
+    temporary_file = target.joinpath(SYNC_MANIFEST_FILE + ".tmp")
+    with open(temporary_file, "w", encoding="utf-8") as f_in:
+        f_in.write(json.dumps(manifest, indent=4))
+    os.replace(temporary_file, manifest_file)
+
+
+def walk_files(source: Path, exclude: list = []):
+    """Yield (relative path, entry) of every file in the source folder.
+
+    Args:
+    source (Path)= the folder to walk
+    exclude (list)= the relative paths to skip
+    """
+    folders = [source]
+    while folders:
+        folder = folders.pop()
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                relative = Path(entry.path).relative_to(source).as_posix()
+                if relative in exclude:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(Path(entry.path))
+                else:
+                    yield relative, entry
+
+
+def is_shared_library(name: str, size: int) -> bool:
+    """Check if the file is a large shared library(to be linked)."""
+    return size >= LINK_MIN_SIZE and bool(
+        re.search(SHARED_LIBRARY_REGEX, name.lower()))
+
+
+def link_or_copy(source: str, target: Path, link: bool) -> bool:
+    """Place the source file to the target.
+
+    Args:
+    source (str)= the source file
+    target (Path)= the target file
+    link (bool)= try the hardlink/symlink first
+
+    Returns:
+    True if linked, False if copied
+    """
+    if target.exists() or target.is_symlink():
+        target.unlink()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if os.path.islink(source):
+        os.symlink(os.readlink(source), str(target))
+        return True
+    if link:
+        for linker in [os.link, os.symlink]:
+            try:
+                linker(source, str(target))
+                return True
+            except OSError:
+                continue
+    shutil.copy2(source, str(target))
+    return False
+
+
+def sync_folder(source: Path, target: Path, exclude: list = []) -> dict:
+    """Sync the source folder to the target folder incrementally.
+
+    Args:
+    source (Path)= the source folder
+    target (Path)= the target folder
+    exclude (list)= the relative paths of the source to skip
+
+    Returns:
+    The counts of the copied, linked, kept and removed files
+    """
+    source = Path(source)
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+    previous = load_sync_manifest(target)
+    current = {}
+    counts = {"copied": 0, "linked": 0, "kept": 0, "removed": 0}
+    for relative, entry in walk_files(source, exclude):
+        stat = entry.stat(follow_symlinks=False)
+        item = {MANIFEST_SIZE: stat.st_size, MANIFEST_MTIME: stat.st_mtime_ns}
+        old = previous.get(relative)
+        target_file = target.joinpath(relative)
+        present = target_file.exists() or target_file.is_symlink()
+        if old and present and old[MANIFEST_SIZE] == stat.st_size \
+                and old[MANIFEST_MTIME] == stat.st_mtime_ns:
+            current[relative] = old
+            counts["kept"] += 1
+            continue
+        if entry.is_symlink():
+            item[MANIFEST_HASH] = None
+        else:
+            item[MANIFEST_HASH] = hash_file(entry.path)
+            if old and present and old.get(MANIFEST_HASH) and \
+                    old[MANIFEST_HASH] == item[MANIFEST_HASH]:
+                # Touched only
+                current[relative] = item
+                counts["kept"] += 1
+                continue
+        linked = link_or_copy(
+            entry.path, target_file,
+            is_shared_library(entry.name, stat.st_size))
+        counts["linked" if linked else "copied"] += 1
+        current[relative] = item
+    for relative in set(previous) - set(current):
+        stale = target.joinpath(relative)
+        if stale.exists() or stale.is_symlink():
+            stale.unlink()
+        counts["removed"] += 1
+    save_sync_manifest(target, current)
+    logger.info("Synced %s to %s: %s.", source, target, counts)
+    return counts
+
+
+def sync_file(source: Path, target: Path) -> bool:
+    """Copy the file only if the target is missing or differs.
+
+    Args:
+    source (Path)= the source file
+    target (Path)= the target file
+
+    Returns:
+    True if the file was copied
+    """
+    source_stat = os.stat(source)
+    if Path(target).exists():
+        target_stat = os.stat(target)
+        if target_stat.st_size == source_stat.st_size and \
+                target_stat.st_mtime_ns == source_stat.st_mtime_ns:
+            return False
+    shutil.copy2(str(source), str(target))
+    return True
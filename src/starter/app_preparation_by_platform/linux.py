@@ -2,13 +2,18 @@
 """This class encapsulates all platform-specific differences and behaviors."""
 
 import logging
-import shutil
+import os
+import sys
 import traceback
 from pathlib import Path
 
 from starter.app_preparation_by_platform.common import (
     CommonPreparationByPlatform
 )
+from starter.app_preparation_by_platform.folder_sync import (
+    sync_file,
+    sync_folder
+)
 from starter.app_preparation_by_platform.platform_interface import (
     PlatformInterface
 )
@@ -21,43 +26,39 @@ PYTHON_DEFAULT_NAME_LINUX = "python_default"
 logger = logging.getLogger(__name__)
 
 
-class LinuxPlatform(PlatformInterface, CommonPreparationByPlatform):
+class LinuxPlatform(CommonPreparationByPlatform, PlatformInterface):
     """Linux platform handler."""
     def __init__(self, /, **kwargs):
         self.context_handler = kwargs.get("context_handler", None)
         self.cwd = kwargs.get("cwd", None)
         self.venv_folder = kwargs.get("venv_folder", None)
-        CommonPreparationByPlatform().__init__()
+        # Replace the Starter process with the app(os.execv)
+        self.exec_app = kwargs.get("exec_app", False)
+        CommonPreparationByPlatform.__init__(self, **kwargs)
 
     def pyinstaller_magic(self):
-        """Logic tailored for the PyInstaller."""
+        """Logic tailored for the PyInstaller.
+
+        The files are synced incrementally(see 'sync_folder'), only the
+        missing or stale files are copied.
+        """
         try:
             _internal_from = self.cwd.parents[2].joinpath("_internal")
             path_to = self.venv_folder.joinpath("bin", "_internal")
             path_to_python = self.venv_folder.joinpath("bin")
-            if path_to.exists():
-                shutil.rmtree(str(path_to))
-            path_to.mkdir()
+            path_to.mkdir(parents=True, exist_ok=True)
 
             if _internal_from.exists() and path_to.exists():
+                # Rename the  python --> python_real
+                python_files = [file.name for file in _internal_from.iterdir()
+                                if file.is_file()
+                                and file.name.lower() in ["python"]]
+                for name in python_files:
+                    sync_file(_internal_from.joinpath(name),
+                              path_to_python.joinpath(
+                                  PYTHON_DEFAULT_NAME_LINUX))
                 # Copy every file extra
-                for file in _internal_from.iterdir():
-                    # Rename the  python --> python_real
-                    if file.is_file() and file.name.lower() in ["python"]:
-                        shutil.copy(
-                            str(file),
-                            str(path_to_python.
-                                joinpath(PYTHON_DEFAULT_NAME_LINUX)))
-                    elif file.is_file():
-                        if path_to.joinpath(file.name).exists():
-                            path_to.joinpath(file.name).unlink(missing_ok=True)
-                        shutil.copyfile(
-                            str(file),
-                            str(path_to.joinpath(file.name)))
-                    elif file.is_dir():
-                        shutil.copytree(
-                            str(file),
-                            str(path_to.joinpath(file.name)))
+                sync_folder(_internal_from, path_to, exclude=python_files)
 
         except Exception as e:
             logger.error(
@@ -66,74 +67,6 @@ class LinuxPlatform(PlatformInterface, CommonPreparationByPlatform):
             logger.error(traceback.format_exc())
             raise
 
-    def install_dependencies(self, dependencies: list = []):
-        """Installl the list of dependencies.
-
-        Args:
-        dependencies (list)= a list of dependencies to be installed
-        """
-        if dependencies:
-            for dependency in dependencies:
-                try:
-                    self.install_dependency(dependency)
-                except Exception:
-                    logger.error("Installation of dependency %s has failed.",
-                                 dependency)
-                    logger.error(traceback.format_exc())
-                    raise
-        else:
-            logger.info("No dependencies to install(linux handler).")
-
-    def install_dependency(self, name: str = None):
-        """Install a dependency.
-
-        Args:
-        name (str)= the dependency to be installed (e.g. wheel==0.0.0 or wheel)
-        """
-        if name and self.context_handler:
-            try:
-                bin_path = self.context_handler.get_context().bin_path
-                maginician = "maginician.py"
-                future_maginician = Path(bin_path).joinpath(maginician)
-                try:
-                    # Copy from the correct source --> IDE vs. PyInstaller
-                    current_maginician = str(Path(self.cwd).parent.joinpath(
-                        maginician))
-                    if Path(bin_path).exists():
-                        shutil.copy(current_maginician, bin_path)
-                        logger.info(""""Copying the 'maginician' script from
-                                    '%s' was successfully
-                                    completed.""", current_maginician)
-                except Exception:
-                    # Try a different approach because of PyInstaller
-                    current_maginician = str(Path(self.cwd).parents[1]
-                                             .joinpath(maginician))
-                    if Path(bin_path).exists():
-                        shutil.copy(current_maginician, bin_path)
-                        logger.info("""Copying the 'maginician' script from
-                                    '%s' was successfully
-                                    completed.""", current_maginician)
-                # Prepare the args for installation
-                if future_maginician.exists():
-                    python = self.get_valid_python()
-                    if python:
-                        args = [python, str(future_maginician),
-                                "--dependency", name]
-                        self.install(name, args, bin_path)
-                    else:
-                        logger.error(
-                            "Cannot install the app: no python.exe found.")
-                else:
-                    logger.error("""The script '%s' does not exist.""",
-                                 future_maginician)
-            except Exception as e:
-                logger.error(
-                    "Cannot install dependency '%s'. Error: %s", name, e)
-                logger.error(traceback.format_exc())
-                raise
-        else:
-            logger.info("No dependency to install(linux).")
-
     def get_valid_python(self) -> str:
         """Get the path to the correct Python .exe file."""
         python = None
@@ -196,7 +129,7 @@ class LinuxPlatform(PlatformInterface, CommonPreparationByPlatform):
                     logger.info(
                         "Starting your app with %s.",
                         main_path)
-                    self.start_of_app("app", command, cwd)
+                    self.launch_app("app", command, cwd)
                     logger.info(
                         "The start of the app with {%s} was successful.")
         except Exception as e:
@@ -205,6 +138,66 @@ class LinuxPlatform(PlatformInterface, CommonPreparationByPlatform):
             logger.error(traceback.format_exc())
             raise
 
+    def launch_app(self, name: str, args: list, cwd: str) -> bool:
+        """Launch the app, replace the Starter process if 'exec_app' is set.
+
+        Args:
+        name (str)= the name of the app
+        args (list)= the command of the app
+        cwd (str)= the cwd of the app
+
+        Returns:
+        True if the app was started
+        """
+        if self.exec_app:
+            return self.exec_of_app(name, args, cwd)
+        return self.start_of_app(name, args, cwd)
+
+    def exec_of_app(self, name: str, args: list, cwd: str) -> bool:
+        """Replace the Starter process with the app(os.execv).
+
+        The app inherits the pid, the standard streams and the signals
+        of the Starter. Only the first app is started this way. If the
+        exec fails, the app is started as a child process.
+
+        Args:
+        name (str)= the name of the app
+        args (list)= the command of the app
+        cwd (str)= the cwd of the app
+
+        Returns:
+        False if the app wasn't started(otherwise doesn't return)
+        """
+        # The preparation is done
+        self.stop_worker()
+        if not name or not args or not cwd:
+            logger.warning("""Cannot proceed with the 'exec' operation.
+                           Some required params are missing
+                           name:%s, args:%s, cwd:%s.""",
+                           name, args, cwd)
+            return False
+        if self.before_start:
+            before_start, self.before_start = self.before_start, None
+            before_start()
+        self.started_apps.append({"args": [str(arg) for arg in args],
+                                  "cwd": str(cwd)})
+        self.run_callbacks(self.before_exec, "before the exec")
+        logger.info("Replacing the Starter process with '%s'.", name)
+        # Nothing is flushed after the exec
+        logging.shutdown()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        starter_cwd = os.getcwd()
+        try:
+            os.chdir(cwd)
+            os.execv(str(args[0]), [str(arg) for arg in args])
+        except OSError as e:
+            os.chdir(starter_cwd)
+            self.started_apps.pop()
+            logger.error("Cannot exec '%s'(%s), starting it as a child "
+                         "process.", args, e)
+        return self.start_of_app(name, args, cwd)
+
     def context_needs_to_be_altered(self) -> tuple:
         """Returns the status if the context needs to be altered.
 
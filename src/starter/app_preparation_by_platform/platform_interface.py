@@ -19,6 +19,14 @@ class PlatformInterface(ABC):
         dependencies (list)= a list of dependencies
         """
 
+    @abstractmethod
+    def uninstall_dependencies(self, dependencies: list = []):
+        """Uninstall a list of dependencies.
+
+        Args:
+        dependencies (list)= a list of names of dependencies
+        """
+
     @abstractmethod
     def install_dependency(self, name: str | None = None):
         """Install the dependency with given name.
@@ -3,13 +3,16 @@
 
 import logging
 import re
-import shutil
 import traceback
 from pathlib import Path
 
 from starter.app_preparation_by_platform.common import (
     CommonPreparationByPlatform
 )
+from starter.app_preparation_by_platform.folder_sync import (
+    sync_file,
+    sync_folder
+)
 from starter.app_preparation_by_platform.platform_interface import (
     PlatformInterface
 )
@@ -22,49 +25,40 @@ PYTHON_DEFAULT_NAME_WIN = "python_default.exe"
 logger = logging.getLogger(__name__)
 
 
-class WindowsPlatform(PlatformInterface, CommonPreparationByPlatform):
+class WindowsPlatform(CommonPreparationByPlatform, PlatformInterface):
     """Windows platform handler."""
     def __init__(self, /, **kwargs):
         self.context_handler = kwargs.get("context_handler", None)
         self.cwd = kwargs.get("cwd", None)
         self.venv_folder = kwargs.get("venv_folder", None)
-        CommonPreparationByPlatform().__init__()
+        CommonPreparationByPlatform.__init__(self, **kwargs)
 
     def pyinstaller_magic(self):
-        """Logic tailored for the PyInstaller."""
+        """Logic tailored for the PyInstaller.
+
+        The files are synced incrementally(see 'sync_folder'), only the
+        missing or stale files are copied.
+        """
         try:
             _internal_from = self.cwd.parents[2].joinpath("_internal")
             path_to = self.venv_folder.joinpath("Scripts", "_internal")
             path_to_python = self.venv_folder.joinpath("Scripts")
-            if path_to.exists():
-                shutil.rmtree(str(path_to))
-            path_to.mkdir()
+            path_to.mkdir(parents=True, exist_ok=True)
             if _internal_from.exists() and path_to.exists():
+                # Rename the  python --> python_real
+                python_files = [
+                    file.name for file in _internal_from.iterdir()
+                    if file.is_file()
+                    and re.search("python(.*).exe", file.name)
+                    and not re.search("pythonw(.*).exe", file.name)]
+                for name in python_files:
+                    sync_file(_internal_from.joinpath(name),
+                              path_to_python.joinpath(PYTHON_DEFAULT_NAME_WIN))
+                    # Extra copy because of Windows and Python=> 3.13
+                    sync_file(_internal_from.joinpath(name),
+                              path_to_python.joinpath(name))
                 # Copy every extra file
-                for file in _internal_from.iterdir():
-                    # Rename the  python --> python_real
-                    if file.is_file() \
-                            and re.search("python(.*).exe", file.name)\
-                            and not re.search("pythonw(.*).exe", file.name):
-                        shutil.copy(
-                            str(file),
-                            str(path_to_python.
-                                joinpath(PYTHON_DEFAULT_NAME_WIN)))
-                        # Extra copy because of Windows and Python=> 3.13
-                        shutil.copy(
-                            str(file),
-                            str(path_to_python.
-                                joinpath(file.name)))
-                    elif file.is_file():
-                        if path_to.joinpath(file.name).exists():
-                            path_to.joinpath(file.name).unlink(missing_ok=True)
-                        shutil.copyfile(
-                            str(file),
-                            str(path_to.joinpath(file.name)))
-                    elif file.is_dir():
-                        shutil.copytree(
-                            str(file),
-                            str(path_to.joinpath(file.name)))
+                sync_folder(_internal_from, path_to, exclude=python_files)
 
         except Exception as e:
             logger.error(
@@ -73,75 +67,6 @@ class WindowsPlatform(PlatformInterface, CommonPreparationByPlatform):
             logger.error(traceback.format_exc())
             raise
 
-    def install_dependencies(self, dependencies: list = []):
-        """Installl the list of dependencies.
-
-        Args:
-        dependencies (list)= a list of dependencies to be installed
-        """
-        if dependencies:
-            for dependency in dependencies:
-                try:
-                    self.install_dependency(dependency)
-                except Exception:
-                    logger.info("Installation of dependency %s has failed.",
-                                dependency)
-                    logger.error(traceback.format_exc())
-                    raise
-        else:
-            logger.info("No dependencies to install(windows handler).")
-
-    def install_dependency(self, name: list = None):
-        """Install a dependency.
-
-        Args:
-        name (list)= the dependency to be installed
-                     (e.g. wheel==0.0.0 or wheel)
-        """
-        if name and self.context_handler:
-            try:
-                bin_path = self.context_handler.get_context().bin_path
-                maginician = "maginician.py"
-                future_maginician = Path(bin_path).joinpath(maginician)
-                try:
-                    # Copy from the correct source --> IDE vs. PyInstaller
-                    current_maginician = str(Path(self.cwd).parent.joinpath(
-                        maginician))
-                    if Path(bin_path).exists():
-                        shutil.copy(current_maginician, bin_path)
-                        logger.info("""Copying the 'maginician' script from
-                                    '%s' was successfully
-                                    completed.""", current_maginician)
-                except Exception:
-                    # Try a different approach because of PyInstaller
-                    current_maginician = str(Path(self.cwd).parents[1]
-                                             .joinpath(maginician))
-                    if Path(bin_path).exists():
-                        shutil.copy(current_maginician, bin_path)
-                        logger.info("""Copying the 'maginician' script from
-                                    '%s' was successfully
-                                    completed.""", current_maginician)
-                # Prepare the args for installation
-                if future_maginician.exists():
-                    python = self.get_valid_python()
-                    if python:
-                        args = [python, str(future_maginician),
-                                "--dependency", name]
-                        self.install(name, args, str(bin_path))
-                    else:
-                        logger.error(
-                            "Cannot install the app: no python.exe found.")
-                else:
-                    logger.error("""The script '%s' does not exist.""",
-                                 future_maginician)
-            except Exception as e:
-                logger.error(
-                    "Cannot install dependency '%s'. Error: %s",
-                    name, e)
-                raise
-        else:
-            logger.info("No dependency to install(windows).")
-
     def get_valid_python(self) -> str:
         """Get the path to the correct Python .exe file."""
         python = None
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""Long-lived 'maginician' process installing dependencies in the venv.
+
+The worker is started once per venv and receives JSON commands(one per
+line), so the interpreter startup and the import of pip are paid only
+once per launch.
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from subprocess import PIPE, Popen
+
+from starter.tracing import trace
+
+__all__ = ['MaginicianWorker']
+
+WORKER_ARGS = ["--worker"]
+# Number of pip's output lines kept to report a failure
+OUTPUT_TAIL = 50
+# Ends the output of the request(see WORKER_OUTPUT_END of the script)
+OUTPUT_END = "maginician-output-end:"
+# Seconds to wait for the rest of the output after the response
+OUTPUT_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
+
+class MaginicianWorker():
+    """Manages the worker process of the 'maginician' script."""
+    def __init__(self, /, **kwargs):
+        self.python = kwargs.get("python", None)
+        self.script = kwargs.get("script", None)
+        self.cwd = kwargs.get("cwd", None)
+        # Extra args of the script(e.g. ['--wheelhouse', folder])
+        self.args = kwargs.get("args", [])
+        self.process = None
+        self.output = deque(maxlen=OUTPUT_TAIL)
+        self.output_reader = None
+        # Guards the output shared with the reader thread
+        self.output_condition = threading.Condition()
+        # The id of the last request whose output was read completely
+        self.output_ended = None
+        self.request_id = 0
+        self.lock = threading.Lock()
+
+    def start(self) -> bool:
+        """Start the worker process.
+
+        Returns:
+        True if the worker is running
+        """
+        if self.is_running():
+            return True
+        if not self.python or not self.script:
+            return False
+        try:
+            self.process = Popen(
+                [str(self.python), str(self.script)] + WORKER_ARGS +
+                list(self.args),
+                stdin=PIPE, stdout=PIPE, stderr=PIPE,
+                cwd=self.cwd, text=True, encoding="utf-8", bufsize=1)
+            # pip's output must be drained, otherwise the worker blocks
+            self.output_reader = threading.Thread(
+                target=self.read_output, daemon=True)
+            self.output_reader.start()
+            logger.info("The 'maginician' worker started(pid %s).",
+                        self.process.pid)
+        except Exception as e:
+            logger.error("Cannot start the 'maginician' worker(%s).", e)
+            self.process = None
+        return self.is_running()
+
+    def read_output(self):
+        """Keep the tail of pip's output(stderr of the worker)."""
+        for line in self.process.stderr:
+            line = line.rstrip()
+            with self.output_condition:
+                if line.startswith(OUTPUT_END):
+                    self.output_ended = line[len(OUTPUT_END):]
+                    self.output_condition.notify_all()
+                else:
+                    self.output.append(line)
+        with self.output_condition:
+            # The worker ended, nothing more to wait for
+            self.output_condition.notify_all()
+
+    def wait_for_output(self, request_id: str) -> list:
+        """Wait until the whole output of the request is read.
+
+        Args:
+        request_id (str)= the id of the request
+
+        Returns:
+        The tail of the output of the request
+        """
+        with self.output_condition:
+            self.output_condition.wait_for(
+                lambda: self.output_ended == request_id or
+                not self.output_reader.is_alive(),
+                timeout=OUTPUT_TIMEOUT)
+            return list(self.output)
+
+    def is_running(self) -> bool:
+        """Check if the worker process is alive."""
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        """Stop the worker(closing stdin ends its loop)."""
+        if self.process:
+            try:
+                if self.process.stdin:
+                    self.process.stdin.close()
+                self.process.wait(timeout=10)
+            except Exception:
+                self.process.kill()
+            logger.info("The 'maginician' worker stopped.")
+            self.process = None
+
+    def request(self,
+                command: str,
+                dependencies: list = [],
+                force: bool = False) -> dict | None:
+        """Send the command and wait for the response.
+
+        Args:
+        command (str)= install, uninstall or satisfied
+        dependencies (list)= the dependencies of the command
+        force (bool)= reinstall even the satisfied dependencies
+
+        Returns:
+        The response {"exit_code": int, "result": ..., "output": list} or
+        None if the worker is not available
+        """
+        with self.lock, trace("maginician_worker", command=command,
+                              dependencies=len(dependencies)):
+            if not self.start():
+                return None
+            try:
+                self.request_id += 1
+                request_id = str(self.request_id)
+                with self.output_condition:
+                    self.output.clear()
+                self.process.stdin.write(json.dumps(
+                    {"id": request_id,
+                     "command": command,
+                     "dependencies": list(dependencies),
+                     "force": force}) + "\n")
+                self.process.stdin.flush()
+                line = self.process.stdout.readline()
+                if line:
+                    response = json.loads(line)
+                    response["output"] = self.wait_for_output(request_id)
+                    return response
+                logger.error("The 'maginician' worker ended unexpectedly.")
+            except Exception as e:
+                logger.error(
+                    "The 'maginician' worker failed to process %s(%s).",
+                    command, e)
+            self.stop()
+            return None
+
+    def run(self,
+            command: str,
+            dependencies: list,
+            force: bool = False) -> bool | None:
+        """Install/uninstall the dependencies.
+
+        Args:
+        command (str)= install or uninstall
+        dependencies (list)= the dependencies
+        force (bool)= reinstall even the satisfied dependencies
+
+        Returns:
+        True if succeeded, False if failed and None if the worker is
+        not available
+        """
+        response = self.request(command, dependencies, force)
+        if response is None:
+            return None
+        if response.get("exit_code") != 0:
+            logger.error("The '%s' of %s failed: %s", command, dependencies,
+                         "\n".join(response.get("output", [])) or
+                         response.get("result"))
+            return False
+        logger.info("The '%s' of %s finished.", command, dependencies)
+        return True
+
+    def unsatisfied(self, requirements: list) -> list | None:
+        """Get the requirements not satisfied in the venv.
+
+        Args:
+        requirements (list)= the requirements to check
+
+        Returns:
+        A list of the unsatisfied requirements or None if the check failed
+        """
+        response = self.request("satisfied", requirements)
+        if response is None or response.get("exit_code") != 0:
+            return None
+        return response.get("result")
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""The set of changes of the app files since the last run."""
+
+import fnmatch
+
+from starter.app_preparation_by_type.common import DEPENDENCIES_REGEX
+
+__all__ = ['ChangeSet', 'classify_file']
+
+# Categories of the changed files
+CHANGE_SOURCE = "source"
+CHANGE_DEPENDENCY = "dependency"
+CHANGE_BUILD = "build"
+BUILD_METADATA_FILES = ["setup.py", "pyproject.toml"]
+
+
+def classify_file(relative_path: str) -> str:
+    """Classify the file of the app.
+
+    Args:
+    relative_path (str)= the path relative to the app folder
+
+    Returns:
+    The category of the file(source, dependency or build)
+    """
+    # Only the root level files are processed as requirements/metadata
+    if "/" not in relative_path:
+        if relative_path in BUILD_METADATA_FILES:
+            return CHANGE_BUILD
+        if fnmatch.fnmatch(relative_path, DEPENDENCIES_REGEX):
+            return CHANGE_DEPENDENCY
+    return CHANGE_SOURCE
+
+
+class ChangeSet():
+    """Added, removed and modified files of the app.
+
+    Every path is stored with its category, see 'classify_file'.
+    """
+    def __init__(self, /, **kwargs):
+        self.added = {}
+        self.removed = {}
+        self.modified = {}
+        # There is nothing to compare with (fresh start)
+        self.initial = kwargs.get("initial", False)
+        for path in kwargs.get("added", []):
+            self.added[path] = classify_file(path)
+        for path in kwargs.get("removed", []):
+            self.removed[path] = classify_file(path)
+        for path in kwargs.get("modified", []):
+            self.modified[path] = classify_file(path)
+
+    def __bool__(self) -> bool:
+        return self.initial or bool(
+            self.added or self.removed or self.modified)
+
+    def __repr__(self) -> str:
+        return "ChangeSet(initial=%s, added=%s, removed=%s, modified=%s)" % \
+            (self.initial, sorted(self.added), sorted(self.removed),
+             sorted(self.modified))
+
+    def get_paths(self, category: str | None = None) -> set:
+        """Get all changed paths (of the given category).
+
+        Args:
+        category (str)= the category of the files(all if not set)
+        """
+        paths = set()
+        for changes in [self.added, self.removed, self.modified]:
+            paths.update(path for path, path_category in changes.items()
+                         if category is None or path_category == category)
+        return paths
+
+    def get_categories(self) -> set:
+        """Get the categories of all changed paths."""
+        return set(self.added.values()) | set(self.removed.values()) | \
+            set(self.modified.values())
+
+    def has_changes(self, category: str) -> bool:
+        """Check if any path of the given category changed.
+
+        Args:
+        category (str)= the category of the files
+        """
+        return category in self.get_categories()
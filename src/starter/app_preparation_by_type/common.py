@@ -3,48 +3,22 @@
 requirements for the given app."""
 
 import logging
-import os
 from pathlib import Path
 
+from starter.app_preparation_by_type.requirements_lock import (
+    normalize_requirement
+)
+from starter.app_preparation_by_type.wheel_builder import WheelBuilder
+
 DEPENDENCIES_REGEX = "*requirement*"
 
 logger = logging.getLogger(__name__)
 
 
-def get_list_of_files_and_timestamp(folder_path: str, filters) -> dict:
-    """Get a list of files from the given folder and the timestamp of
-    their latest change.
-
-    Params:
-    folder_path (str)= path to the folder to search
-    filters = list of required files(mandatory arg)
-
-    Returns:
-    A dict in format '<path_to_file>: <timestamp>'
-    """
-    files_dict = {}
-
-    if folder_path and Path(folder_path).exists():
-        for filter_item in filters:
-            for item in Path(folder_path).rglob(filter_item):
-                try:
-                    if item:
-                        timestamp = os.path.getmtime(item)
-                        short_item = str(item).split(
-                            str(folder_path))
-                        if short_item:
-                            files_dict[short_item[-1]] = timestamp
-                except Exception as e:
-                    logger.error(
-                        "Problem processing(get timestamp) for file %s,\
-                        because %s.", item, e)
-                    continue
-    return files_dict
-
-
 def get_all_dependencies_setuptools_approach(
         folder_path: str,
-        key: str | None = None
+        key: str | None = None,
+        layout_probe=None
         ) -> set:
     """Get the list of all dependencies using setuptools-style approach.
 
@@ -55,6 +29,7 @@ def get_all_dependencies_setuptools_approach(
     Args:
     folder_path (str)= the path where to search
     key (str)= the regex key for the requirements files(default is '*requirement*')
+    layout_probe = the layout probe of the folder, if exists
 
     Returns:
     A list of depenencies
@@ -66,7 +41,11 @@ def get_all_dependencies_setuptools_approach(
         if key:
             key_regex = key
         files = None
-        files = Path(folder_path).glob(key_regex)
+        if layout_probe and not key and \
+                layout_probe.scanner.is_root_folder(folder_path):
+            files = layout_probe.get_requirement_files()
+        else:
+            files = Path(folder_path).glob(key_regex)
         if files:
             for file in files:
                 try:
@@ -85,3 +64,68 @@ def get_all_dependencies_setuptools_approach(
         logger.info("Cannot search and process dependencie because %s\
                     doesn't exist.", folder_path)
     return set(dependencies)
+
+
+def build_missing_wheels(platform_handler, dependencies) -> list:
+    """Build the missing wheels of the dependencies in parallel.
+
+    The install then only unpacks the prebuilt wheels of the wheelhouse.
+
+    Args:
+    platform_handler = the handler of the current platform
+    dependencies = the dependencies to be installed
+
+    Returns:
+    A list of dependencies which failed to build
+    """
+    wheelhouse_folder = getattr(platform_handler, "wheelhouse_folder", None)
+    if not wheelhouse_folder:
+        return []
+    builder = WheelBuilder(platform_handler=platform_handler,
+                           wheelhouse_folder=wheelhouse_folder)
+    return builder.build(
+        platform_handler.get_unsatisfied_dependencies(dependencies))
+
+
+def install_dependencies_delta(
+        platform_handler,
+        requirements_lock,
+        dependencies
+        ) -> list:
+    """Install only the dependencies which changed since the last run.
+
+    The removed dependencies are uninstalled, the added/changed ones are
+    installed and the lock is updated with the successfully installed
+    dependencies.
+
+    Args:
+    platform_handler = the handler of the current platform
+    requirements_lock (RequirementsLock)= the lock of the installed
+                                          requirements, if exists
+    dependencies = the current dependencies of the app
+
+    Returns:
+    A list of dependencies which failed to install
+    """
+    if requirements_lock is None:
+        # Nothing to compare with
+        if dependencies:
+            return platform_handler.install_dependencies(
+                list(dependencies)) or []
+        return []
+    to_install, to_uninstall = requirements_lock.get_delta(dependencies)
+    logger.info("Dependencies to install: %s, to uninstall: %s.",
+                sorted(to_install), sorted(to_uninstall))
+    if to_uninstall:
+        platform_handler.uninstall_dependencies(sorted(to_uninstall))
+    failed = []
+    if to_install:
+        build_missing_wheels(platform_handler, to_install)
+        failed = platform_handler.install_dependencies(
+            sorted(to_install)) or []
+    # Only the installed dependencies are locked(the failed are planned
+    # again by the next run)
+    installed = {normalize_requirement(item) for item in dependencies} - \
+        {normalize_requirement(item) for item in failed}
+    requirements_lock.save(installed)
+    return failed
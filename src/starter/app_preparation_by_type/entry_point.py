@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Detection of the entry point(if __name__ == "__main__") in the files.
+
+The raw bytes of the file are scanned through mmap for the '__main__'
+token first, nothing is decoded. Only the files with the token are
+parsed(ast, tokenize if the file is not valid for this interpreter), so
+the guard in a docstring or a comment doesn't count and both quote
+styles are recognized.
+"""
+
+import ast
+import io
+import logging
+import mmap
+import os
+import tokenize
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ['has_entry_point', 'detect_entry_points']
+
+MAIN_TOKEN = b"__main__"
+MAIN_NAME = "__name__"
+MAIN_VALUE = "__main__"
+# Bumped when the detection changes(the stored results are outdated)
+DETECTOR_VERSION = 2
+DETECT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+logger = logging.getLogger(__name__)
+
+
+def contains_main_token(file_path: str) -> bool:
+    """Check the raw bytes of the file for the '__main__' token."""
+    with open(file_path, "rb") as file_in:
+        if os.fstat(file_in.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(file_in.fileno(), 0,
+                       access=mmap.ACCESS_READ) as content:
+            return content.find(MAIN_TOKEN) != -1
+
+
+def is_main_guard(node: ast.AST) -> bool:
+    """Check if the node is the test '__name__ == "__main__"'."""
+    if not isinstance(node, ast.Compare) or len(node.ops) != 1 or \
+            not isinstance(node.ops[0], ast.Eq):
+        return False
+    operands = [node.left, node.comparators[0]]
+    return any(isinstance(operand, ast.Name) and operand.id == MAIN_NAME
+               for operand in operands) and \
+        any(isinstance(operand, ast.Constant) and
+            operand.value == MAIN_VALUE for operand in operands)
+
+
+def parse_entry_point(content: bytes) -> bool:
+    """Confirm the entry point by the syntax tree of the content."""
+    tree = ast.parse(content)
+    return any(isinstance(node, ast.If) and is_main_guard(node.test)
+               for node in ast.walk(tree))
+
+
+def tokenize_entry_point(content: bytes) -> bool:
+    """Confirm the entry point by the tokens of the content.
+
+    Used for the files the ast can't parse(e.g. the old syntax).
+    """
+    window = []
+    tokens = tokenize.tokenize(io.BytesIO(content).readline)
+    try:
+        for token in tokens:
+            if token.type in (tokenize.NL, tokenize.COMMENT,
+                              tokenize.ENCODING):
+                continue
+            window = (window + [token.string])[-4:]
+            if len(window) == 4 and window[0] == "if" and \
+                    MAIN_NAME in (window[1], window[3]) and \
+                    window[2] == "==" and \
+                    MAIN_VALUE in (window[1].strip("\"'"),
+                                   window[3].strip("\"'")):
+                return True
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return False
+
+
+def has_entry_point(file_path: str) -> bool:
+    """Check if the file contains the entry point.
+
+    Args:
+    file_path (str)= path to the python file
+
+    Returns:
+    True if the file has the '__main__' guard
+    """
+    try:
+        if not contains_main_token(file_path):
+            return False
+        with open(file_path, "rb") as file_in:
+            content = file_in.read()
+        try:
+            return parse_entry_point(content)
+        except (SyntaxError, ValueError):
+            return tokenize_entry_point(content)
+    except Exception as e:
+        logger.error("Search for the main entry point in the file '%s' "
+                     "failed(%s).", file_path, e)
+    return False
+
+
+def detect_entry_points(file_paths: list) -> dict:
+    """Detect the entry point in the files in parallel on a thread pool.
+
+    Args:
+    file_paths (list)= a list of the python files
+
+    Returns:
+    A dict in format '<path_to_file>: <has entry point>'
+    """
+    detected = {}
+    if file_paths:
+        with ThreadPoolExecutor(max_workers=DETECT_WORKERS) as executor:
+            for file_path, is_main in zip(
+                    file_paths, executor.map(has_entry_point, file_paths)):
+                detected[file_path] = is_main
+    return detected
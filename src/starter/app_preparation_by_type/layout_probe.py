@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""One-shot classification of the app folder.
+
+The files identifying the type of the app(the wheel, setup.py, the toml
+files, the requirements) and its package roots are picked from the
+shared tree scanner once per launch. All the type processors ask the
+probe instead of searching the folder again.
+"""
+
+import fnmatch
+import logging
+from pathlib import Path
+
+from starter.app_preparation_by_type.common import DEPENDENCIES_REGEX
+from starter.app_preparation_by_type.scanner import TreeScanner
+
+__all__ = ['AppLayoutProbe']
+
+WHEEL_FILE = "*.whl"
+SETUP_FILE = "setup.py"
+PYPROJECT_FILE = "pyproject.toml"
+TOML_FILE = "*.toml"
+PACKAGE_MARKER = "__init__.py"
+
+logger = logging.getLogger(__name__)
+
+
+class AppLayoutProbe():
+    """Classifies the app folder(follows the refresh of the scanner)."""
+    def __init__(self, /, **kwargs):
+        self.app_path = kwargs.get("app_path", None)
+        # Shared scanner of the app folder(walks the tree only once)
+        self.scanner = kwargs.get("scanner", None) or \
+            TreeScanner(root_folder=self.app_path)
+        # The scan the layout was classified from
+        self.scanned_files = None
+        self.wheel_file = None
+        self.setup_file = None
+        self.pyproject_file = None
+        self.toml_files = []
+        self.requirement_files = []
+        self.package_roots = []
+        self.root_entries = []
+
+    def probe(self):
+        """Classify the app folder(only if not done for the current scan)."""
+        files = self.scanner.scan()
+        if files is self.scanned_files:
+            return
+        self.scanned_files = files
+        root_files = sorted(path for path in files if "/" not in path)
+        root_folders = sorted(path for path in self.scanner.get_folders()
+                              if "/" not in path)
+        wheel_files = fnmatch.filter(root_files, WHEEL_FILE)
+        self.wheel_file = self.get_path(wheel_files[0]) if wheel_files \
+            else None
+        self.setup_file = self.get_path(SETUP_FILE) if SETUP_FILE in \
+            root_files else None
+        self.pyproject_file = self.get_path(PYPROJECT_FILE) if \
+            PYPROJECT_FILE in root_files else None
+        self.toml_files = [self.get_path(path) for path in sorted(files)
+                           if fnmatch.fnmatch(path.rsplit("/", 1)[-1],
+                                              TOML_FILE)]
+        self.requirement_files = [
+            self.get_path(path) for path in fnmatch.filter(
+                root_files, DEPENDENCIES_REGEX)]
+        self.package_roots = self.find_package_roots(files)
+        # Like the glob '*'(no hidden files)
+        self.root_entries = [self.get_path(path) for path in
+                             sorted(root_files + root_folders)
+                             if not path.startswith(".")]
+        logger.info("The app layout: wheel=%s, setup=%s, pyproject=%s, "
+                    "%s requirement file(s), %s package root(s).",
+                    self.wheel_file, self.setup_file, self.pyproject_file,
+                    len(self.requirement_files), len(self.package_roots))
+
+    def find_package_roots(self, files: dict) -> list:
+        """Get the top-most folders with '__init__.py'.
+
+        Args:
+        files (dict)= the scanned files
+
+        Returns:
+        A sorted list of the relative paths of the package roots
+        """
+        packages = set(path.rsplit("/", 1)[0] for path in files
+                       if path.endswith("/" + PACKAGE_MARKER))
+        return sorted(package for package in packages
+                      if package.rpartition("/")[0] not in packages)
+
+    def get_path(self, relative_path: str) -> str:
+        """Get the full path of the file in the app folder."""
+        return str(Path(self.app_path).joinpath(relative_path))
+
+    def get_wheel_file(self) -> str | None:
+        """Returns the wheel of the app."""
+        self.probe()
+        return self.wheel_file
+
+    def get_setup_file(self) -> str | None:
+        """Returns the setup.py of the app."""
+        self.probe()
+        return self.setup_file
+
+    def get_pyproject_file(self) -> str | None:
+        """Returns the pyproject.toml of the app."""
+        self.probe()
+        return self.pyproject_file
+
+    def get_toml_files(self) -> list:
+        """Returns the toml files of the app(at any depth)."""
+        self.probe()
+        return self.toml_files
+
+    def get_requirement_files(self) -> list:
+        """Returns the requirement files of the app."""
+        self.probe()
+        return self.requirement_files
+
+    def get_package_roots(self) -> list:
+        """Returns the package roots of the app(relative paths)."""
+        self.probe()
+        return self.package_roots
+
+    def get_extra_files(self) -> list:
+        """Returns the files and folders of the app except the wheel."""
+        self.probe()
+        return [path for path in self.root_entries
+                if path != self.wheel_file]
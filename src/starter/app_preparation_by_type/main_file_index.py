@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""Persisted index of the files with the entry point(main files).
+
+The result of the entry point detection is stored with the stat
+fingerprint of every searched file, so only the new or changed files
+are read again on the next launch.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+from starter.app_preparation_by_type.entry_point import (
+    DETECTOR_VERSION,
+    detect_entry_points
+)
+from starter.app_preparation_by_type.manifest import (
+    fingerprint_matches,
+    get_files_stats,
+    get_stat_fingerprint
+)
+
+__all__ = ['MainFileIndex']
+
+PYTHON_FILES = ["*.py"]
+INDEX_MAIN = "main"
+INDEX_DETECTOR = "detector"
+
+logger = logging.getLogger(__name__)
+
+
+class MainFileIndex():
+    """Serves the main files of the folder from the index."""
+    def __init__(self, /, **kwargs):
+        # Not persisted if not set
+        self.index_file = kwargs.get("index_file", None)
+        self.index = None
+
+    def get_index_file(self) -> str | None:
+        """Returns the path to the index file."""
+        return self.index_file
+
+    def load(self) -> dict:
+        """Load the index {folder: {relative path: entry}}."""
+        if self.index is None:
+            self.index = {}
+            if self.index_file and Path(self.index_file).exists():
+                try:
+                    with open(self.index_file, "r",
+                              encoding="utf-8") as index_in:
+                        self.index = json.loads(index_in.read())
+                except Exception as e:
+                    logger.warning("The main file index %s is not valid"
+                                   "(%s).", self.index_file, e)
+        return self.index
+
+    def save(self):
+        """Store the index(replaced, not rewritten)."""
+        if not self.index_file or self.index is None:
+            return
+        try:
+            temporary_file = str(self.index_file) + ".tmp"
+            with open(temporary_file, "w", encoding="utf-8") as index_out:
+                index_out.write(json.dumps(self.index))
+            os.replace(temporary_file, self.index_file)
+        except Exception as e:
+            logger.error("Storing the main file index failed(%s).", e)
+
+    def get_main_files(self, folder: str, scanner=None) -> list:
+        """Get the python files of the folder with the entry point.
+
+        Args:
+        folder (str)= the folder to search(recursively)
+        scanner = the shared tree scanner of the folder, if exists
+
+        Returns:
+        A sorted list of paths to the main files
+        """
+        folder_key = os.path.normcase(os.path.abspath(folder))
+        previous = self.load().get(folder_key, {})
+        current = {}
+        to_detect = []
+        for relative_path, stat_result in get_files_stats(
+                folder, PYTHON_FILES, scanner).items():
+            entry = get_stat_fingerprint(stat_result)
+            previous_entry = previous.get(relative_path)
+            if fingerprint_matches(previous_entry, entry) and \
+                    INDEX_MAIN in previous_entry and \
+                    previous_entry.get(INDEX_DETECTOR) == DETECTOR_VERSION:
+                entry[INDEX_MAIN] = previous_entry[INDEX_MAIN]
+                entry[INDEX_DETECTOR] = DETECTOR_VERSION
+            else:
+                to_detect.append(relative_path)
+            current[relative_path] = entry
+        detected = detect_entry_points(
+            [str(Path(folder).joinpath(relative_path))
+             for relative_path in to_detect])
+        for relative_path in to_detect:
+            current[relative_path][INDEX_MAIN] = detected[
+                str(Path(folder).joinpath(relative_path))]
+            current[relative_path][INDEX_DETECTOR] = DETECTOR_VERSION
+        if to_detect or current.keys() != previous.keys():
+            logger.info("Searched %s of %s file(s) for the entry point.",
+                        len(to_detect), len(current))
+            self.index[folder_key] = current
+            self.save()
+        return [str(Path(folder).joinpath(relative_path))
+                for relative_path, entry in sorted(current.items())
+                if entry[INDEX_MAIN]]
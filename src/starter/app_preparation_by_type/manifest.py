@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""Manifest of the app files used to detect real content changes.
+
+Every file is described by its stat fingerprint (size, mtime in ns and
+inode) and by a BLAKE2 hash of its content. The stat fingerprint is the
+fast path, the content is hashed only if the fingerprint differs from
+the stored one (e.g. after 'git checkout' or a CI copy).
+"""
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from starter.app_preparation_by_type.change_set import ChangeSet
+from starter.app_preparation_by_type.scanner import TreeScanner
+
+__all__ = ['get_manifest_of_files', 'get_change_set',
+           'get_change_set_by_manifest', 'store_manifest']
+
+MANIFEST_SIZE = "size"
+MANIFEST_MTIME = "mtime_ns"
+MANIFEST_INODE = "inode"
+MANIFEST_HASH = "hash"
+FINGERPRINT_KEYS = [MANIFEST_SIZE, MANIFEST_MTIME, MANIFEST_INODE]
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+logger = logging.getLogger(__name__)
+
+
+def get_stat_fingerprint(stat_result: os.stat_result) -> dict:
+    """Get the stat fingerprint of the file.
+
+    Args:
+    stat_result (os.stat_result)= the stat result of the file
+
+    Returns:
+    A dict with size, mtime(ns) and inode of the file
+    """
+    return {
+        MANIFEST_SIZE: stat_result.st_size,
+        MANIFEST_MTIME: stat_result.st_mtime_ns,
+        MANIFEST_INODE: stat_result.st_ino
+    }
+
+
+def fingerprint_matches(previous_entry, current_entry: dict) -> bool:
+    """Check if the stat fingerprint of both entries is the same.
+
+    Args:
+    previous_entry = the stored entry (can be in the old format)
+    current_entry (dict)= the current entry
+
+    Returns:
+    True if the fingerprints match, otherwise False
+    """
+    if not isinstance(previous_entry, dict):
+        return False
+    return all(previous_entry.get(key) == current_entry.get(key)
+               for key in FINGERPRINT_KEYS)
+
+
+def hash_file(file_path: str) -> str | None:
+    """Get the BLAKE2 hash of the file content.
+
+    Args:
+    file_path (str)= path to the file
+
+    Returns:
+    Hex digest of the content or None
+    """
+    digest = hashlib.blake2b()
+    try:
+        with open(file_path, "rb") as file_in:
+            for chunk in iter(lambda: file_in.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except Exception as e:
+        logger.error("Hashing the file %s failed(%s).", file_path, e)
+        return None
+    return digest.hexdigest()
+
+
+def hash_files(file_paths: list) -> dict:
+    """Hash the files in parallel on a thread pool.
+
+    Args:
+    file_paths (list)= a list of the files to hash
+
+    Returns:
+    A dict in format '<path_to_file>: <hash>'
+    """
+    hashes = {}
+    if file_paths:
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+            for file_path, digest in zip(
+                    file_paths, executor.map(hash_file, file_paths)):
+                hashes[file_path] = digest
+    return hashes
+
+
+def get_files_stats(folder_path: str, filters, scanner=None) -> dict:
+    """Get the stat results of the files matching the filters.
+
+    Args:
+    folder_path (str)= path to the folder to search
+    filters = list of required files(mandatory arg)
+    scanner = the shared tree scanner of the folder, if exists
+
+    Returns:
+    A dict in format '<relative_path>: <os.stat_result>'
+    """
+    if scanner and scanner.is_root_folder(folder_path):
+        return scanner.get_files(filters)
+    return TreeScanner(root_folder=folder_path).get_files(filters)
+
+
+def get_manifest_of_files(folder_path: str,
+                          filters,
+                          previous_manifest: dict | None = None,
+                          scanner=None) -> dict:
+    """Get the manifest of the files from the given folder.
+
+    The hash from the previous manifest is reused for every file whose
+    stat fingerprint didn't change, the rest is hashed in parallel.
+
+    Args:
+    folder_path (str)= path to the folder to search
+    filters = list of required files(mandatory arg)
+    previous_manifest (dict)= the stored manifest, if exists
+    scanner = the shared tree scanner of the folder, if exists
+
+    Returns:
+    A dict in format '<relative_path>: {size, mtime_ns, inode, hash}'
+    """
+    manifest = {}
+    previous_manifest = previous_manifest or {}
+    to_hash = []
+    for key, stat_result in get_files_stats(
+            folder_path, filters, scanner).items():
+        entry = get_stat_fingerprint(stat_result)
+        previous_entry = previous_manifest.get(key)
+        if fingerprint_matches(previous_entry, entry) \
+                and previous_entry.get(MANIFEST_HASH):
+            entry[MANIFEST_HASH] = previous_entry[MANIFEST_HASH]
+        else:
+            to_hash.append(key)
+        manifest[key] = entry
+    if to_hash:
+        hashes = hash_files(
+            [str(Path(folder_path).joinpath(key)) for key in to_hash])
+        for key in to_hash:
+            manifest[key][MANIFEST_HASH] = hashes.get(
+                str(Path(folder_path).joinpath(key)))
+    return manifest
+
+
+def get_change_set(previous_manifest: dict,
+                   current_manifest: dict) -> ChangeSet:
+    """Compare the content of both manifests.
+
+    Args:
+    previous_manifest (dict)= the stored manifest
+    current_manifest (dict)= the current manifest
+
+    Returns:
+    The change set(added, removed and modified files)
+    """
+    added = []
+    modified = []
+    for key, entry in current_manifest.items():
+        previous_entry = previous_manifest.get(key)
+        if previous_entry is None:
+            added.append(key)
+        elif not isinstance(previous_entry, dict) \
+                or entry.get(MANIFEST_HASH) is None \
+                or previous_entry.get(MANIFEST_HASH) != entry.get(MANIFEST_HASH):
+            modified.append(key)
+    removed = [key for key in previous_manifest
+               if key not in current_manifest]
+    return ChangeSet(added=added, removed=removed, modified=modified)
+
+
+def manifest_changed(previous_manifest: dict, current_manifest: dict) -> bool:
+    """Check if the content of any file changed(added/removed included).
+
+    Args:
+    previous_manifest (dict)= the stored manifest
+    current_manifest (dict)= the current manifest
+
+    Returns:
+    True if the content changed, otherwise False
+    """
+    return bool(get_change_set(previous_manifest, current_manifest))
+
+
+def get_change_set_by_manifest(config_handler,
+                               app_path: str,
+                               filters,
+                               scanner=None) -> ChangeSet:
+    """Get the changes of the app files since the last run.
+
+    If only the stat fingerprints changed, the stored manifest is
+    refreshed so the next run can use the fast path again.
+
+    Args:
+    config_handler = the config handler storing the manifest
+    app_path (str)= path to the app folder
+    filters = list of required files
+    scanner = the shared tree scanner of the app folder, if exists
+
+    Returns:
+    The change set (initial, if there is no stored manifest).
+    """
+    change_set = ChangeSet()
+    previous_manifest = config_handler.get_app_files()
+    if previous_manifest and app_path:
+        current_manifest = get_manifest_of_files(
+            app_path, filters, previous_manifest, scanner)
+        change_set = get_change_set(previous_manifest, current_manifest)
+        if not change_set and current_manifest != previous_manifest:
+            config_handler.set_app_files(current_manifest)
+    elif not previous_manifest and app_path:
+        change_set = ChangeSet(initial=True)
+    return change_set
+
+
+def store_manifest(config_handler, app_path: str, filters, scanner=None):
+    """Store the current manifest of the app files for the next run.
+
+    Args:
+    config_handler = the config handler storing the manifest
+    app_path (str)= path to the app folder
+    filters = list of required files
+    scanner = the shared tree scanner of the app folder, if exists
+    """
+    current_manifest = get_manifest_of_files(
+        app_path,
+        filters,
+        previous_manifest=config_handler.get_app_files(),
+        scanner=scanner
+    )
+    if current_manifest:
+        config_handler.set_app_files(current_manifest)
@@ -1,29 +1,37 @@
 # -*- coding: utf-8 -*-
 """Class for other approach, using install tool, setup."""
 
-import glob
 import logging
 import re
 import traceback
 from collections import Counter
 from pathlib import Path
 
+from starter.app_preparation_by_type.change_set import ChangeSet
 from starter.app_preparation_by_type.common import (
-    get_list_of_files_and_timestamp,
-    get_all_dependencies_setuptools_approach
+    DEPENDENCIES_REGEX,
+    install_dependencies_delta
 )
 from starter.app_preparation_by_type.dummy_setup import DummySetup
+from starter.app_preparation_by_type.layout_probe import AppLayoutProbe
+from starter.app_preparation_by_type.main_file_index import MainFileIndex
+from starter.app_preparation_by_type.manifest import (
+    get_change_set_by_manifest,
+    store_manifest
+)
+from starter.app_preparation_by_type.scanner import TreeScanner
 from starter.app_preparation_by_type.type import TypeOfPackage
+from starter.app_preparation_by_type.update_planner import UpdatePlan
+from starter.tracing import trace
 
 
 __all__ = ['OtherProcessing']
 
 
 SETUP_FILE = 'setup.py'
-FILES_CHANGED_FILTER = ["*.py"]
+FILES_CHANGED_FILTER = ["*.py", "pyproject.toml", DEPENDENCIES_REGEX]
 TOML_FILE = '(.*).toml$'
 REQUIRED_FILES = [TOML_FILE]
-ENTRY_POINT = 'if __name__ == "__main__"'
 POETRY_INSTALLATION_ARGS = ["-m", "pip", "install", "-e", "."]
 
 logger = logging.getLogger(__name__)
@@ -38,66 +46,65 @@ class OtherProcessing(TypeOfPackage):
         self.app_path = kwargs.get("app_path", None)
         self.config_handler = kwargs.get("config_handler", None)
         self.platform_handler = kwargs.get("platform_handler", None)
+        # The lock of the installed requirements(installs only the delta)
+        self.requirements_lock = kwargs.get("requirements_lock", None)
+        # Shared scanner of the app folder(walks the tree only once)
+        self.scanner = kwargs.get("scanner", None) or \
+            TreeScanner(root_folder=self.app_path)
+        # The layout of the app folder(classified once per launch)
+        self.layout_probe = kwargs.get("layout_probe", None) or \
+            AppLayoutProbe(app_path=self.app_path, scanner=self.scanner)
+        # The index of the files with the entry point
+        self.main_file_index = kwargs.get("main_file_index", None) or \
+            MainFileIndex()
 
         self.setup_dummy = DummySetup()
 
     def install_and_start(
                 self,
                 start_fresh=False,
-                continue_processing=True):
+                continue_processing=True,
+                update_plan=None):
         """Install dependencies, the app and start it.
 
         Args:
         start_fresh (bool) = flag to clear the environment and reinstall it
         continoue_processing (bool)= flag signaling 'try to install and start'
+        update_plan (UpdatePlan)= what needs to be installed(overrides
+                                  'start_fresh')
 
         Returns:
         True if the next step in the chain should continue to try to install
         and start."
         """
         should_continue = continue_processing
+        if update_plan is None:
+            update_plan = UpdatePlan(rebuild=start_fresh)
         # Should we continue?
         if continue_processing and self.it_is_me():
-            if start_fresh and self.platform_handler:
+            if update_plan.has_changes() and self.platform_handler:
                 should_continue = False
-                current_list = get_list_of_files_and_timestamp(
+                logger.info("Updating the app(%s).", update_plan)
+                # Store the app file info for the next run
+                store_manifest(
+                    self.config_handler,
                     self.app_path,
-                    filters=FILES_CHANGED_FILTER + REQUIRED_FILES
+                    FILES_CHANGED_FILTER + REQUIRED_FILES,
+                    scanner=self.scanner
                 )
-                # Store the app file info for the next run
-                if current_list:
-                    self.config_handler.set_app_files(current_list)
                 try:
-                    # Need to create setup.py --> use setuptools
-                    setup_file = Path(self.app_path).joinpath(
-                        SETUP_FILE)
-                    if not setup_file.exists():
-                        self.setup_dummy.create_dummy_setup(
-                            folder_to_create=self.app_path,
-                            app_root_folder=self.search_common_root_folder()
-                        )
-                    # Does the setup.py file exists?
-                    if setup_file.exists():
-                        # Install additonal dependencies
-                        dependencies = \
-                            get_all_dependencies_setuptools_approach(
-                                self.app_path)
-                        if dependencies:
-                            self.platform_handler.install_dependencies(
-                                dependencies
-                            )
-                        self.platform_handler.install_app(
-                            self.app_path,
-                            self.get_install_args()
+                    # Install additonal dependencies
+                    if update_plan.install_dependencies:
+                        failed = install_dependencies_delta(
+                            self.platform_handler,
+                            self.requirements_lock,
+                            self.get_requirements()
                         )
-                        # Remove the dummy setup file
-                        self.setup_dummy.remove(setup_file)
-                    else:
-                        # If the setup.py file doesn't exist, raise an error
-                        logger.error(
-                            "The setup.py file doesn't exist at '%s'.",
-                            setup_file)
-                        raise RuntimeError
+                        if failed:
+                            logger.warning(
+                                "Dependencies not installed: %s.", failed)
+                    if update_plan.install_app:
+                        self.install_app()
                 except Exception as e:
                     # Something went wrong --> clear the app files
                     # The next run will be detected as a fresh start
@@ -108,7 +115,8 @@ class OtherProcessing(TypeOfPackage):
             # Can we continue
             if self.platform_handler:
                 # Search for main files
-                main_files = self.search_for_main_files()
+                with trace("main_file_search"):
+                    main_files = self.search_for_main_files()
                 exception_counter = 0
                 for item in sorted(main_files):
                     try:
@@ -138,27 +146,44 @@ class OtherProcessing(TypeOfPackage):
                     during of other's installation.")
         return should_continue
 
-    def files_changed(self) -> bool:
-        """Check if files/folders changed."""
-        changed = False
-        previous_list = self.config_handler.get_app_files()
-        if previous_list and self.app_path:
-            current_list = get_list_of_files_and_timestamp(
+    def install_app(self):
+        """Install the app using setuptools(a dummy setup.py is created,
+        if needed)."""
+        # Need to create setup.py --> use setuptools
+        setup_file = Path(self.app_path).joinpath(
+            SETUP_FILE)
+        if not setup_file.exists():
+            self.setup_dummy.create_dummy_setup(
+                folder_to_create=self.app_path,
+                app_root_folder=self.search_common_root_folder()
+            )
+        # Does the setup.py file exists?
+        if setup_file.exists():
+            self.platform_handler.install_app(
                 self.app_path,
-                filters=FILES_CHANGED_FILTER + REQUIRED_FILES
+                self.get_install_args()
             )
-            # Check old list vs. current list
-            for key, value in current_list.items():
-                if key in previous_list:
-                    if previous_list[key] != value:
-                        changed = True
-                        break
-                else:
-                    changed = True
-                    break
-        elif not previous_list and self.app_path:
-            changed = True
-        return changed
+            # Remove the dummy setup file
+            self.setup_dummy.remove(setup_file)
+        else:
+            # If the setup.py file doesn't exist, raise an error
+            logger.error(
+                "The setup.py file doesn't exist at '%s'.",
+                setup_file)
+            raise RuntimeError
+
+    def files_changed(self) -> bool:
+        """Check if the files/folders have changed."""
+        return bool(self.get_change_set())
+
+    def get_change_set(self) -> ChangeSet:
+        """Get the added, removed and modified files of the app."""
+        return get_change_set_by_manifest(
+            self.config_handler,
+            self.app_path,
+            FILES_CHANGED_FILTER + REQUIRED_FILES,
+            scanner=self.scanner
+        )
 
     def it_is_me(self) -> bool:
         """Try to assume that this app can be installed via setuptools.
@@ -168,13 +193,7 @@ class OtherProcessing(TypeOfPackage):
         Returns:
         In case yes, returns True, othewise False
         """
-        valid = False
-        if self.app_path and Path(self.app_path).exists():
-            root_files = Path(self.app_path).glob("**/*")
-            for file in root_files:
-                if re.search(TOML_FILE, str(file)):
-                    valid = True
-        return valid
+        return bool(self.layout_probe.get_toml_files())
 
     def search_for_main_files(self, folder_path: str = None) -> set:
         """Search for main file along in the path to app's source code.
@@ -196,22 +215,18 @@ class OtherProcessing(TypeOfPackage):
                 self.config_handler.get_main_file()
             if config_main_file:
                 # Lets find the file
-                founded_files = Path(search_folder).\
-                    rglob(config_main_file)
+                if self.scanner.is_root_folder(search_folder):
+                    founded_files = self.scanner.get_paths(
+                        [config_main_file])
+                else:
+                    founded_files = Path(search_folder).\
+                        rglob(config_main_file)
                 for file in founded_files:
                     all_main_files.append(str(file))
             else:
-                founded_files = Path(search_folder).rglob("*.py")
-                # Check which contains entry point
-                for file in founded_files:
-                    try:
-                        with open(str(file), "r") as file_read:
-                            if re.search(ENTRY_POINT, file_read.read()):
-                                all_main_files.append(str(file))
-                    except Exception as e:
-                        logger.error(
-                            "Search for main entry point in file '%s'\
-                            failed(%s).", file, e)
+                # Files with the entry point(read only if changed)
+                all_main_files.extend(self.main_file_index.get_main_files(
+                    search_folder, self.scanner))
         except Exception as e:
             logger.error("Search for main file failed. %s", e)
 
@@ -220,7 +235,8 @@ class OtherProcessing(TypeOfPackage):
     def search_common_root_folder(self, app_path: str = None) -> str:
         """Get to common root folder of all .py files.
 
-        Info is extracted from 'pyproject.toml' file.
+        Info is extracted from 'pyproject.toml' file, otherwise the folder
+        containing all the package roots of the layout probe is used.
         It helps to install the whole app.
 
         Args:
@@ -230,15 +246,20 @@ class OtherProcessing(TypeOfPackage):
         if app_path:
             root_folder = app_path
         try:
-            if self.app_path:
-                glob_search = Path(self.app_path).joinpath("pyproject.toml")
-                if glob_search.exists():
-                    file = glob.glob(str(glob_search))
-                    if file:
-                        packages = self.process_pyproject_file(file[-1])
-                        if packages:
-                            root_folder = self.get_common_root_folder(
-                                list(packages))
+            packages = None
+            pyproject_file = self.layout_probe.get_pyproject_file()
+            if pyproject_file:
+                packages = self.process_pyproject_file(pyproject_file)
+            if packages:
+                root_folder = self.get_common_root_folder(
+                    list(packages))
+            else:
+                # The folders containing the package roots
+                parents = set(str(Path(package).parent) for package
+                              in self.layout_probe.get_package_roots())
+                if len(parents) == 1 and "." not in parents:
+                    root_folder = str(
+                        Path(self.app_path).joinpath(parents.pop()))
         except Exception as e:
             logger.error("Search for common root folder failed(%s).", e)
             raise
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""The lock of the requirements installed in the venv.
+
+The normalized set of the last successfully installed requirements is
+stored next to the context file, so the next run installs only the
+added/changed requirements and uninstalls the removed ones.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+
+__all__ = ['RequirementsLock', 'normalize_requirement',
+           'get_requirement_name']
+
+LOCK_REQUIREMENTS = "requirements"
+REQUIREMENT_NAME_REGEX = r"^([A-Za-z0-9][A-Za-z0-9._-]*)(.*)$"
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_name(name: str) -> str:
+    """Normalize the name of the distribution (PEP 503).
+
+    Args:
+    name (str)= the name of the distribution
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def normalize_requirement(requirement: str) -> str:
+    """Normalize the requirement line(the key of the lock).
+
+    The name is normalized and the whitespaces are removed, e.g.
+    'Django >= 4.0' --> 'django>=4.0'. The options(e.g. '-r file') and
+    other lines without a name are only stripped. The normalized line is
+    only compared, it's not valid for pip(e.g. the markers with 'in').
+
+    Args:
+    requirement (str)= the requirement line
+    """
+    requirement = requirement.split(" #", 1)[0].strip()
+    match = re.match(REQUIREMENT_NAME_REGEX, requirement)
+    if match:
+        return normalize_name(match.group(1)) + \
+            re.sub(r"\s+", "", match.group(2))
+    return requirement
+
+
+def get_requirement_name(requirement: str) -> str | None:
+    """Get the normalized name of the requirement.
+
+    Args:
+    requirement (str)= the requirement line
+
+    Returns:
+    The name or None(the line is an option, URL etc.)
+    """
+    match = re.match(REQUIREMENT_NAME_REGEX, requirement.strip())
+    if match:
+        # The extras(e.g. 'package[extra]') aren't part of the name
+        return normalize_name(match.group(1))
+    return None
+
+
+class RequirementsLock():
+    """Manages the lock file of the installed requirements."""
+    def __init__(self, /, **kwargs):
+        self.lock_file = kwargs.get("lock_file", None)
+
+    def get_lock_file(self) -> str | None:
+        """Returns the path to the lock file."""
+        return self.lock_file
+
+    def load(self) -> set:
+        """Load the requirements installed last time.
+
+        Returns:
+        A set of normalized requirements(empty if nothing is locked)
+        """
+        requirements = set()
+        if self.lock_file and Path(self.lock_file).exists():
+            try:
+                with open(self.lock_file, "r", encoding='utf-8') as lock_in:
+                    content = json.loads(lock_in.read())
+                    requirements = set(content.get(LOCK_REQUIREMENTS, []))
+            except Exception as e:
+                logger.warning(
+                    "The requirements lock %s is not valid(%s).",
+                    self.lock_file, e)
+        return requirements
+
+    def save(self, requirements):
+        """Store the successfully installed requirements.
+
+        Args:
+        requirements = the installed requirements
+        """
+        if self.lock_file:
+            try:
+                normalized = sorted(
+                    normalize_requirement(item) for item in requirements)
+                with open(self.lock_file, "w", encoding='utf-8') as lock_out:
+                    lock_out.write(json.dumps(
+                        {LOCK_REQUIREMENTS: normalized}, indent=4))
+            except Exception as e:
+                logger.error(
+                    "Saving the requirements lock %s failed(%s).",
+                    self.lock_file, e)
+
+    def remove(self):
+        """Remove the lock file(everything gets installed next time)."""
+        if self.lock_file and Path(self.lock_file).exists():
+            Path(self.lock_file).unlink(missing_ok=True)
+
+    def get_delta(self, requirements) -> tuple:
+        """Compare the requirements with the locked ones.
+
+        Args:
+        requirements = the current requirements of the app
+
+        Returns:
+        A tuple (original lines to install, names to uninstall)
+        """
+        locked = self.load()
+        # The normalized key --> the line for pip
+        original_lines = {}
+        for item in requirements:
+            original_lines.setdefault(normalize_requirement(item),
+                                      item.split(" #", 1)[0].strip())
+        current = set(original_lines)
+        to_install = {original_lines[key] for key in current - locked}
+        current_names = {get_requirement_name(item) for item in current}
+        to_uninstall = {get_requirement_name(item) for item in locked
+                        if get_requirement_name(item)
+                        and get_requirement_name(item) not in current_names}
+        return (to_install, to_uninstall)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Single-pass scanner of the app folder.
+
+The app folder is walked only once per launch (os.scandir) and the stat
+results are cached, so every type processor can filter them by its own
+patterns without walking the tree again.
+"""
+
+import fnmatch
+import logging
+import os
+from pathlib import Path
+
+from starter.tracing import trace
+
+__all__ = ['TreeScanner']
+
+# Folders skipped during the walk
+PRUNED_FOLDERS = [".git", "__pycache__", "node_modules"]
+# The file identifying a (nested) venv, which is skipped as well
+VENV_MARKER = "pyvenv.cfg"
+
+logger = logging.getLogger(__name__)
+
+
+class TreeScanner():
+    """Walks the folder once and serves the cached stat results."""
+    def __init__(self, /, **kwargs):
+        self.root_folder = kwargs.get("root_folder", None)
+        self.pruned_folders = kwargs.get("pruned_folders", PRUNED_FOLDERS)
+        # '<relative_path>: <os.stat_result>' of all files and folders
+        self.files = None
+        self.folders = None
+        # The stat result of the root folder itself
+        self.root_stat = None
+
+    def get_root_folder(self) -> str | None:
+        """Returns the scanned folder."""
+        return self.root_folder
+
+    def is_root_folder(self, folder_path) -> bool:
+        """Check if the given folder is the scanned one.
+
+        Args:
+        folder_path = the folder to check
+        """
+        if not folder_path or not self.root_folder:
+            return False
+        return os.path.normcase(os.path.abspath(folder_path)) == \
+            os.path.normcase(os.path.abspath(self.root_folder))
+
+    def refresh(self):
+        """Forget the cached results, the next call walks the tree again."""
+        self.files = None
+        self.folders = None
+        self.root_stat = None
+
+    def scan(self) -> dict:
+        """Walk the tree(if not done yet) and return the files.
+
+        Returns:
+        A dict in format '<relative_path>: <os.stat_result>'
+        """
+        if self.files is None:
+            self.files = {}
+            self.folders = {}
+            if self.root_folder and Path(self.root_folder).is_dir():
+                with trace("scan", folder=str(self.root_folder)):
+                    self.root_stat = os.stat(str(self.root_folder),
+                                             follow_symlinks=False)
+                    self.walk(str(self.root_folder), "")
+        return self.files
+
+    def walk(self, folder: str, relative_folder: str):
+        """Walk the folder recursively(pruned folders are skipped).
+
+        Args:
+        folder (str)= the folder to walk
+        relative_folder (str)= the folder relative to the root folder
+        """
+        try:
+            with os.scandir(folder) as iterator:
+                entries = list(iterator)
+        except OSError as e:
+            logger.error("Scanning of the folder %s failed(%s).", folder, e)
+            return
+        # Nested venv --> skip it completely
+        if relative_folder and any(
+                entry.name == VENV_MARKER for entry in entries):
+            return
+        for entry in entries:
+            relative_path = relative_folder + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in self.pruned_folders:
+                        continue
+                    self.folders[relative_path] = entry.stat(
+                        follow_symlinks=False)
+                    self.walk(entry.path, relative_path + "/")
+                elif entry.is_file():
+                    self.files[relative_path] = entry.stat()
+            except OSError as e:
+                logger.error(
+                    "Problem processing(get stat) for file %s,\
+                    because %s.", entry.path, e)
+
+    def get_files(self, patterns=None, root_only=False) -> dict:
+        """Get the cached files matching any of the patterns.
+
+        The patterns behave like 'Path.rglob' patterns (or 'Path.glob'
+        ones if 'root_only' is set).
+
+        Args:
+        patterns = a list of patterns(all files if not set)
+        root_only (bool)= only the files from the root folder
+
+        Returns:
+        A dict in format '<relative_path>: <os.stat_result>'
+        """
+        files = {}
+        for relative_path, stat_result in self.scan().items():
+            if root_only and "/" in relative_path:
+                continue
+            if not patterns or any(self.matches(relative_path, pattern)
+                                   for pattern in patterns):
+                files[relative_path] = stat_result
+        return files
+
+    def get_paths(self, patterns=None, root_only=False) -> list:
+        """Get the full paths of the files matching any of the patterns.
+
+        Args:
+        patterns = a list of patterns(all files if not set)
+        root_only (bool)= only the files from the root folder
+
+        Returns:
+        A sorted list of paths
+        """
+        return [str(Path(self.root_folder).joinpath(relative_path))
+                for relative_path in sorted(
+                    self.get_files(patterns, root_only))]
+
+    def get_root_stat(self) -> os.stat_result | None:
+        """Get the stat result of the root folder(taken by the scan)."""
+        self.scan()
+        return self.root_stat
+
+    def get_folders(self) -> dict:
+        """Get the cached folders.
+
+        Returns:
+        A dict in format '<relative_path>: <os.stat_result>'
+        """
+        self.scan()
+        return self.folders
+
+    def matches(self, relative_path: str, pattern: str) -> bool:
+        """Check if the relative path matches the pattern.
+
+        Args:
+        relative_path (str)= the path relative to the root folder
+        pattern (str)= the pattern (e.g. '*.py' or 'src/main.py')
+        """
+        if "/" in pattern:
+            return fnmatch.fnmatch(relative_path, pattern) or \
+                fnmatch.fnmatch(relative_path, "*/" + pattern)
+        return fnmatch.fnmatch(relative_path.rsplit("/", 1)[-1], pattern)
@@ -2,30 +2,39 @@
 """A class for processing old-school style requirement files."""
 
 import logging
-import re
 import traceback
 from pathlib import Path
 
+from starter.app_preparation_by_type.change_set import ChangeSet
 from starter.app_preparation_by_type.common import (
-    get_all_dependencies_setuptools_approach,
-    get_list_of_files_and_timestamp
+    DEPENDENCIES_REGEX,
+    install_dependencies_delta
 )
 from starter.app_preparation_by_type.dummy_setup import DummySetup
+from starter.app_preparation_by_type.layout_probe import AppLayoutProbe
+from starter.app_preparation_by_type.main_file_index import MainFileIndex
+from starter.app_preparation_by_type.manifest import (
+    get_change_set_by_manifest,
+    store_manifest
+)
+from starter.app_preparation_by_type.scanner import TreeScanner
+from starter.app_preparation_by_type.type import TypeOfPackage
+from starter.app_preparation_by_type.update_planner import UpdatePlan
+from starter.tracing import trace
 
 __all__ = ['SetupProcessing']
 
-FILES_CHANGED_FILTER = ["*.py"]
+FILES_CHANGED_FILTER = ["*.py", DEPENDENCIES_REGEX]
 REQUIRED_FILES_REQUIREMENT_REGEX = "(.*)requirements(.*)"
 SETUP_FILE = 'setup.py'
 REQUIRED_FILES = [SETUP_FILE]
-ENTRY_POINT = 'if __name__ == "__main__"'
 SETUP_INSTALLATION_ARGS = ["-m", "pip", "install", "-e", "."]
 
 
 logger = logging.getLogger(__name__)
 
 
-class SetupProcessing():
+class SetupProcessing(TypeOfPackage):
     """This class performs searches and checks the app's requirements the
     old-school way, searching for files with names matching 'requirements,'.
     """
@@ -34,47 +43,67 @@ class SetupProcessing():
         self.app_path = kwargs.get("app_path", None)
         self.config_handler = kwargs.get("config_handler", None)
         self.platform_handler = kwargs.get("platform_handler", None)
+        # The lock of the installed requirements(installs only the delta)
+        self.requirements_lock = kwargs.get("requirements_lock", None)
+        # Shared scanner of the app folder(walks the tree only once)
+        self.scanner = kwargs.get("scanner", None) or \
+            TreeScanner(root_folder=self.app_path)
+        # The layout of the app folder(classified once per launch)
+        self.layout_probe = kwargs.get("layout_probe", None) or \
+            AppLayoutProbe(app_path=self.app_path, scanner=self.scanner)
+        # The index of the files with the entry point
+        self.main_file_index = kwargs.get("main_file_index", None) or \
+            MainFileIndex()
 
         self.setup_dummy = DummySetup()
 
     def install_and_start(self,
                           start_fresh=False,
-                          continue_processing=True
+                          continue_processing=True,
+                          update_plan=None
                           ) -> bool:
         """Install dependencies, set up the app and start it.
 
         Args:
         start_fresh = clear the environment and reinstall it
         continue_processing = a flag signaling 'try to install and start'
+        update_plan = what needs to be installed(overrides 'start_fresh')
 
         Returns:
         True if the next step in the chain should continue with the
         installation and startup process.
         """
         should_continue = continue_processing
+        if update_plan is None:
+            update_plan = UpdatePlan(rebuild=start_fresh)
         if continue_processing and self.it_is_me():
             # Check if we are supposed to install.
-            if start_fresh and self.platform_handler:
+            if update_plan.has_changes() and self.platform_handler:
                 should_continue = False
-                current_list = get_list_of_files_and_timestamp(
+                logger.info("Updating the setup app(%s).", update_plan)
+                store_manifest(
+                    self.config_handler,
                     self.app_path,
-                    filters=FILES_CHANGED_FILTER + REQUIRED_FILES
+                    FILES_CHANGED_FILTER + REQUIRED_FILES,
+                    scanner=self.scanner
                 )
-                if current_list:
-                    self.config_handler.set_app_files(current_list)
                 try:
                     # Setup tool approach --> *requirement*
-                    dependencies = get_all_dependencies_setuptools_approach(
-                        self.app_path)
-                    if dependencies:
-                        self.platform_handler.install_dependencies(
-                            dependencies
+                    if update_plan.install_dependencies:
+                        failed = install_dependencies_delta(
+                            self.platform_handler,
+                            self.requirements_lock,
+                            self.get_requirements()
                         )
+                        if failed:
+                            logger.warning(
+                                "Dependencies not installed: %s.", failed)
                     # Install the app
-                    self.platform_handler.install_app(
-                        self.app_path,
-                        self.get_install_args()
-                    )
+                    if update_plan.install_app:
+                        self.platform_handler.install_app(
+                            self.app_path,
+                            self.get_install_args()
+                        )
                 except Exception as e:
                     self.config_handler.remove_app_files()
                     logger.error(
@@ -83,7 +112,8 @@ class SetupProcessing():
                     raise
             if self.platform_handler:
                 # Start the app
-                main_files = self.search_for_main_files()
+                with trace("main_file_search"):
+                    main_files = self.search_for_main_files()
                 exception_counter = 0
                 for item in main_files:
                     try:
@@ -116,26 +146,17 @@ class SetupProcessing():
         return should_continue
 
     def files_changed(self) -> bool:
-        """Check if files/folders have changed."""
-        changed = False
-        previous_list = self.config_handler.get_app_files()
-        if previous_list and self.app_path:
-            current_list = get_list_of_files_and_timestamp(
-                self.app_path,
-                filters=FILES_CHANGED_FILTER + REQUIRED_FILES
-            )
-            # Compare the old list with the current list
-            for key, value in current_list.items():
-                if key in previous_list:
-                    if previous_list[key] != value:
-                        changed = True
-                        break
-                else:
-                    changed = True
-                    break
-        elif not previous_list and self.app_path:
-            changed = True
-        return changed
+        """Check if the files/folders have changed."""
+        return bool(self.get_change_set())
+
+    def get_change_set(self) -> ChangeSet:
+        """Get the added, removed and modified files of the app."""
+        return get_change_set_by_manifest(
+            self.config_handler,
+            self.app_path,
+            FILES_CHANGED_FILTER + REQUIRED_FILES,
+            scanner=self.scanner
+        )
 
     def search_for_main_files(self, folder_path=None) -> set:
         """Search for main files.
@@ -155,22 +176,18 @@ class SetupProcessing():
                 self.config_handler.get_main_file()
             if config_main_file:
                 # Let's find the file
-                founded_files = Path(search_folder).\
-                    rglob(config_main_file)
+                if self.scanner.is_root_folder(search_folder):
+                    founded_files = self.scanner.get_paths(
+                        [config_main_file])
+                else:
+                    founded_files = Path(search_folder).\
+                        rglob(config_main_file)
                 for file in founded_files:
                     all_main_files.append(str(file))
             else:
-                founded_files = Path(search_folder).rglob("*.py")
-                for file in sorted(founded_files):
-                    try:
-                        with open(
-                                str(file), "r", encoding='utf-') as file_read:
-                            if re.search(ENTRY_POINT, file_read.read()):
-                                all_main_files.append(str(file))
-                    except Exception as e:
-                        logger.error(
-                            "Search for the main entry point in the file '%s'\
-                            failed(%s).", file, e)
+                # Files with the entry point(read only if changed)
+                all_main_files.extend(self.main_file_index.get_main_files(
+                    search_folder, self.scanner))
 
         except Exception as e:
             logger.error("Search for the main file failed. %s", e)
@@ -185,15 +202,7 @@ class SetupProcessing():
         Returns:
         True if the app cant be installed, othewise False
         """
-        valid = False
-        if Path(self.app_path).exists():
-            root_files = Path(self.app_path).glob("*")
-            required = [file for file in root_files if
-                        re.search(SETUP_FILE, str(file.name))]
-            if required:
-                valid = True
-
-        return valid
+        return bool(self.layout_probe.get_setup_file())
 
     def find_setup_file(self, app_path=None) -> str | None:
         """Try to find the setup.py file, if exists.
@@ -208,7 +217,9 @@ class SetupProcessing():
         search_path = self.app_path
         if app_path:
             search_path = app_path
-        if Path(search_path).exists():
+        if self.scanner.is_root_folder(search_path):
+            setup_file_path = self.layout_probe.get_setup_file()
+        elif Path(search_path).exists():
             setup_file_path = list(Path(search_path).glob(SETUP_FILE))
             if setup_file_path:
                 setup_file_path = str(setup_file_path[0])
@@ -3,8 +3,14 @@
 
 from abc import ABC, abstractmethod
 
+from starter.app_preparation_by_type.common import (
+    get_all_dependencies_setuptools_approach
+)
+
 __all__ = ['TypeOfPackage']
 
+EDITABLE_INSTALL_FLAG = "-e"
+
 
 class TypeOfPackage(ABC):
     """Simple interface."""
@@ -24,6 +30,14 @@ class TypeOfPackage(ABC):
         True if changes occurred, otherwise False.
         """
 
+    @abstractmethod
+    def get_change_set(self):
+        """Get the changes of files/folders since the last run of the app.
+
+        Returns:
+        The change set with added, removed and modified paths.
+        """
+
     @abstractmethod
     def search_for_main_files(self, main_folder=None):
         """Search for the main file in the source code to use for startign the
@@ -35,3 +49,28 @@ class TypeOfPackage(ABC):
         Returns:
         Path(s) to the main file(s)
         """
+
+    @abstractmethod
+    def get_install_args(self):
+        """Get the args required for app installation.
+
+        Returns:
+        List of arguments.
+        """
+
+    def is_editable_install(self) -> bool:
+        """Check if the app is installed in the editable mode(pip -e).
+
+        Returns:
+        True if the changes of the source code don't require reinstall.
+        """
+        return EDITABLE_INSTALL_FLAG in self.get_install_args()
+
+    def get_requirements(self) -> set:
+        """Get the current requirements of the app(compared with the lock).
+
+        Returns:
+        A set of the requirement lines
+        """
+        return get_all_dependencies_setuptools_approach(
+            self.app_path, layout_probe=self.layout_probe)
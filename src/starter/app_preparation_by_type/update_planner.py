@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Maps the changes of the app files to the cheapest venv update.
+
+- source-only edits of an editable install: no action
+- requirement edits(or requirements not installed last time): install
+  the dependencies
+- pyproject.toml/setup.py edits: reinstall the app only
+- interpreter(ABI) changes or no usable venv: full rebuild
+"""
+
+import logging
+from pathlib import PurePosixPath
+
+from starter.app_preparation_by_type.change_set import (
+    CHANGE_BUILD,
+    CHANGE_DEPENDENCY,
+    CHANGE_SOURCE,
+    ChangeSet
+)
+from starter.common import (
+    INTERPRETER_FINGERPRINT,
+    get_interpreter_fingerprint
+)
+
+__all__ = ['UpdatePlan', 'UpdatePlanner']
+
+PACKAGE_MARKER = "__init__.py"
+
+logger = logging.getLogger(__name__)
+
+
+class UpdatePlan():
+    """The actions required to bring the venv up to date."""
+    def __init__(self, /, **kwargs):
+        self.rebuild = kwargs.get("rebuild", False)
+        # Rebuild means installing everything from scratch
+        self.install_dependencies = kwargs.get(
+            "install_dependencies", False) or self.rebuild
+        self.install_app = kwargs.get("install_app", False) or self.rebuild
+        self.change_set = kwargs.get("change_set", None) or ChangeSet()
+        self.reason = kwargs.get("reason", "")
+
+    def __bool__(self) -> bool:
+        return self.rebuild or self.install_dependencies or self.install_app
+
+    def __repr__(self) -> str:
+        return "UpdatePlan(rebuild=%s, install_dependencies=%s, " \
+            "install_app=%s, reason='%s')" % (
+                self.rebuild, self.install_dependencies,
+                self.install_app, self.reason)
+
+    def has_changes(self) -> bool:
+        """Check if there is anything to do or to record(the app files)."""
+        return bool(self) or bool(self.change_set)
+
+
+class UpdatePlanner():
+    """Decides how to update the existing venv."""
+    def __init__(self, /, **kwargs):
+        self.context_handler = kwargs.get("context_handler", None)
+        # The lock of the installed requirements
+        self.requirements_lock = kwargs.get("requirements_lock", None)
+        # The layout of the app folder(its package roots)
+        self.layout_probe = kwargs.get("layout_probe", None)
+
+    def requirements_pending(self, requirements) -> bool:
+        """Check if the requirements differ from the locked ones.
+
+        The requirements which failed to install aren't locked, so they are
+        installed again on the next run.
+
+        Args:
+        requirements = the current requirements of the app(not checked if
+                       None)
+        """
+        if requirements is None or not self.requirements_lock or \
+                not self.requirements_lock.get_lock_file():
+            return False
+        return any(self.requirements_lock.get_delta(requirements))
+
+    def interpreter_changed(self) -> bool:
+        """Check if the venv was created with a different interpreter.
+
+        Returns:
+        True if the stored fingerprint is missing or differs
+        """
+        stored = None
+        if self.context_handler:
+            stored = self.context_handler.get_value_for_key(
+                INTERPRETER_FINGERPRINT)
+        return stored != get_interpreter_fingerprint()
+
+    def packages_changed(self, change_set: ChangeSet) -> bool:
+        """Check if any package was added or removed.
+
+        Even an editable install needs to be reinstalled to pick up
+        a new (or to forget a removed) package. With the layout probe
+        only the package roots count, the subpackages of an installed
+        root are found through it.
+
+        Args:
+        change_set (ChangeSet)= the changes of the app files
+        """
+        package_roots = self.layout_probe.get_package_roots() if \
+            self.layout_probe else None
+        for path in change_set.added:
+            if PurePosixPath(path).name == PACKAGE_MARKER and (
+                    package_roots is None or
+                    str(PurePosixPath(path).parent) in package_roots):
+                return True
+        for path in change_set.removed:
+            if PurePosixPath(path).name == PACKAGE_MARKER and (
+                    package_roots is None or not any(
+                        PurePosixPath(path).is_relative_to(root)
+                        for root in package_roots)):
+                return True
+        return False
+
+    def plan(self,
+             change_set: ChangeSet,
+             editable: bool = True,
+             venv_ready: bool = True,
+             requirements=None) -> UpdatePlan:
+        """Get the cheapest plan for the given changes.
+
+        Args:
+        change_set (ChangeSet)= the changes of the app files
+        editable (bool)= the app is installed in the editable mode
+        venv_ready (bool)= the venv exists and its context is stored
+        requirements = the current requirements of the app(compared with
+                       the lock), if known
+
+        Returns:
+        The update plan
+        """
+        if not venv_ready or change_set.initial:
+            plan = UpdatePlan(rebuild=True,
+                              change_set=change_set,
+                              reason="no installed venv")
+        elif self.interpreter_changed():
+            plan = UpdatePlan(rebuild=True,
+                              change_set=change_set,
+                              reason="the interpreter changed")
+        elif not change_set and not self.requirements_pending(requirements):
+            plan = UpdatePlan(change_set=change_set)
+        else:
+            install_app = change_set.has_changes(CHANGE_BUILD) \
+                or self.packages_changed(change_set) \
+                or (not editable and change_set.has_changes(CHANGE_SOURCE))
+            plan = UpdatePlan(
+                install_dependencies=change_set.has_changes(
+                    CHANGE_DEPENDENCY) or
+                self.requirements_pending(requirements),
+                install_app=install_app,
+                change_set=change_set,
+                reason="incremental update")
+        logger.info("Update plan of the venv: %s.", plan)
+        return plan
@@ -1,47 +1,74 @@
 # -*- coding: utf-8 -*-
 """Class for the wheel approach."""
 
-import glob
 import logging
-import re
 import shutil
 import traceback
 from pathlib import Path
 
+from starter.app_preparation_by_type.change_set import ChangeSet
 from starter.app_preparation_by_type.common import (
-    get_all_dependencies_setuptools_approach,
-    get_list_of_files_and_timestamp
+    DEPENDENCIES_REGEX,
+    install_dependencies_delta
 )
+from starter.app_preparation_by_type.layout_probe import AppLayoutProbe
+from starter.app_preparation_by_type.main_file_index import MainFileIndex
+from starter.app_preparation_by_type.manifest import (
+    get_change_set_by_manifest,
+    store_manifest
+)
+from starter.app_preparation_by_type.scanner import TreeScanner
+from starter.app_preparation_by_type.type import TypeOfPackage
+from starter.app_preparation_by_type.update_planner import UpdatePlan
+from starter.app_preparation_by_type.wheel_metadata import (
+    read_installed_metadata,
+    read_wheel_metadata
+)
+from starter.tracing import trace
+from starter.venv_metadata import get_site_packages_folders
 
 __all__ = ['WheelProcessing']
 
 FILE_INSTALL = '*.whl'
-FILES_CHANGED_FILTER = [FILE_INSTALL]
-PYTHON_FILE_REGEX = "*.py"
-ENTRY_POINT = 'if __name__ == "__main__"'
+FILES_CHANGED_FILTER = [FILE_INSTALL, DEPENDENCIES_REGEX]
 WHEEL_INSTALLATION_ARGS = ["-m", "pip", "install"]
+WHEEL_REINSTALL_ARGS = ["--force-reinstall", "--no-deps"]
 
 logger = logging.getLogger(__name__)
 
 
-class WheelProcessing():
+class WheelProcessing(TypeOfPackage):
     """Processing the wheel package."""
     def __init__(self, /, **kwargs):
         self.app_path = kwargs.get("app_path", None)
         self.config_handler = kwargs.get("config_handler", None)
         self.platform_handler = kwargs.get("platform_handler", None)
+        # The lock of the installed requirements(installs only the delta)
+        self.requirements_lock = kwargs.get("requirements_lock", None)
+        # Shared scanner of the app folder(walks the tree only once)
+        self.scanner = kwargs.get("scanner", None) or \
+            TreeScanner(root_folder=self.app_path)
+        # The layout of the app folder(classified once per launch)
+        self.layout_probe = kwargs.get("layout_probe", None) or \
+            AppLayoutProbe(app_path=self.app_path, scanner=self.scanner)
+        # The index of the files with the entry point
+        self.main_file_index = kwargs.get("main_file_index", None) or \
+            MainFileIndex()
         self.env_structure = kwargs.get("env_structure", None)
         self.context_handler = kwargs.get("context_handler", None)
 
     def install_and_start(self,
                           start_fresh: bool = False,
-                          continue_processing: bool = True
+                          continue_processing: bool = True,
+                          update_plan: UpdatePlan | None = None
                           ) -> bool:
         """Install dependencies, the app and start it.
 
         Args:
         start_fresh (bool)= clears the environment and reinstall the app
         continoue_processing (bool)= flag signaling 'try to install and start'
+        update_plan (UpdatePlan)= what needs to be installed(overrides
+                                  'start_fresh')
 
         Returns:
         True if the next step in the chain should continue to try installing
@@ -49,35 +76,45 @@ class WheelProcessing():
         """
         should_countinue = continue_processing
         installation_file = None
+        if update_plan is None:
+            update_plan = UpdatePlan(rebuild=start_fresh)
         if continue_processing and self.it_is_me():
             # Gets the installation file
             installation_file = self.get_app_file()
-            if self.config_handler and start_fresh:
+            if self.config_handler and update_plan.has_changes():
                 should_countinue = False
-                current_list = get_list_of_files_and_timestamp(
+                logger.info("Updating the wheel app(%s).", update_plan)
+                store_manifest(
+                    self.config_handler,
                     self.app_path,
-                    filters=FILES_CHANGED_FILTER
+                    FILES_CHANGED_FILTER,
+                    scanner=self.scanner
                 )
-                if current_list:
-                    self.config_handler.set_app_files(
-                        current_list)
                 try:
-                    # Install the additional dependencies
-                    dependencies = get_all_dependencies_setuptools_approach(
-                        self.app_path)
-                    if dependencies:
-                        self.platform_handler.install_dependencies(
-                            dependencies
+                    # The new wheel may require new dependencies(only the
+                    # delta is installed)
+                    if update_plan.install_dependencies or \
+                            update_plan.install_app:
+                        failed = install_dependencies_delta(
+                            self.platform_handler,
+                            self.requirements_lock,
+                            self.get_requirements()
                         )
+                        if failed:
+                            logger.warning(
+                                "Dependencies not installed: %s.", failed)
                     # Get the installation file
-                    if installation_file:
-                        args = self.get_install_args()
+                    if update_plan.install_app and installation_file:
+                        args = list(self.get_install_args())
+                        if args and not update_plan.rebuild:
+                            # The same version of the wheel wouldn't be
+                            # reinstalled otherwise, its dependencies are
+                            # already installed
+                            args += WHEEL_REINSTALL_ARGS
                         if args:
-                            args.append(installation_file)
-                            # Install the app
                             self.platform_handler.install_app(
                                 self.app_path,
-                                args
+                                args + [installation_file]
                             )
                 except Exception as e:
                     self.config_handler.remove_app_files()
@@ -87,20 +124,18 @@ class WheelProcessing():
             # Can we continue?
             if self.platform_handler and self.env_structure \
                     and installation_file:
-                # Search for the main file
-                main_files, app_cwd = self.search_for_main_files(
-                    self.env_structure.get_path_venv_folder(),
-                    installation_file
-                )
-                # Windows - the 'side' branch
-                if not main_files and self.context_handler:
-                    # Get the root folder
-                    root_folder = self.context_handler.get_value_for_key(
-                        "python_dir")
-                    if root_folder:
-                        main_files, app_cwd = self.search_for_main_files(
-                            str(Path(root_folder).parent),
-                            installation_file)
+                # Search for the main file(in the venv of the context, it
+                # may be a staging venv)
+                venv_path = self.env_structure.get_path_venv_folder()
+                if self.context_handler and \
+                        self.context_handler.get_value_for_key("env_dir"):
+                    venv_path = self.context_handler.get_value_for_key(
+                        "env_dir")
+                with trace("main_file_search"):
+                    main_files, app_cwd = self.search_for_main_files(
+                        venv_path,
+                        installation_file
+                    )
                 # Copy all files from the app folder, except the wheel package,
                 # to the app's cwd(where the app is installer)
                 try:
@@ -148,30 +183,25 @@ class WheelProcessing():
 
     def files_changed(self) -> bool:
         """Check if the files/folders have changed."""
-        changed = False
-        previous_list = self.config_handler.get_app_files()
-        if previous_list and self.app_path:
-            # Get the current list
-            current_list = get_list_of_files_and_timestamp(
-                self.app_path,
-                filters=FILES_CHANGED_FILTER
-            )
-            # Compare the old list with the current list
-            for key, value in current_list.items():
-                if key in previous_list:
-                    if previous_list[key] != value:
-                        changed = True
-                        break
-                else:
-                    changed = True
-                    break
-        elif not previous_list and self.app_path:
-            changed = True
-        return changed
+        return bool(self.get_change_set())
+
+    def get_change_set(self) -> ChangeSet:
+        """Get the added, removed and modified files of the app."""
+        return get_change_set_by_manifest(
+            self.config_handler,
+            self.app_path,
+            FILES_CHANGED_FILTER,
+            scanner=self.scanner
+        )
 
     def search_for_main_files(self, venv_path: str, app_file: str) -> tuple:
         """Search for the main file to execute.
 
+        The installed location and the console scripts of the app are read
+        from its metadata(no walk of the venv). The console scripts are
+        started if the config doesn't specify the main file, the package
+        is searched for the entry point only if there are none.
+
         Args:
         venv_path (str)= path to the venv folder
         app_file (str)= path to the wheel file
@@ -182,35 +212,19 @@ class WheelProcessing():
         all_main_files = []
         # Foldet where the app is installed
         installed_app_folder = None
-        app_name = app_file and Path(app_file).name
-        if venv_path and Path(venv_path).exists():
+        if venv_path and Path(venv_path).exists() and app_file:
             try:
-                site_packages = list(
-                    Path(venv_path).rglob("lib/*/site-packages/*"))
-                site_packages = list(
-                    Path(venv_path).rglob("lib/site-packages/*")) if\
-                    not site_packages else site_packages
-                site_packages = list(
-                    Path(venv_path).rglob("Lib/*/site-packages/*")) if\
-                    not site_packages else site_packages
-                site_packages = list(
-                    Path(venv_path).rglob("Lib/site-packages/*")) if\
-                    not site_packages else site_packages
-
-                # Name of app is derived from the wheel package name
-                # --> installed packages/modules match
-                # Split the wheel name to parts using a dash
-                app_name_parts = app_name.split("-")
-                matched_app_folder_name = app_name_parts.pop(0)
-                # Continue
-                for part in app_name_parts:
-                    match = [package for package in site_packages if
-                             Path(package).name.lower() ==
-                             matched_app_folder_name]
-                    if match:
-                        installed_app_folder = match[0]
-                        break
-                    matched_app_folder_name += "-" + part
+                # The name of the distribution(from the wheel zip)
+                wheel_metadata = read_wheel_metadata(app_file)
+                app_name = wheel_metadata.name if wheel_metadata else \
+                    Path(app_file).name.split("-")[0]
+                # The installed files of the distribution
+                metadata, site_packages = read_installed_metadata(
+                    get_site_packages_folders(
+                        venv_path, self.context_handler), app_name)
+                if metadata:
+                    installed_app_folder = metadata.get_package_folder(
+                        site_packages)
                 # Let's search for the main files
                 if installed_app_folder:
                     config_main_file = \
@@ -222,23 +236,21 @@ class WheelProcessing():
                         for file in founded_files:
                             all_main_files.append(str(file))
                     else:
-                        # Search for all relevant files
-                        founded_files = Path(installed_app_folder).\
-                            rglob(PYTHON_FILE_REGEX)
-                        for file in founded_files:
-                            try:
-                                with open(
-                                       str(file),
-                                       "r",
-                                       encoding='utf-') as file_read:
-                                    if re.search(
-                                            ENTRY_POINT,
-                                            file_read.read()):
-                                        all_main_files.append(str(file))
-                            except Exception as e:
-                                logger.error(
-                                    "Search for the main entry point in file\
-                                        '%s' failed(%s).", file, e)
+                        # The console scripts of the app
+                        for script in sorted(metadata.console_scripts):
+                            script_path = metadata.get_console_script(
+                                script, site_packages)
+                            if script_path:
+                                all_main_files.append(script_path)
+                    if not all_main_files and not config_main_file and \
+                            Path(installed_app_folder) != Path(site_packages):
+                        # Files with the entry point(read only if changed)
+                        all_main_files.extend(
+                            self.main_file_index.get_main_files(
+                                str(installed_app_folder)))
+                else:
+                    logger.warning("The installed app %s not found in %s.",
+                                   app_name, venv_path)
             except Exception as e:
                 logger.error(
                     "Failed to find the main file to start the app(%s).", e)
@@ -246,6 +258,20 @@ class WheelProcessing():
 
         return (set(all_main_files), installed_app_folder)
 
+    def get_wheel_requirements(self, app_file: str) -> list:
+        """Get the requirements declared by the wheel(METADATA).
+
+        Args:
+        app_file (str)= path to the wheel file
+        """
+        metadata = read_wheel_metadata(app_file) if app_file else None
+        return metadata.requires_dist if metadata else []
+
+    def get_requirements(self) -> set:
+        """Get the requirement files' and the wheel's requirements."""
+        return super().get_requirements() | \
+            set(self.get_wheel_requirements(self.get_app_file()))
+
     def get_install_args(self) -> list:
         """Get the args required for app installation.
 
@@ -265,32 +291,15 @@ class WheelProcessing():
         Returns:
         True if it can be installed via wheel, otherwise False.
         """
-        valid = False
-        if self.app_path and Path(self.app_path).exists():
-            if self.get_app_file():
-                valid = True
-
-        return valid
+        return bool(self.get_app_file())
 
     def get_app_file(self) -> str | None:
         """Get the app file(wheel file)."""
-        file = None
-        if self.app_path and Path(self.app_path).exists():
-            file = glob.glob(
-                str(Path(self.app_path).joinpath(FILE_INSTALL)))
-            if file:
-                file = file[0]
-        return file
+        return self.layout_probe.get_wheel_file()
 
     def get_extra_files(self) -> list:
         """Get all extra files from the app folder."""
-        files = []
-        if self.app_path and Path(self.app_path).exists():
-            app_file_whl = self.get_app_file()
-            for file in glob.glob(str(Path(self.app_path).joinpath("*"))):
-                if app_file_whl != file:
-                    files.append(file)
-        return files
+        return self.layout_probe.get_extra_files()
 
     def copy_extra_files(self, extra_files: list, destination: str):
         """Copy extra files and folders to the app folder."""
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Builds the missing wheels of the requirements concurrently.
+
+Every requirement is built by its own 'pip wheel --no-deps' process, the
+number of the concurrent builds is bounded by the number of cores. The
+wheels are stored in the wheelhouse, so the install itself only unpacks
+the prebuilt wheels.
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from starter.app_preparation_by_type.requirements_lock import (
+    REQUIREMENT_NAME_REGEX,
+    normalize_name
+)
+from starter.tracing import traced
+
+__all__ = ['WheelBuilder']
+
+PINNED_VERSION_REGEX = r"^\s*===?\s*([^\s,;*]+)\s*$"
+
+logger = logging.getLogger(__name__)
+
+
+class WheelBuilder():
+    """Fills the wheelhouse with the wheels of the requirements."""
+    def __init__(self, /, **kwargs):
+        self.platform_handler = kwargs.get("platform_handler", None)
+        self.wheelhouse_folder = kwargs.get("wheelhouse_folder", None)
+        self.max_workers = kwargs.get("max_workers", None) or \
+            os.cpu_count() or 1
+
+    def get_wheels(self) -> dict:
+        """Get the wheels in the wheelhouse.
+
+        Returns:
+        A dict {normalized name: set of versions}
+        """
+        wheels = {}
+        if self.wheelhouse_folder and Path(self.wheelhouse_folder).exists():
+            for entry in os.scandir(self.wheelhouse_folder):
+                if entry.name.endswith(".whl"):
+                    # name-version(-build)-python-abi-platform.whl
+                    parts = entry.name[:-len(".whl")].split("-")
+                    if len(parts) >= 5:
+                        wheels.setdefault(
+                            normalize_name(parts[0]), set()).add(parts[1])
+        return wheels
+
+    def get_missing(self, requirements) -> list:
+        """Get the requirements without a wheel in the wheelhouse.
+
+        The options, URLs and local paths are left to pip.
+
+        Args:
+        requirements = the requirements to install
+        """
+        wheels = self.get_wheels()
+        missing = []
+        for requirement in requirements:
+            match = re.match(REQUIREMENT_NAME_REGEX, requirement.strip())
+            if not match or "://" in requirement or "@" in requirement:
+                continue
+            versions = wheels.get(normalize_name(match.group(1)), set())
+            pinned = re.match(PINNED_VERSION_REGEX,
+                              match.group(2).split(";")[0])
+            if not versions or (pinned and pinned.group(1) not in versions):
+                missing.append(requirement)
+        return missing
+
+    @traced("build_wheels")
+    def build(self, requirements) -> list:
+        """Build the missing wheels concurrently.
+
+        Args:
+        requirements = the requirements to install
+
+        Returns:
+        A list of requirements which failed to build(pip will try to
+        install them the usual way)
+        """
+        failed = []
+        if not self.platform_handler or not self.wheelhouse_folder:
+            return failed
+        missing = self.get_missing(requirements)
+        if not missing:
+            return failed
+        Path(self.wheelhouse_folder).mkdir(parents=True, exist_ok=True)
+        workers = min(self.max_workers, len(missing))
+        logger.info("Building %s wheel(s) using %s worker(s).",
+                    len(missing), workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda requirement: self.platform_handler.build_wheel(
+                    requirement, self.wheelhouse_folder),
+                missing)
+            for requirement, built in zip(missing, results):
+                if not built:
+                    failed.append(requirement)
+        if failed:
+            logger.warning("Building the wheels failed for: %s.", failed)
+        return failed
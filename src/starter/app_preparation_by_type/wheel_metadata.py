@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""Reads the metadata of the wheel app(METADATA, entry_points.txt, RECORD).
+
+The metadata is read from the '.whl' zip directly or from the installed
+'*.dist-info' folder, so the installed location of the app and its
+console scripts are known without walking the venv.
+"""
+
+import configparser
+import csv
+import io
+import logging
+import os
+import re
+import zipfile
+from email.parser import HeaderParser
+from pathlib import Path, PurePosixPath
+
+from starter.app_preparation_by_type.requirements_lock import normalize_name
+
+__all__ = ['WheelMetadata', 'read_wheel_metadata',
+           'read_installed_metadata']
+
+DIST_INFO_SUFFIX = ".dist-info"
+DATA_SUFFIX = ".data"
+METADATA_FILE = "METADATA"
+ENTRY_POINTS_FILE = "entry_points.txt"
+RECORD_FILE = "RECORD"
+# The requirements of the extras aren't installed
+EXTRA_MARKER_REGEX = r";.*\bextra\s*=="
+CONSOLE_SCRIPTS = "console_scripts"
+# Not the part of the installed package
+RECORD_SKIPPED = ["__pycache__"]
+
+logger = logging.getLogger(__name__)
+
+
+class WheelMetadata():
+    """The metadata of the wheel(installed) distribution."""
+    def __init__(self, /, **kwargs):
+        self.name = kwargs.get("name", None)
+        self.version = kwargs.get("version", None)
+        # The requirements of the distribution(without the extras)
+        self.requires_dist = kwargs.get("requires_dist", [])
+        # {name: 'module:function'}
+        self.console_scripts = kwargs.get("console_scripts", {})
+        # The top-level packages/modules of the distribution
+        self.top_level = kwargs.get("top_level", [])
+        # The installed scripts(relative to the site-packages)
+        self.scripts = kwargs.get("scripts", [])
+        # Name of the '*.dist-info' folder
+        self.dist_info = kwargs.get("dist_info", None)
+
+    def get_package_folder(self, site_packages: str) -> str | None:
+        """Get the folder where the app is installed.
+
+        Args:
+        site_packages (str)= the site-packages folder of the venv
+
+        Returns:
+        The folder of the first installed package, the site-packages for
+        the single-module distributions
+        """
+        if not site_packages:
+            return None
+        for name in self.top_level:
+            package_folder = Path(site_packages).joinpath(name)
+            if package_folder.is_dir():
+                return str(package_folder)
+        return str(site_packages) if self.top_level else None
+
+    def get_console_script(self, name: str,
+                           site_packages: str) -> str | None:
+        """Get the installed wrapper of the console script.
+
+        Args:
+        name (str)= the name of the console script
+        site_packages (str)= the site-packages folder of the venv
+
+        Returns:
+        The path to the script(bin/<name>, Scripts/<name>.exe) or None
+        """
+        for script in self.scripts:
+            script_name = PurePosixPath(script).name
+            if script_name in [name, name + ".exe"]:
+                script_path = os.path.normpath(
+                    Path(site_packages).joinpath(script))
+                if Path(script_path).is_file():
+                    return script_path
+        return None
+
+
+def parse_metadata(content: str) -> tuple:
+    """Get the name, the version and the requirements from the METADATA."""
+    headers = HeaderParser().parsestr(content, headersonly=True)
+    requires_dist = [requirement.strip() for requirement in
+                     headers.get_all("Requires-Dist") or []
+                     if not re.search(EXTRA_MARKER_REGEX, requirement)]
+    return headers.get("Name"), headers.get("Version"), requires_dist
+
+
+def parse_entry_points(content: str) -> dict:
+    """Get the console scripts from the entry_points.txt."""
+    parser = configparser.ConfigParser(delimiters=("=",),
+                                       interpolation=None)
+    # Names are case sensitive
+    parser.optionxform = str
+    parser.read_string(content)
+    if not parser.has_section(CONSOLE_SCRIPTS):
+        return {}
+    return {name: value.strip()
+            for name, value in parser.items(CONSOLE_SCRIPTS)}
+
+
+def parse_record(content: str) -> tuple:
+    """Get the top-level packages/modules and the scripts from the RECORD.
+
+    Returns:
+    tuple = (list of the top-level names, list of the scripts)
+    """
+    top_level = []
+    scripts = []
+    for row in csv.reader(io.StringIO(content)):
+        if not row or not row[0]:
+            continue
+        parts = PurePosixPath(row[0]).parts
+        name = parts[0]
+        if name == "..":
+            # Installed out of the site-packages(e.g. ../../../bin/app)
+            scripts.append(row[0])
+            continue
+        if name in RECORD_SKIPPED or name.endswith(DIST_INFO_SUFFIX) or \
+                name.endswith(DATA_SUFFIX) or \
+                (len(parts) == 1 and not name.endswith(".py")):
+            continue
+        if name not in top_level:
+            top_level.append(name)
+    # Packages first
+    return (sorted(top_level, key=lambda name: (name.endswith(".py"), name)),
+            scripts)
+
+
+def build_metadata(dist_info: str, read_file) -> WheelMetadata:
+    """Build the metadata from the files of the dist-info.
+
+    Args:
+    dist_info (str)= the name of the dist-info folder
+    read_file = returns the content of the dist-info file(or None)
+    """
+    name, version, requires_dist = parse_metadata(
+        read_file(METADATA_FILE) or "")
+    if not name:
+        # name-version.dist-info
+        name, _, version = dist_info[:-len(DIST_INFO_SUFFIX)].partition("-")
+    entry_points = read_file(ENTRY_POINTS_FILE)
+    top_level, scripts = parse_record(read_file(RECORD_FILE) or "")
+    return WheelMetadata(
+        name=name,
+        version=version,
+        requires_dist=requires_dist,
+        console_scripts=parse_entry_points(entry_points)
+        if entry_points else {},
+        top_level=top_level,
+        scripts=scripts,
+        dist_info=dist_info)
+
+
+def read_wheel_metadata(wheel_file: str) -> WheelMetadata | None:
+    """Read the metadata from the wheel zip.
+
+    Args:
+    wheel_file (str)= path to the '.whl' file
+
+    Returns:
+    The metadata or None if the wheel can't be read
+    """
+    try:
+        with zipfile.ZipFile(wheel_file) as wheel:
+            names = wheel.namelist()
+            dist_info = next(
+                (PurePosixPath(name).parts[0] for name in names
+                 if len(PurePosixPath(name).parts) == 2 and
+                 PurePosixPath(name).parts[0].endswith(DIST_INFO_SUFFIX) and
+                 PurePosixPath(name).name == METADATA_FILE), None)
+            if not dist_info:
+                return None
+
+            def read_file(file_name: str) -> str | None:
+                member = dist_info + "/" + file_name
+                if member not in names:
+                    return None
+                return wheel.read(member).decode("utf-8", errors="replace")
+
+            return build_metadata(dist_info, read_file)
+    except Exception as e:
+        logger.warning("Cannot read the metadata of the wheel %s(%s).",
+                       wheel_file, e)
+    return None
+
+
+def read_installed_metadata(site_packages_folders: list,
+                            name: str) -> tuple:
+    """Read the metadata of the installed distribution.
+
+    Args:
+    site_packages_folders (list)= the site-packages folders of the venv
+    name (str)= the name of the distribution
+
+    Returns:
+    tuple = (the metadata or None, the site-packages folder)
+    """
+    wanted = normalize_name(name or "")
+    for folder in site_packages_folders:
+        try:
+            for item in Path(folder).iterdir():
+                if not item.name.endswith(DIST_INFO_SUFFIX) or \
+                        normalize_name(item.name.partition("-")[0]) != \
+                        wanted:
+                    continue
+
+                def read_file(file_name: str, dist_info=item) -> str | None:
+                    dist_file = dist_info.joinpath(file_name)
+                    if not dist_file.is_file():
+                        return None
+                    return dist_file.read_text(encoding="utf-8",
+                                               errors="replace")
+
+                return (build_metadata(item.name, read_file), str(folder))
+        except Exception as e:
+            logger.warning("Cannot read the metadata of %s in %s(%s).",
+                           name, folder, e)
+    return (None, None)
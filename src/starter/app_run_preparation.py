@@ -1,20 +1,51 @@
 # -*- coding: utf-8 -*-
 """Main entry point to prepare the app for startup."""
 
+import hashlib
 import logging
+import shutil
 from pathlib import Path
 
 from starter.app_preparation_by_platform.platform_handler import (
     PlatformHandler
 )
+from starter.app_preparation_by_type.change_set import (
+    CHANGE_BUILD,
+    CHANGE_DEPENDENCY,
+    ChangeSet,
+    classify_file
+)
+from starter.app_preparation_by_type.layout_probe import AppLayoutProbe
+from starter.app_preparation_by_type.main_file_index import MainFileIndex
+from starter.app_preparation_by_type.manifest import hash_files
 from starter.app_preparation_by_type.other import OtherProcessing
+from starter.app_preparation_by_type.requirements_lock import (
+    RequirementsLock
+)
+from starter.app_preparation_by_type.scanner import TreeScanner
 from starter.app_preparation_by_type.setup import SetupProcessing
+from starter.app_preparation_by_type.update_planner import (
+    UpdatePlan,
+    UpdatePlanner
+)
 from starter.app_preparation_by_type.wheel import WheelProcessing
+from starter.context import ContextHandler
 from starter.create_venv import CreateVenv
+from starter.tracing import trace, traced
 from starter.use_existing_venv import UseExistingVenv
+from starter.venv_metadata import (
+    get_installed_distributions,
+    get_site_packages_folders
+)
+from starter.venv_template import (
+    VenvTemplate,
+    get_template_key
+)
 
 __all__ = ['AppPreparationAndRun']
 
+WHEEL_SUFFIX = ".whl"
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,26 +59,67 @@ class AppPreparationAndRun():
         self.config_handler = kwargs.get("config_handler", None)
         # Gets the environment structure
         self.env_structure = kwargs.get("env_structure", None)
+        # Reinstall even the satisfied dependencies
+        self.force_reinstall = kwargs.get("force_reinstall", False)
+        # Replace the Starter process with the app(Linux only)
+        self.exec_app = kwargs.get("exec_app", False)
+        # The output of the app(inherit, log or ring)
+        self.app_output = kwargs.get("app_output", None)
         # App folder
         self.app_folder = self.get_app_folder_from_environment()
         # Platform handler
         self.platform_handler = None
         self.set_plaform_handler()
+        # The app folder is walked once and shared by all the types
+        self.scanner = TreeScanner(root_folder=self.app_folder)
+        # The layout of the app folder, classified once for all the types
+        self.layout_probe = AppLayoutProbe(
+            app_path=self.app_folder, scanner=self.scanner)
+        # Changes of the app files since the last run
+        self.change_set = ChangeSet()
+        # The processing class matching the app
+        self.app_type = None
+        # The key of the venv generation(requirements, interpreter, ...)
+        self.generation_key = None
+        # The requirements installed in the venv
+        self.requirements_lock = RequirementsLock(
+            lock_file=self.env_structure.get_path_requirements_lock_file()
+            if self.env_structure else None)
+        self.update_planner = UpdatePlanner(
+            context_handler=self.context_handler,
+            requirements_lock=self.requirements_lock,
+            layout_probe=self.layout_probe)
+        # The files with the entry point(only the changed ones are read)
+        self.main_file_index = MainFileIndex(
+            index_file=self.env_structure.get_path_main_file_index_file()
+            if self.env_structure else None)
         # Instances of processing classes for the supported types
         self.setup = SetupProcessing(
             app_path=self.app_folder,
             config_handler=self.config_handler,
-            platform_handler=self.platform_handler)
+            platform_handler=self.platform_handler,
+            requirements_lock=self.requirements_lock,
+            main_file_index=self.main_file_index,
+            layout_probe=self.layout_probe,
+            scanner=self.scanner)
         self.wheel = WheelProcessing(
             app_path=self.app_folder,
             config_handler=self.config_handler,
             platform_handler=self.platform_handler,
             env_structure=self.env_structure,
-            context_handler=self.context_handler)
+            context_handler=self.context_handler,
+            requirements_lock=self.requirements_lock,
+            main_file_index=self.main_file_index,
+            layout_probe=self.layout_probe,
+            scanner=self.scanner)
         self.other = OtherProcessing(
             app_path=self.app_folder,
             config_handler=self.config_handler,
-            platform_handler=self.platform_handler)
+            platform_handler=self.platform_handler,
+            requirements_lock=self.requirements_lock,
+            main_file_index=self.main_file_index,
+            layout_probe=self.layout_probe,
+            scanner=self.scanner)
 
     def get_app_folder_from_environment(self) -> str | None:
         """Gets the app folder for the environment structure."""
@@ -60,77 +132,425 @@ class AppPreparationAndRun():
 
     def set_plaform_handler(self):
         """Initializes the platform handler and gets the instance."""
+        self.platform_handler = self.create_platform_handler(
+            self.context_handler,
+            Path(self.env_structure.get_path_venv_folder()))
+        if not self.platform_handler:
+            logger.error("Cannot get the platform handler.")
+            raise RuntimeError
+
+    def create_platform_handler(self, context_handler, venv_folder: Path):
+        """Create the platform handler for the venv.
+
+        Args:
+        context_handler = the context handler of the venv
+        venv_folder (Path)= the folder of the venv
+
+        Returns:
+        The platform specific handler
+        """
         platform = PlatformHandler(
-            context_handler=self.context_handler,
+            context_handler=context_handler,
             cwd=Path(__file__),
-            venv_folder=Path(self.env_structure.get_path_venv_folder())
+            venv_folder=venv_folder,
+            pip_cache_folder=self.env_structure.get_path_pip_cache_folder(),
+            wheelhouse_folder=self.env_structure.get_path_wheelhouse_folder(),
+            force_reinstall=self.force_reinstall,
+            exec_app=self.exec_app,
+            app_output=self.app_output,
+            app_logs_folder=self.env_structure.get_path_app_logs_folder()
         )
         # Gets the specific handler
-        if platform:
-            self.platform_handler = platform.get_handler()
-        else:
-            logger.error("Cannot get the platform handler.")
-            raise RuntimeError
+        return platform.get_handler() if platform else None
+
+    @traced("venv_preparation")
+    def venv_preparation(self, venv_folder: str | None = None):
+        """Prepares the venv and its content.
 
-    def venv_preparation(self):
-        """Prepares the venv and its content."""
+        Args:
+        venv_folder (str)= the folder of the venv(default is 'app_venv')
+        """
         if self.env_structure and self.platform_handler\
                 and self.context_handler:
+            venv_folder = venv_folder or \
+                self.env_structure.get_path_venv_folder()
             try:
                 # Creates the venv from scratch
-                if self.env_structure.folder_is_empty(
-                        self.env_structure.get_path_venv_folder()):
-                    venv = CreateVenv(
-                        context_handler=self.context_handler,
-                        platform_handler=self.platform_handler)
-                    venv.create(str(self.env_structure.get_path_venv_folder()))
+                if self.env_structure.folder_is_empty(venv_folder):
+                    self.create_venv(venv_folder)
                 # Loads the existing venv
-                if not self.env_structure.folder_is_empty(
-                        self.env_structure.get_path_venv_folder()):
-                    venv = UseExistingVenv(
-                        context_handler=self.context_handler)
-                    venv.create()
+                if not self.env_structure.folder_is_empty(venv_folder):
+                    with trace("use_existing_venv"):
+                        venv = UseExistingVenv(
+                            context_handler=self.context_handler)
+                        venv.create()
             except Exception as e:
                 logger.error(
                     "Problem with the venv preparation(%s).", e)
                 raise
 
-    def ready_and_start(self, start_fresh=False):
+    @traced("create_venv")
+    def create_venv(self, venv_folder: str):
+        """Create the venv by cloning the template venv.
+
+        The template is built first, if it doesn't exist. If the template
+        cannot be used, the venv is built from scratch.
+
+        Args:
+        venv_folder (str)= the (empty) folder of the venv
+        """
+        template = VenvTemplate(
+            templates_folder=self.env_structure.get_path_templates_folder())
+        try:
+            if not template.is_ready():
+                self.build_template(template)
+            with trace("template_clone"):
+                template.clone(venv_folder, self.context_handler)
+            return
+        except Exception as e:
+            logger.warning(
+                "Cannot use the template venv, creating the venv from "
+                "scratch(%s).", e)
+            self.env_structure.remove_item(venv_folder)
+            Path(venv_folder).mkdir(parents=True)
+        venv = CreateVenv(
+            context_handler=self.context_handler,
+            platform_handler=self.platform_handler)
+        venv.create(str(venv_folder))
+
+    @traced("rebuild_and_start")
+    def rebuild_and_start(self, update_plan: UpdatePlan):
+        """Rebuild the venv in a staging generation and start the app.
+
+        The new venv(with its own context and requirements lock) is
+        switched in right before the app starts. Until then, and if the
+        rebuild fails, the previous venv stays untouched.
+
+        Args:
+        update_plan (UpdatePlan)= the plan(a rebuild)
+        """
+        generation = self.env_structure.prepare_staging_folder()
+        if not generation:
+            # In place - nothing to start until the venv is rebuilt
+            self.env_structure.remove_venv_folder()
+            self.env_structure.prepare_venv_folder()
+            self.venv_preparation()
+            self.ready_and_start(True, update_plan)
+            return
+        staging_venv = self.env_structure.get_path_generation_venv_folder(
+            generation)
+        main_files = (self.context_handler.get_context_file(),
+                      self.requirements_lock.get_lock_file())
+        staging_context = str(
+            Path(generation).joinpath(Path(main_files[0]).name))
+        if Path(main_files[0]).exists():
+            # As in place, the venv keys are overwritten by the new venv
+            shutil.copyfile(main_files[0], staging_context)
+        self.use_generation_files(
+            staging_context,
+            str(Path(generation).joinpath(Path(main_files[1]).name)),
+            staging_venv)
+        activated = []
+
+        def activate():
+            self.activate_generation(generation, *main_files)
+            activated.append(generation)
+
+        self.platform_handler.before_start = activate
+        try:
+            self.venv_preparation(staging_venv)
+            self.ready_and_start(True, update_plan)
+        except Exception:
+            self.platform_handler.before_start = None
+            if activated:
+                raise
+            logger.error("Rebuilding the venv failed, the previous venv "
+                         "is kept.")
+            self.use_generation_files(
+                *main_files, self.env_structure.get_path_venv_folder())
+            self.env_structure.remove_item(generation)
+            if self.env_structure.folder_is_empty(
+                    self.env_structure.get_path_venv_folder()) or \
+                    not self.context_handler.get_value_for_key("env_exe"):
+                raise
+            self.venv_preparation()
+            self.ready_and_start(False, UpdatePlan())
+
+    def use_generation_files(self,
+                             context_file: str,
+                             lock_file: str,
+                             venv_folder: str):
+        """Point the handlers to the files of the venv generation.
+
+        Args:
+        context_file (str)= the context file of the venv
+        lock_file (str)= the requirements lock of the venv
+        venv_folder (str)= the folder of the venv
+        """
+        self.context_handler.set_context_file(context_file)
+        self.requirements_lock.lock_file = lock_file
+        self.platform_handler.venv_folder = Path(venv_folder)
+
+    def activate_generation(self,
+                            generation: str,
+                            context_file: str,
+                            lock_file: str):
+        """Make the generation the active venv.
+
+        The context and requirements lock of the active generation are
+        stored back to its folder, the ones of the generation become the
+        main ones and 'app_venv' is switched to it.
+
+        Args:
+        generation (str)= the folder of the generation
+        context_file (str)= the main context file
+        lock_file (str)= the main requirements lock
+        """
+        active = self.env_structure.get_active_generation()
+        if active and Path(active).exists() and \
+                Path(active).name != Path(generation).name:
+            self.copy_generation_files(
+                context_file, lock_file, active)
+        self.copy_generation_files(
+            str(Path(generation).joinpath(Path(context_file).name)),
+            str(Path(generation).joinpath(Path(lock_file).name)),
+            str(Path(context_file).parent))
+        self.env_structure.activate_generation(
+            generation, self.generation_key)
+        self.use_generation_files(
+            context_file, lock_file,
+            self.env_structure.get_path_venv_folder())
+
+    def copy_generation_files(self,
+                              context_file: str,
+                              lock_file: str,
+                              target_folder: str):
+        """Copy the context and the requirements lock to the folder.
+
+        Args:
+        context_file (str)= the context file
+        lock_file (str)= the requirements lock(removed from the folder
+                         if it doesn't exist)
+        target_folder (str)= the target folder
+        """
+        target_lock = Path(target_folder).joinpath(Path(lock_file).name)
+        if Path(context_file).exists():
+            shutil.copyfile(context_file, str(Path(target_folder).joinpath(
+                Path(context_file).name)))
+        if Path(lock_file).exists():
+            shutil.copyfile(lock_file, str(target_lock))
+        else:
+            target_lock.unlink(missing_ok=True)
+
+    def get_generation_key(self) -> str:
+        """Get the key of the venv generation for the current app.
+
+        The key is the hash of the requirements, the build metadata(and
+        the wheels) of the app, and the interpreter.
+
+        Returns:
+        The key
+        """
+        digest = hashlib.blake2b(get_template_key().encode("utf-8"),
+                                 digest_size=8)
+        paths = [path for path in sorted(self.scanner.get_files(
+                 root_only=True))
+                 if classify_file(path) in [CHANGE_BUILD, CHANGE_DEPENDENCY]
+                 or path.endswith(WHEEL_SUFFIX)]
+        hashes = hash_files([str(Path(self.app_folder).joinpath(path))
+                             for path in paths])
+        for path in paths:
+            digest.update(("|%s:%s" % (path, hashes.get(str(
+                Path(self.app_folder).joinpath(path))))).encode("utf-8"))
+        return digest.hexdigest()
+
+    @traced("use_generation")
+    def use_generation(self, update_plan: UpdatePlan) -> UpdatePlan:
+        """Switch to the venv generation matching the app, if any.
+
+        Only the changes of the requirements, the build metadata or the
+        interpreter(a rebuild) are looked up in the generations. If no
+        generation matches, the active venv is updated incrementally and
+        gets the new key right before the app starts.
+
+        Args:
+        update_plan (UpdatePlan)= the plan for the active venv
+
+        Returns:
+        The plan for the selected venv
+        """
+        if not self.app_type or self.force_reinstall or not (
+                update_plan.rebuild or update_plan.install_dependencies
+                or update_plan.change_set.has_changes(CHANGE_BUILD)) \
+                or not self.env_structure.generations_supported():
+            return update_plan
+        self.generation_key = self.get_generation_key()
+        active = self.env_structure.get_active_generation()
+        if active and self.env_structure.get_generation_key(active) == \
+                self.generation_key and not update_plan.rebuild:
+            return update_plan
+        generation = self.env_structure.find_generation(self.generation_key)
+        if not generation or generation == active:
+            if active and not update_plan.rebuild:
+                # The updated venv matches the app from now on
+                key = self.generation_key
+                self.platform_handler.before_start = \
+                    lambda: self.env_structure.set_generation_key(
+                        active, key)
+            return update_plan
+        logger.info("Using the venv generation %s.", generation)
+        self.activate_generation(
+            generation,
+            self.context_handler.get_context_file(),
+            self.requirements_lock.get_lock_file())
+        editable = self.app_type.is_editable_install()
+        return UpdatePlan(
+            install_app=not editable or self.update_planner.packages_changed(
+                update_plan.change_set),
+            change_set=update_plan.change_set,
+            reason="venv generation %s" % Path(generation).name)
+
+    @traced("build_template")
+    def build_template(self, template: VenvTemplate):
+        """Build the template venv(PyInstaller's files, pip, setuptools).
+
+        Args:
+        template (VenvTemplate)= the template to build
+        """
+        logger.info("Building the template venv %s.",
+                    template.get_venv_folder())
+        template.prepare()
+        template_context = ContextHandler(
+            context_file=str(template.get_context_file()))
+        handler = self.create_platform_handler(
+            template_context, template.get_venv_folder())
+        try:
+            venv = CreateVenv(
+                context_handler=template_context,
+                platform_handler=handler)
+            venv.create(str(template.get_venv_folder()))
+        finally:
+            handler.stop_worker()
+        env_dir = template_context.get_value_for_key("env_dir")
+        if "pip" not in get_installed_distributions(
+                get_site_packages_folders(env_dir, template_context)):
+            raise RuntimeError("pip is missing in the template venv")
+        template.mark_ready()
+
+    def save_launch_plan(self, launch_plan, arguments: dict):
+        """Store the launch plan of the started app.
+
+        The plan depends on the app files and folders, the venv, the config,
+        the context and the requirements lock. The app files are recorded
+        as scanned before the preparation(not rescanned), so the edits made
+        since then invalidate the plan. The plan isn't stored if any app
+        exited with an error.
+
+        Args:
+        launch_plan (LaunchPlan)= the launch plan
+        arguments (dict)= the arguments of the Starter
+        """
+        starts = self.platform_handler.started_apps
+        if not starts or self.platform_handler.app_failed:
+            return
+        if self.app_type and self.update_planner.requirements_pending(
+                self.app_type.get_requirements()):
+            # Installed again by the next run
+            logger.warning("Some dependencies are not installed, the launch "
+                           "plan isn't stored.")
+            return
+        paths = [self.env_structure.get_path_config_file(),
+                 self.context_handler.get_context_file(),
+                 self.requirements_lock.get_lock_file(),
+                 self.env_structure.get_path_venv_folder()]
+        env_dir = self.context_handler.get_value_for_key("env_dir")
+        if env_dir:
+            paths.append(str(Path(env_dir).joinpath("pyvenv.cfg")))
+        for start in starts:
+            paths += start["args"][:2] + [start["cwd"]]
+        stats = {}
+        if self.app_folder:
+            stats = {str(Path(self.app_folder).joinpath(path)): stat_result
+                     for path, stat_result in
+                     list(self.scanner.get_folders().items()) +
+                     list(self.scanner.scan().items())}
+            if self.scanner.get_root_stat():
+                stats[str(self.app_folder)] = self.scanner.get_root_stat()
+            paths += [self.app_folder] + list(stats)
+        launch_plan.save(starts, arguments, list(dict.fromkeys(paths)),
+                         stats)
+
+    @traced("ready_and_start")
+    def ready_and_start(self, start_fresh=False, update_plan=None):
         """Check if the venv needs to be updated, set it, and start
         the app.
 
         Args:
         start_fresh (bool)= the flag for start over
+        update_plan (UpdatePlan)= what needs to be installed(overrides
+                                  'start_fresh')
         """
         logger.info("Installing the app and starting it.")
         try:
-            should_continue = self.other.install_and_start(
-                start_fresh, True)
-            should_continue = self.setup.install_and_start(
-                start_fresh, should_continue)
-            should_continue = self.wheel.install_and_start(
-                start_fresh, should_continue)
+            with trace("other"):
+                should_continue = self.other.install_and_start(
+                    start_fresh, True, update_plan=update_plan)
+            with trace("setup"):
+                should_continue = self.setup.install_and_start(
+                    start_fresh, should_continue, update_plan=update_plan)
+            with trace("wheel"):
+                should_continue = self.wheel.install_and_start(
+                    start_fresh, should_continue, update_plan=update_plan)
         except Exception:
             logger.error("Cannot install and start the app.")
             raise
 
-    def app_files_changed(self) -> bool:
+    def app_files_changed(self) -> ChangeSet:
         """Check if the files related to the app changed.
 
         If the app's files have changed, the existing venv needs to
         be updated.
 
         Returns:
-        True if the files have changed otherwise False
+        The change set of the app files(evaluates to True if the files
+        have changed otherwise False)
         """
         # Its need to be done the "old-school-way", because "setup"
         # can falsely detect changes due to wheel packages
         # (extra files/folders).
         if self.wheel.it_is_me():
-            return self.wheel.files_changed()
+            self.app_type = self.wheel
         elif self.other.it_is_me():
-            return self.other.files_changed()
+            self.app_type = self.other
         elif self.setup.it_is_me():
-            return self.setup.files_changed()
+            self.app_type = self.setup
         else:
-            return False
+            self.app_type = None
+        self.change_set = self.app_type.get_change_set() if self.app_type\
+            else ChangeSet()
+        if self.change_set:
+            logger.info("Changes of the app files: %s.", self.change_set)
+        return self.change_set
+
+    def plan_update(self, change_set=None) -> UpdatePlan:
+        """Get the cheapest update of the venv for the changes of the app.
+
+        Args:
+        change_set (ChangeSet)= the changes of the app files(the last
+                                detected ones if not set)
+
+        Returns:
+        The update plan
+        """
+        if change_set is None:
+            change_set = self.change_set
+        if not self.app_type:
+            return UpdatePlan(change_set=change_set)
+        venv_folder = self.env_structure.get_path_venv_folder()
+        venv_ready = not self.env_structure.folder_is_empty(venv_folder) \
+            and bool(self.context_handler.get_value_for_key("env_exe"))
+        return self.update_planner.plan(
+            change_set,
+            editable=self.app_type.is_editable_install(),
+            venv_ready=venv_ready,
+            requirements=self.app_type.get_requirements())
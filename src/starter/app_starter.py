@@ -9,76 +9,151 @@ import argparse
 import logging
 import sys
 
+from starter.app_preparation_by_platform.app_output import OUTPUT_MODES
+from starter.app_preparation_by_platform.platform_handler import (
+    PlatformHandler
+)
 from starter.app_run_preparation import AppPreparationAndRun
 from starter.common import escape_string
 from starter.config import ConfigHandler
 from starter.context import ContextHandler
 from starter.environment_structure import EnvironmentStructure
+from starter.launch_plan import LaunchPlan
 from starter.logging_settings import set_logging_settings
+from starter.tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
 
-def main_starter(app_path=None, clear_environment=False, main_file=None):
+def main_starter(app_path=None,
+                 clear_environment=False,
+                 main_file=None,
+                 force_reinstall=False,
+                 trace=False,
+                 exec_app=False,
+                 app_output=None):
+    env_structure = None
+    if trace:
+        get_tracer().enable()
+
+    def save_trace():
+        if trace and env_structure:
+            get_tracer().save(env_structure.get_path_traces_folder())
+
     try:
-        # Sets upt logging configuration
-        set_logging_settings()
-
-        logger.info("Starts the Starter instance")
-        env_structure = EnvironmentStructure(
-            main_file=main_file
-        )
-        env_structure.prepare_env_structure()
-
-        # Argument `clear_environment` is passed - clearing the 
-        # environment.
-        # All items, including the app folder, will be removed.
-        if clear_environment:
-            env_structure.clear_environment()
-            # Create the environment structure from scratch.
-            env_structure.prepare_env_structure()
-
-        # Context handler
-        context_handler = ContextHandler(
-            context_file=env_structure.get_path_context_file()
-        )
-        # Config handler
-        config_handler = ConfigHandler(
-            config_file=env_structure.get_path_config_file()
-        )
-        # Check if the path to the app folder is set
-        if app_path:
-            valid_path = escape_string(app_path)
-            # Set the path for the app folder
-            env_structure.set_path_app_folder(valid_path)
-            config_handler.set_value_for_key("app_folder", valid_path)
-        else:
-            # Get the app path from the config file
-            config_app_path = config_handler.get_app_folder()
-            config_app_path = escape_string(config_app_path)
-            if config_app_path:
-                env_structure.set_path_app_folder(config_app_path)
-
-        # Initialize the app preparation instance.
-        app_preparation_and_run = AppPreparationAndRun(
-            context_handler=context_handler,
-            config_handler=config_handler,
-            env_structure=env_structure)
-
-        start_fresh = app_preparation_and_run.app_files_changed()
-        if start_fresh:
-            env_structure.remove_venv_folder()
-            env_structure.prepare_venv_folder()
-
-        # Prepare and start the app, if possible.
-        app_preparation_and_run.venv_preparation()
-        app_preparation_and_run.ready_and_start(start_fresh)
+        with get_tracer().span("main_starter"):
+            # Sets upt logging configuration
+            set_logging_settings()
+
+            logger.info("Starts the Starter instance")
+            env_structure = EnvironmentStructure(
+                main_file=main_file
+            )
+            # The unchanged app is started by the plan of the last start
+            launch_plan = LaunchPlan(
+                plan_file=env_structure.get_path_launch_plan_file())
+            arguments = {"app_path": app_path or "",
+                         "main_file": main_file or ""}
+            if not clear_environment and not force_reinstall:
+                with get_tracer().span("launch_plan"):
+                    platform_handler = PlatformHandler(
+                        exec_app=exec_app,
+                        app_output=app_output,
+                        app_logs_folder=env_structure
+                        .get_path_app_logs_folder()).get_handler()
+                    platform_handler.before_exec.append(save_trace)
+                    # The crashing start isn't a successful one
+                    platform_handler.after_failure.append(launch_plan.remove)
+                    if launch_plan.is_valid(arguments) and \
+                            launch_plan.start(platform_handler):
+                        return
+            # Only the successfully started app stores the plan again
+            launch_plan.remove()
+            with get_tracer().span("env_structure"):
+                env_structure.prepare_env_structure()
+
+                # Argument `clear_environment` is passed - clearing the
+                # environment.
+                # All items, including the app folder, will be removed.
+                if clear_environment:
+                    env_structure.clear_environment()
+                    # Create the environment structure from scratch.
+                    env_structure.prepare_env_structure()
+
+            with get_tracer().span("config_context_load"):
+                # Context handler
+                context_handler = ContextHandler(
+                    context_file=env_structure.get_path_context_file()
+                )
+                # Config handler
+                config_handler = ConfigHandler(
+                    config_file=env_structure.get_path_config_file()
+                )
+                # Check if the path to the app folder is set
+                if app_path:
+                    valid_path = escape_string(app_path)
+                    # Set the path for the app folder
+                    env_structure.set_path_app_folder(valid_path)
+                    config_handler.set_value_for_key("app_folder",
+                                                     valid_path)
+                else:
+                    # Get the app path from the config file
+                    config_app_path = config_handler.get_app_folder()
+                    config_app_path = escape_string(config_app_path)
+                    if config_app_path:
+                        env_structure.set_path_app_folder(config_app_path)
+
+            # Initialize the app preparation instance.
+            with get_tracer().span("app_preparation_init"):
+                app_preparation_and_run = AppPreparationAndRun(
+                    context_handler=context_handler,
+                    config_handler=config_handler,
+                    env_structure=env_structure,
+                    force_reinstall=force_reinstall,
+                    exec_app=exec_app,
+                    app_output=app_output)
+                # The exec(if used) replaces the Starter process
+                platform_handler = \
+                    app_preparation_and_run.get_platform_handler()
+                platform_handler.before_exec += [
+                    lambda: app_preparation_and_run.save_launch_plan(
+                        launch_plan, arguments),
+                    save_trace]
+                # The long-running app gets its plan while it runs
+                platform_handler.after_start.append(
+                    lambda: app_preparation_and_run.save_launch_plan(
+                        launch_plan, arguments))
+                platform_handler.after_failure.append(launch_plan.remove)
+
+            # The cheapest update of the venv for the app's changes, the
+            # venv is rebuilt only as the last resort.
+            with get_tracer().span("change_detection"):
+                change_set = app_preparation_and_run.app_files_changed()
+            with get_tracer().span("plan_update") as span:
+                update_plan = app_preparation_and_run.plan_update(
+                    change_set)
+                # The venv generation built for the same requirements
+                # is reused
+                update_plan = app_preparation_and_run.use_generation(
+                    update_plan)
+                if span:
+                    span.attributes["plan"] = repr(update_plan)
+            if update_plan.rebuild:
+                # Built aside, the previous venv is kept until the new one
+                # is ready to start.
+                app_preparation_and_run.rebuild_and_start(update_plan)
+            else:
+                # Prepare and start the app, if possible.
+                app_preparation_and_run.venv_preparation()
+                app_preparation_and_run.ready_and_start(False, update_plan)
     except Exception as e:
         logger.error(
             "Problem with preparing the venv for the app(%s).", e)
         # Clearing the whole app_environment(folder)
         # logger.info("Removing almost everything(app folder excluded).")
         # env_structure.clear_environment_exclude_app_folder()
+    finally:
+        save_trace()
 
 
 if __name__ == '__main__':
@@ -102,17 +177,51 @@ if __name__ == '__main__':
                         dest='main_file',
                         help='Specify the  name of the main file to start.',
                         default="")
+    parser.add_argument('--force_reinstall',
+                        dest='force_reinstall',
+                        action='store_true',
+                        help='Reinstall the dependencies even if they are\
+                              already satisfied in the venv.',
+                        default=False)
+    parser.add_argument('--trace',
+                        dest='trace',
+                        action='store_true',
+                        help='Store the timings of the start phases to\
+                              a JSON trace in the app environment.',
+                        default=False)
+    parser.add_argument('--exec',
+                        dest='exec_app',
+                        action='store_true',
+                        help='Replace the Starter process with the app\
+                              (Linux only).',
+                        default=False)
+    parser.add_argument('--app_output',
+                        dest='app_output',
+                        choices=OUTPUT_MODES,
+                        help='The output of the app: inherit(the console),\
+                              log(a rotating log file in the app\
+                              environment) or ring(the last 64 KiB,\
+                              logged if the app fails).',
+                        default="ring")
 
     options = parser.parse_args()
 
     app_folder = None
     clear = None
     main_file = None
+    force_reinstall = False
+    trace = False
+    exec_app = False
+    app_output = None
 
     try:
         app_folder = options.app_path
         clear = options.clear_environment
         main_file = options.main_file
+        force_reinstall = options.force_reinstall
+        trace = options.trace
+        exec_app = options.exec_app
+        app_output = options.app_output
     except Exception as e:
         # Something weng wrong, show the error
         print("Error: %s", e)
@@ -122,7 +231,11 @@ if __name__ == '__main__':
     try:
         main_starter(app_folder,
                      clear,
-                     main_file)
+                     main_file,
+                     force_reinstall,
+                     trace,
+                     exec_app,
+                     app_output)
         rc = 0
     except Exception as e:
         print("Error:", e)
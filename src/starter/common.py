@@ -2,7 +2,13 @@
 """Common functions."""
 
 import logging
+import platform
 import re
+import sys
+import sysconfig
+
+# The context key of the interpreter fingerprint of the venv
+INTERPRETER_FINGERPRINT = "interpreter_fingerprint"
 
 logger = logging.getLogger(__name__)
 
@@ -29,3 +35,18 @@ def escape_string(string_to_escape) -> str:
     except Exception as e:
         logger.error("Problem with escaping backslashes: %s.", e)
     return new_string
+
+
+def get_interpreter_fingerprint() -> str:
+    """Get the fingerprint of the interpreter(version and ABI) used to
+    create the venv.
+
+    Returns:
+    The fingerprint in format '<implementation>-<version>-<abi>-<machine>'
+    """
+    abi = sysconfig.get_config_var("SOABI") or \
+        sysconfig.get_config_var("EXT_SUFFIX") or ""
+    return "-".join([sys.implementation.name,
+                     platform.python_version(),
+                     abi,
+                     platform.machine().lower()])
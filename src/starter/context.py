@@ -44,7 +44,7 @@ class ContextHandler():
         """
         value = None
         if key and self.context:
-            value = self.context.__getattribute__(key)
+            value = getattr(self.context, key, None)
         return value
 
     def set_value_for_key(self, key, value):
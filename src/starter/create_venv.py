@@ -4,6 +4,12 @@
 import logging
 import venv
 
+from starter.common import (
+    INTERPRETER_FINGERPRINT,
+    get_interpreter_fingerprint
+)
+from starter.venv_metadata import store_site_packages
+
 __all__ = ['CreateVenv']
 
 logger = logging.getLogger(__name__)
@@ -38,8 +44,16 @@ class CreateVenv(venv.EnvBuilder):
                 if alter and exe_name:
                     self.context_handler.alter_context(
                         exe_name, pyinst_exe_name)
+                # Interpreter the venv is created with(ABI changes
+                # require a full rebuild)
+                self.context_handler.set_value_for_key(
+                    INTERPRETER_FINGERPRINT, get_interpreter_fingerprint())
 
                 self.platform_handler.pyinstaller_magic()
+                # The site-packages of the venv(no search later)
+                store_site_packages(
+                    self.context_handler,
+                    self.platform_handler.get_valid_python())
                 # Necessary
                 self.platform_handler.install_dependency(
                     name="pip"
@@ -2,7 +2,8 @@
 """Default config content.
 
 Content:
-app_files = dictionary of files with "<file>": "<timestamp>" format
+app_files = manifest of files with "<file>": {size, mtime_ns, inode, hash}
+            format
 app_folder = path to the app folder
 app_params = parameters for the app(used when starting the app)
 main_file = name of the main file(easier to find the right one rather
@@ -6,6 +6,7 @@ import json
 import logging
 import os
 import shutil
+from datetime import datetime
 from pathlib import Path
 
 from starter.environment_default_content.default_config_content import (
@@ -18,6 +19,21 @@ VENV_FOLDER_NAME = "app_venv"
 VENV_CONFIG_FILE = "app_starter_config.json"
 APP_DEFAULT_FOLDER = "app"
 VENV_CONTEXT_FILE = "context.json"
+REQUIREMENTS_LOCK_FILE = "requirements_lock.json"
+PIP_CACHE_FOLDER = "pip_cache"
+WHEELHOUSE_FOLDER = "wheelhouse"
+TEMPLATES_FOLDER = "templates"
+TRACES_FOLDER = "traces"
+LAUNCH_PLAN_FILE = "launch_plan.json"
+MAIN_FILE_INDEX_FILE = "main_file_index.json"
+APP_LOGS_FOLDER = "app_logs"
+# The venvs are built in generations, 'app_venv' links the active one
+GENERATIONS_FOLDER = "venvs"
+GENERATION_VENV_FOLDER = "venv"
+# The key of the generation(its mtime is the last use)
+GENERATION_KEY_FILE = "generation_key"
+# The number of the kept generations(least recently used are removed)
+MAX_GENERATIONS = 3
 APP_ENVIRONMENT_FOLDER = "app_environment"
 MAIN_FILE = "main_file"
 
@@ -35,6 +51,7 @@ class EnvironmentStructure():
         Args:
         app_environment_parent = Optional root folder for the 
                                  environment structure.
+        max_generations (int)= the number of the kept venv generations
         """
         self.app_venv_folder = None
         self.context_file = None
@@ -45,6 +62,8 @@ class EnvironmentStructure():
         # Where the evironment folder will be placed
         self.current_parent = kwargs.get(
             "app_environment_parent", Path(__file__).parents[2])
+        self.max_generations = kwargs.get(
+            "max_generations", MAX_GENERATIONS)
 
     def prepare_env_structure(self):
         """Set up the full environment structure."""
@@ -118,16 +137,83 @@ class EnvironmentStructure():
 
     def remove_venv_folder(self):
         """Delete the app venv folder and its contents."""
-        if self.app_venv_folder and self.app_venv_folder.exists():
+        if self.app_venv_folder and self.app_venv_folder.is_symlink():
+            logger.info(
+                "Deleting venv link %s and its generations.",
+                str(self.app_venv_folder))
+            self.app_venv_folder.unlink()
+            self.remove_item(self.get_path_generations_folder())
+            self.app_venv_folder = None
+        elif self.app_venv_folder and self.app_venv_folder.exists():
             logger.info(
                 "Deleting venv folder %s.", str(self.app_venv_folder))
             self.remove_item(self.app_venv_folder)
             self.app_venv_folder = None
+        # The installed requirements are gone with the venv
+        self.remove_requirements_lock_file()
+
+    def get_path_requirements_lock_file(self) -> str:
+        """Return the path of the lock of the installed requirements."""
+        return str(self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, REQUIREMENTS_LOCK_FILE))
+
+    def get_path_pip_cache_folder(self) -> str:
+        """Return the path of the cache of the bundled pip.
+
+        The cache is content-addressed, so it survives the venv.
+        """
+        return str(self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, PIP_CACHE_FOLDER))
+
+    def get_path_wheelhouse_folder(self) -> str:
+        """Return the path of the wheelhouse.
+
+        Every wheel downloaded or built by pip is kept there, so it
+        survives the venv(and rebuilds can run offline).
+        """
+        return str(self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, WHEELHOUSE_FOLDER))
+
+    def get_path_templates_folder(self) -> str:
+        """Return the path of the template venvs(cloned to app_venv)."""
+        return str(self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, TEMPLATES_FOLDER))
+
+    def get_path_launch_plan_file(self) -> str:
+        """Return the path of the launch plan(the last successful start)."""
+        return str(self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, LAUNCH_PLAN_FILE))
+
+    def get_path_main_file_index_file(self) -> str:
+        """Return the path of the index of the files with the entry point."""
+        return str(self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, MAIN_FILE_INDEX_FILE))
+
+    def get_path_app_logs_folder(self) -> str:
+        """Return the path of the folder with the output logs of the app."""
+        return str(self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, APP_LOGS_FOLDER))
+
+    def get_path_traces_folder(self) -> str:
+        """Return the path of the folder with the traces of the launches."""
+        return str(self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, TRACES_FOLDER))
+
+    def remove_requirements_lock_file(self):
+        """Delete the lock of the installed requirements."""
+        lock_file = self.get_path_requirements_lock_file()
+        if Path(lock_file).exists():
+            logger.info("Removing requirements lock %s.", lock_file)
+            self.remove_item(lock_file)
 
     def prepare_venv_folder(self):
         """Set up folder for the venv."""
         self.app_venv_folder = self.current_parent.joinpath(
             APP_ENVIRONMENT_FOLDER, VENV_FOLDER_NAME)
+        if self.app_venv_folder.is_symlink() \
+                and not self.app_venv_folder.exists():
+            # The linked generation is gone
+            self.app_venv_folder.unlink()
         if not self.app_venv_folder.exists():
             try:
                 self.app_venv_folder.mkdir()
@@ -141,6 +227,165 @@ class EnvironmentStructure():
                     self.app_venv_folder, e)
                 raise
 
+    def get_path_generations_folder(self) -> str:
+        """Return the path of the folder with the venv generations."""
+        return str(self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, GENERATIONS_FOLDER))
+
+    def get_path_generation_venv_folder(self, generation: str) -> str:
+        """Return the venv folder of the generation.
+
+        Args:
+        generation (str)= the folder of the generation
+        """
+        return str(Path(generation).joinpath(GENERATION_VENV_FOLDER))
+
+    def generations_supported(self) -> bool:
+        """Check if the venv can be switched by a symlink."""
+        folder = Path(self.get_path_generations_folder())
+        test_link = folder.joinpath("link_test")
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            if test_link.is_symlink():
+                test_link.unlink()
+            os.symlink(str(folder), str(test_link), target_is_directory=True)
+            test_link.unlink()
+            return True
+        except OSError as e:
+            logger.info("The venv generations aren't supported(%s).", e)
+            return False
+
+    def prepare_staging_folder(self) -> str | None:
+        """Set up the folder of a new venv generation.
+
+        Returns:
+        The folder of the generation, None if generations aren't
+        supported(the venv is rebuilt in place)
+        """
+        if not self.generations_supported():
+            return None
+        generation = Path(self.get_path_generations_folder()).joinpath(
+            datetime.now().strftime("%Y%m%d%H%M%S%f"))
+        Path(self.get_path_generation_venv_folder(str(generation))).mkdir(
+            parents=True)
+        logger.info("Prepared the staging venv generation %s.", generation)
+        return str(generation)
+
+    def get_active_generation(self) -> str | None:
+        """Return the folder of the active venv generation, if exists."""
+        venv_folder = self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, VENV_FOLDER_NAME)
+        if venv_folder.is_symlink():
+            return str(Path(os.readlink(str(venv_folder))).parent)
+        return None
+
+    def get_generation_key(self, generation: str) -> str | None:
+        """Return the key of the generation(None if never activated).
+
+        Args:
+        generation (str)= the folder of the generation
+        """
+        key_file = Path(generation).joinpath(GENERATION_KEY_FILE)
+        if key_file.is_file():
+            return key_file.read_text(encoding="utf-8").strip() or None
+        return None
+
+    def set_generation_key(self, generation: str, key: str):
+        """Store the key of the generation(its venv was updated in place).
+
+        Args:
+        generation (str)= the folder of the generation
+        key (str)= the key(requirements, interpreter, build metadata)
+        """
+        Path(generation).joinpath(GENERATION_KEY_FILE).write_text(
+            key, encoding="utf-8")
+        logger.info("The venv generation %s was updated(%s).",
+                    generation, key)
+
+    def find_generation(self, key: str) -> str | None:
+        """Return the folder of the generation with the given key.
+
+        Args:
+        key (str)= the key(requirements, interpreter, build metadata)
+        """
+        folder = Path(self.get_path_generations_folder())
+        found = []
+        if key and folder.is_dir():
+            for generation in folder.iterdir():
+                if generation.is_dir() and not generation.is_symlink() \
+                        and self.get_generation_key(str(generation)) == key\
+                        and not self.folder_is_empty(
+                            self.get_path_generation_venv_folder(
+                                str(generation))):
+                    found.append(generation)
+        if not found:
+            return None
+        # The most recently used one
+        return str(max(found, key=lambda generation: generation.joinpath(
+            GENERATION_KEY_FILE).stat().st_mtime_ns))
+
+    def activate_generation(self, generation: str, key: str | None = None):
+        """Switch 'app_venv' to the generation(atomic symlink flip).
+
+        The least recently used generations over the limit(and the
+        incomplete ones) are removed, the previous one is kept.
+
+        Args:
+        generation (str)= the folder of the generation
+        key (str)= the key of the generation(the stored one if not set)
+        """
+        venv_folder = self.current_parent.joinpath(
+            APP_ENVIRONMENT_FOLDER, VENV_FOLDER_NAME)
+        previous = self.get_active_generation()
+        new_link = venv_folder.with_name(VENV_FOLDER_NAME + ".new")
+        if new_link.is_symlink():
+            new_link.unlink()
+        elif new_link.exists():
+            self.remove_item(str(new_link))
+        os.symlink(self.get_path_generation_venv_folder(generation),
+                   str(new_link), target_is_directory=True)
+        legacy = None
+        if venv_folder.exists() and not venv_folder.is_symlink():
+            # The venv built in place(before the generations)
+            legacy = venv_folder.with_name(VENV_FOLDER_NAME + ".legacy")
+            os.replace(str(venv_folder), str(legacy))
+        os.replace(str(new_link), str(venv_folder))
+        self.app_venv_folder = venv_folder
+        # Marks the generation as complete and recently used
+        key = key or self.get_generation_key(generation) or \
+            Path(generation).name
+        Path(generation).joinpath(GENERATION_KEY_FILE).write_text(
+            key, encoding="utf-8")
+        logger.info("The venv generation %s(%s) is active.", generation, key)
+        if legacy:
+            self.remove_item(str(legacy))
+        self.prune_generations(generation, previous)
+
+    def prune_generations(self, active: str, previous: str | None = None):
+        """Remove the least recently used generations over the limit.
+
+        Args:
+        active (str)= the folder of the active generation
+        previous (str)= the folder of the previously active generation
+        """
+        keep = {Path(item).name for item in [active, previous] if item}
+        key = self.get_generation_key(active)
+        candidates = []
+        for folder in Path(self.get_path_generations_folder()).iterdir():
+            if not folder.is_dir() or folder.name in keep:
+                continue
+            folder_key = self.get_generation_key(str(folder))
+            if folder_key is None or folder_key == key:
+                # Incomplete or superseded by the active one
+                self.remove_item(str(folder))
+                continue
+            candidates.append(folder)
+        candidates.sort(key=lambda folder: folder.joinpath(
+            GENERATION_KEY_FILE).stat().st_mtime_ns, reverse=True)
+        for folder in candidates[max(self.max_generations - len(keep), 0):]:
+            logger.info("Evicting the venv generation %s.", folder)
+            self.remove_item(str(folder))
+
     def get_path_config_file(self) -> str | None:
         """Return the config file path."""
         return str(self.config_file) if self.config_file else None
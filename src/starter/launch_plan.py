@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""Precompiled launch plan of the app.
+
+After the start the exact command(interpreter, main file and
+params) and its cwd are stored with the stat fingerprints of everything
+they depend on(the app files and folders, the venv, the config and the
+context). If none of them changed, the next launch starts the app
+straight away, without the type processors, the change detection or the
+venv preparation.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+from starter.app_preparation_by_type.manifest import (
+    MANIFEST_INODE,
+    fingerprint_matches,
+    get_stat_fingerprint
+)
+from starter.venv_template import get_template_key
+
+__all__ = ['LaunchPlan']
+
+PLAN_STARTER = "starter"
+PLAN_ARGUMENTS = "arguments"
+PLAN_STARTS = "starts"
+PLAN_FINGERPRINTS = "fingerprints"
+# The target of the symlink(e.g. the active venv generation)
+FINGERPRINT_LINK = "link"
+
+logger = logging.getLogger(__name__)
+
+
+def get_path_fingerprint(path: str) -> dict | None:
+    """Get the stat fingerprint of the path(not following symlinks).
+
+    Args:
+    path (str)= the file or folder
+
+    Returns:
+    The fingerprint or None if the path doesn't exist
+    """
+    try:
+        stat_result = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return None
+    fingerprint = get_stat_fingerprint(stat_result)
+    if os.path.islink(path):
+        fingerprint[FINGERPRINT_LINK] = os.readlink(path)
+    return fingerprint
+
+
+def get_recorded_fingerprint(path: str,
+                             stat_result: os.stat_result) -> dict | None:
+    """Get the fingerprint of the path from the stat result taken before.
+
+    Args:
+    path (str)= the file or folder
+    stat_result (os.stat_result)= the stat result(e.g. of the scan)
+
+    Returns:
+    The fingerprint(the current one for the symlinks)
+    """
+    if os.path.islink(path):
+        return get_path_fingerprint(path)
+    fingerprint = get_stat_fingerprint(stat_result)
+    if not stat_result.st_ino:
+        # Not known on Windows(os.DirEntry)
+        current = get_path_fingerprint(path)
+        fingerprint[MANIFEST_INODE] = current.get(MANIFEST_INODE) \
+            if current else None
+    return fingerprint
+
+
+class LaunchPlan():
+    """Stores, validates and runs the launch plan."""
+    def __init__(self, /, **kwargs):
+        self.plan_file = kwargs.get("plan_file", None)
+        self.plan = None
+
+    def get_plan_file(self) -> str | None:
+        """Returns the path to the launch plan."""
+        return self.plan_file
+
+    def load(self) -> dict | None:
+        """Load the stored launch plan."""
+        self.plan = None
+        if self.plan_file and Path(self.plan_file).exists():
+            try:
+                with open(self.plan_file, "r", encoding="utf-8") as plan_in:
+                    self.plan = json.loads(plan_in.read())
+            except Exception as e:
+                logger.warning("The launch plan %s is not valid(%s).",
+                               self.plan_file, e)
+        return self.plan
+
+    def remove(self):
+        """Remove the launch plan(the next launch runs the pipeline)."""
+        self.plan = None
+        if self.plan_file:
+            Path(self.plan_file).unlink(missing_ok=True)
+
+    def save(self,
+             starts: list,
+             arguments: dict,
+             paths: list,
+             stats: dict | None = None):
+        """Store the launch plan.
+
+        Args:
+        starts (list)= the started commands [{"args": [], "cwd": ""}]
+        arguments (dict)= the arguments of the Starter
+        paths (list)= the files and folders the start depends on
+        stats (dict)= the stat results of the paths taken before the
+                      preparation '<path>: <os.stat_result>'(the current
+                      ones are used for the rest)
+        """
+        if not self.plan_file or not starts:
+            return
+        stats = stats or {}
+        plan = {
+            PLAN_STARTER: get_template_key(),
+            PLAN_ARGUMENTS: arguments,
+            PLAN_STARTS: [{"interpreter": start["args"][0],
+                           "main_file": start["args"][1]
+                           if len(start["args"]) > 1 else None,
+                           "params": start["args"][2:],
+                           "args": start["args"],
+                           "cwd": start["cwd"]} for start in starts],
+            PLAN_FINGERPRINTS: {
+                str(path): get_recorded_fingerprint(str(path),
+                                                    stats[str(path)])
+                if str(path) in stats else get_path_fingerprint(str(path))
+                for path in paths if path}}
+        try:
+            temporary_file = str(self.plan_file) + ".tmp"
+            with open(temporary_file, "w", encoding="utf-8") as plan_out:
+                plan_out.write(json.dumps(plan, indent=4))
+            os.replace(temporary_file, self.plan_file)
+            self.plan = plan
+            logger.info("The launch plan is stored in %s.", self.plan_file)
+        except Exception as e:
+            logger.error("Storing the launch plan failed(%s).", e)
+
+    def is_valid(self, arguments: dict) -> bool:
+        """Check if the stored plan can be used for the launch.
+
+        Args:
+        arguments (dict)= the arguments of the Starter
+
+        Returns:
+        True if the arguments and all fingerprints match
+        """
+        plan = self.load()
+        if not plan or not plan.get(PLAN_STARTS) or \
+                plan.get(PLAN_ARGUMENTS) != arguments or \
+                plan.get(PLAN_STARTER) != get_template_key():
+            return False
+        for path, stored in plan.get(PLAN_FINGERPRINTS, {}).items():
+            current = get_path_fingerprint(path)
+            if stored is None or current is None:
+                if stored != current:
+                    return False
+                continue
+            if not fingerprint_matches(stored, current) or \
+                    stored.get(FINGERPRINT_LINK) != \
+                    current.get(FINGERPRINT_LINK):
+                logger.info("The launch plan is outdated(%s changed).",
+                            path)
+                return False
+        return True
+
+    def start(self, platform_handler) -> bool:
+        """Start the app by the plan.
+
+        Args:
+        platform_handler = the platform handler to start the app with
+
+        Returns:
+        True if the app was started
+        """
+        started = False
+        for start in (self.plan or {}).get(PLAN_STARTS, []):
+            logger.info("Starting your app with %s(launch plan).",
+                        start.get("main_file"))
+            started = platform_handler.launch_app(
+                "app", start["args"], start["cwd"]) or started
+        return started
@@ -7,11 +7,14 @@ Credit to:
 """
 
 import argparse
+import base64
+import hashlib
 import os.path
 import pkgutil
 import shutil
 import sys
 import tempfile
+import zipfile
 from base64 import b85decode
 
 this_python = sys.version_info[:2]
@@ -26,6 +29,9 @@ if this_python < min_version:
     print("ERROR: " + " ".join(message_parts))
     sys.exit(1)
 
+# Ends the output(stderr) of the worker's request
+WORKER_OUTPUT_END = "maginician-output-end:"
+
 
 def monkeypatch_for_cert(tmpdir):
     """Patches `pip install` to provide default certificate with the lowest
@@ -56,58 +62,336 @@ def monkeypatch_for_cert(tmpdir):
     InstallCommand.parse_args = cert_parse_args
 
 
-def pip_dependency(tmpdir):
-    """Install 'pip' dependency."""
+def pip_dependency(tmpdir, find_links=None, force=False):
+    """Install 'pip' dependency.
+
+    Args:
+    tmpdir = the working directory
+    find_links = the folder with the pip wheel(offline install), if exists
+    force = reinstall even if the same version is installed
+
+    Returns:
+    The exit code of pip
+    """
     monkeypatch_for_cert(tmpdir)
     try:
         # Execute the included pip and use it to install the latest pip and
         # any user-requested packages from PyPI.
         from pip._internal.cli.main import main as pip_entry_point
-        args = ["install", "--upgrade", "--force-reinstall", "pip"]
-        pip_entry_point(args)
+        args = ["install", "--upgrade", "pip"]
+        if find_links:
+            # The bundled version, no network needed
+            args = ["install", "--upgrade", "--no-index",
+                    "--find-links", find_links, "pip"]
+        if force:
+            args.insert(1, "--force-reinstall")
+        return pip_entry_point(args)
     except Exception as e:
         print("Installation of pip failed because %s" % e)
         raise e
 
 
-def other_dependency(name):
-    """Install other dependency that pip."""
+def get_pip_cache_key():
+    """Get the key of the bundled pip(hash of the PIP_DATA blob)."""
+    return hashlib.blake2b(PIP_DATA, digest_size=16).hexdigest()
+
+
+def find_cached_pip_wheel(cache_folder):
+    """Get the cached pip wheel, if exists."""
+    if os.path.isdir(cache_folder):
+        for name in sorted(os.listdir(cache_folder)):
+            if name.startswith("pip-") and name.endswith(".whl"):
+                return os.path.join(cache_folder, name)
+    return None
+
+
+def build_pip_wheel(pip_zip, folder):
+    """Build the pip wheel from the decoded archive(only the package).
+
+    The wheel is importable and installable offline.
+
+    Returns:
+    The path to the wheel
+    """
+    import re
+
+    with zipfile.ZipFile(pip_zip) as archive:
+        init = archive.read("pip/__init__.py").decode("utf-8")
+        version = re.search(
+            r"__version__\s*=\s*[\"']([^\"']+)[\"']", init).group(1)
+        dist_info = "pip-%s.dist-info" % version
+        metadata = {
+            "METADATA": "Metadata-Version: 2.1\nName: pip\n"
+                        "Version: %s\n" % version,
+            "WHEEL": "Wheel-Version: 1.0\nGenerator: maginician\n"
+                     "Root-Is-Purelib: true\nTag: py3-none-any\n",
+            "entry_points.txt": "[console_scripts]\n"
+                                "pip = pip._internal.cli.main:main\n"
+                                "pip3 = pip._internal.cli.main:main\n",
+        }
+        wheel = os.path.join(folder, "pip-%s-py3-none-any.whl" % version)
+        records = []
+        with zipfile.ZipFile(wheel + ".tmp", "w",
+                             zipfile.ZIP_DEFLATED) as out:
+            items = [(info.filename, archive.read(info))
+                     for info in archive.infolist() if not info.is_dir()]
+            items += [("%s/%s" % (dist_info, name), content.encode("utf-8"))
+                      for name, content in metadata.items()]
+            for name, content in items:
+                out.writestr(name, content)
+                digest = base64.urlsafe_b64encode(
+                    hashlib.sha256(content).digest()).rstrip(b"=")
+                records.append("%s,sha256=%s,%s" % (
+                    name, digest.decode("ascii"), len(content)))
+            records.append("%s/RECORD,," % dist_info)
+            out.writestr("%s/RECORD" % dist_info, "\n".join(records) + "\n")
+    os.replace(wheel + ".tmp", wheel)
+    return wheel
+
+
+def prepare_pip_cache(cache_root):
+    """Get the pip wheel from the content-addressed cache.
+
+    The PIP_DATA is decoded only if the cache doesn't contain the wheel
+    of this blob yet. The entries of other blobs are removed.
+
+    Returns:
+    The path to the cached pip wheel
+    """
+    cache_folder = os.path.join(cache_root, get_pip_cache_key())
+    wheel = find_cached_pip_wheel(cache_folder)
+    if wheel:
+        return wheel
+    os.makedirs(cache_folder, exist_ok=True)
+    for name in os.listdir(cache_root):
+        if name != get_pip_cache_key():
+            shutil.rmtree(os.path.join(cache_root, name), ignore_errors=True)
+    pip_zip = os.path.join(cache_folder, "pip.zip")
+    with open(pip_zip, "wb") as fp:
+        fp.write(b85decode(PIP_DATA.replace(b"\n", b"")))
+    try:
+        return build_pip_wheel(pip_zip, cache_folder)
+    finally:
+        os.remove(pip_zip)
+
+
+def split_dependencies(names):
+    """Split the options(e.g. '-r file.txt') to pip's args."""
+    args = []
+    for name in names:
+        if name.startswith("-"):
+            args.extend(name.split(None, 1))
+        else:
+            args.append(name)
+    return args
+
+
+def other_dependency(names, force=False, wheelhouse=None):
+    """Install other dependencies that pip(in one pip run).
+
+    The installed distributions satisfying the requirements are kept,
+    unless 'force' is set. With the wheelhouse, the install runs offline
+    first; if it isn't possible, the missing wheels are downloaded(or
+    built) to the wheelhouse and installed from it.
+
+    Returns:
+    The exit code of pip
+    """
     try:
         from pip._internal.cli.main import main as pip_entry_point
 
-        args = ["install", "--upgrade", "--force-reinstall", name]
-        pip_entry_point(args)
+        args = ["install"] + (["--force-reinstall"] if force else []) + \
+            split_dependencies(names)
+        if wheelhouse:
+            os.makedirs(wheelhouse, exist_ok=True)
+            find_links = ["--find-links", wheelhouse]
+            print("Installing from the wheelhouse %s." % wheelhouse)
+            if pip_entry_point(args + ["--no-index"] + find_links) == 0:
+                return 0
+            print("Filling the wheelhouse %s." % wheelhouse)
+            exit_code = pip_entry_point(
+                ["wheel", "--wheel-dir", wheelhouse] + find_links +
+                split_dependencies(names))
+            if exit_code == 0:
+                args += find_links
+        return pip_entry_point(args)
     except Exception as e:
         print(
-            "Installation of dependency: %s failed because %s." % (name, e))
+            "Installation of dependencies: %s failed because %s." % (names, e))
         raise e
 
 
-def main(dependency):
+def uninstall_dependency(names):
+    """Uninstall the dependencies.
+
+    Returns:
+    The exit code of pip
+    """
+    try:
+        from pip._internal.cli.main import main as pip_entry_point
+
+        args = ["uninstall", "--yes"] + names
+        return pip_entry_point(args)
+    except Exception as e:
+        print(
+            "Uninstallation of dependencies: %s failed because %s."
+            % (names, e))
+        raise e
+
+
+def installed_distributions():
+    """Get the installed distributions {normalized name: version}."""
+    import importlib
+    import importlib.metadata
+    import re
+
+    importlib.invalidate_caches()
+    installed = {}
+    for distribution in importlib.metadata.distributions():
+        name = distribution.metadata["Name"]
+        if name:
+            installed[re.sub(r"[-_.]+", "-", name).lower()] = \
+                distribution.version
+    return installed
+
+
+def unsatisfied_requirements(requirements):
+    """Get the requirements not satisfied by the installed distributions.
+
+    The lines which cannot be parsed(options, URLs) are unsatisfied.
+    """
+    import re
+
+    from pip._vendor.packaging.requirements import Requirement
+
+    installed = installed_distributions()
+    unsatisfied = []
+    for line in requirements:
+        try:
+            requirement = Requirement(line)
+        except Exception:
+            unsatisfied.append(line)
+            continue
+        if requirement.marker and not requirement.marker.evaluate():
+            continue
+        version = installed.get(
+            re.sub(r"[-_.]+", "-", requirement.name).lower())
+        if version is None or (
+                requirement.specifier and not requirement.specifier.contains(
+                    version, prereleases=True)):
+            unsatisfied.append(line)
+    return unsatisfied
+
+
+def worker(wheelhouse=None):
+    """Process JSON commands(one per line) until stdin is closed.
+
+    Request: {"id": str, "command": "install"|"uninstall"|"satisfied",
+              "dependencies": [...], "force": bool}
+    Response: {"id": str, "exit_code": int, "result": ...}
+
+    The responses are written to the original stdout, everything else
+    (pip's output) goes to stderr. The output of every request is ended
+    by the line WORKER_OUTPUT_END + id on stderr.
+
+    Args:
+    wheelhouse = the folder of the wheelhouse, if exists
+    """
+    import json
+
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    commands = {
+        "uninstall": uninstall_dependency,
+    }
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        response = {"exit_code": 0, "result": None}
+        request = {}
+        try:
+            request = json.loads(line)
+            command = request.get("command")
+            dependencies = request.get("dependencies", [])
+            if command == "install":
+                response["exit_code"] = other_dependency(
+                    dependencies, request.get("force", False),
+                    wheelhouse) or 0
+            elif command in commands:
+                response["exit_code"] = commands[command](dependencies) or 0
+            elif command == "satisfied":
+                response["result"] = unsatisfied_requirements(dependencies)
+            else:
+                response = {"exit_code": 1,
+                            "result": "Unknown command: %s" % command}
+        except (Exception, SystemExit) as e:
+            response = {"exit_code": 1, "result": str(e)}
+        response["id"] = request.get("id")
+        sys.stdout.flush()
+        sys.stderr.write("%s%s\n" % (WORKER_OUTPUT_END, request.get("id")))
+        sys.stderr.flush()
+        protocol.write(json.dumps(response) + "\n")
+        protocol.flush()
+    return 0
+
+
+def main(dependencies,
+         uninstall=False,
+         cache=None,
+         force=False,
+         wheelhouse=None):
     """Prepare pip archive to be used for install.
 
     The whole block and  logic is taken from:
     - https://github.com/pypa/get-pip
     Thank you for that.
+
+    Args:
+    dependencies = a dependency or a list of dependencies
+    uninstall = uninstall the dependencies instead
+    cache = the folder of the pip cache, if exists
+    force = reinstall even the satisfied dependencies
+    wheelhouse = the folder of the wheelhouse, if exists
+
+    Returns:
+    The exit code(0 means success)
     """
+    if isinstance(dependencies, str):
+        dependencies = [dependencies]
+    dependencies = list(dependencies or [])
+    dependency = " ".join(dependencies)
     # Decide what to do
-    if not dependency or dependency.startswith("pip"):
+    if uninstall and dependencies:
+        print("Uninstalling dependency: %s." % dependency)
+        exit_code = uninstall_dependency(dependencies)
+        print("Uninstallation of dependency: %s finished." % dependency)
+        return exit_code
+    if not dependencies or (
+            len(dependencies) == 1 and dependency.startswith("pip")):
         # Just pip
         tmpdir = None
         try:
             # Create a temporary working directory
             tmpdir = tempfile.mkdtemp()
 
-            # Unpack the zipfile into the temporary directory
-            pip_zip = os.path.join(tmpdir, "pip.zip")
-            with open(pip_zip, "wb") as fp:
-                fp.write(b85decode(PIP_DATA.replace(b"\n", b"")))
+            find_links = None
+            if cache:
+                # Decoded only once, installed offline
+                pip_zip = prepare_pip_cache(cache)
+                find_links = os.path.dirname(pip_zip)
+            else:
+                # Unpack the zipfile into the temporary directory
+                pip_zip = os.path.join(tmpdir, "pip.zip")
+                with open(pip_zip, "wb") as fp:
+                    fp.write(b85decode(PIP_DATA.replace(b"\n", b"")))
 
             # Add the zipfile to sys.path so that we can import it
             sys.path.insert(0, pip_zip)
 
             # Run the bootstrap
-            pip_dependency(tmpdir=tmpdir)
+            return pip_dependency(
+                tmpdir=tmpdir, find_links=find_links, force=force)
         finally:
             print("Installation of pip finished.")
             # Clean up our temporary working directory
@@ -116,8 +400,10 @@ def main(dependency):
     elif dependency:
         print("Installing dependency: %s." % dependency)
         # The rest
-        other_dependency(dependency)
+        exit_code = other_dependency(dependencies, force, wheelhouse)
         print("Installation of dependency: %s finished." % dependency)
+        return exit_code
+    return 0
 
 
 PIP_DATA = b"""
@@ -27352,11 +27638,40 @@ if __name__ == "__main__":
                         dest='dependency',
                         help="Dependency to install",
                         default="pip")
+    parser.add_argument('--cache',
+                        dest='cache',
+                        help="Folder of the pip cache",
+                        default=None)
+    parser.add_argument('--force',
+                        dest='force',
+                        action='store_true',
+                        help="Reinstall even the satisfied dependencies")
+    parser.add_argument('--wheelhouse',
+                        dest='wheelhouse',
+                        help="Folder of the local wheels(find-links)",
+                        default=None)
+    parser.add_argument('--worker',
+                        dest='worker',
+                        action='store_true',
+                        help="Process JSON commands from stdin")
+    parser.add_argument('--dependencies',
+                        dest='dependencies',
+                        nargs=argparse.REMAINDER,
+                        help="Dependencies to install in one run(last arg)")
+    parser.add_argument('--uninstall',
+                        dest='uninstall',
+                        action='store_true',
+                        help="Uninstall the dependency")
     options = parser.parse_args()
     # print("args:", options)
-    dependency = None
+    dependencies = None
+    uninstall = False
     if options:
-        dependency = options.dependency
+        dependencies = options.dependencies or options.dependency
+        uninstall = options.uninstall
     
     # Let's roll
-    main(dependency)
+    if options and options.worker:
+        sys.exit(worker(options.wheelhouse))
+    sys.exit(main(dependencies, uninstall, options.cache, options.force,
+                  options.wheelhouse) or 0)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""Per-phase tracing of the start of the app.
+
+The phases are measured by monotonic timers as nested spans and stored
+as a JSON report(one per launch). When the tracing is not enabled, the
+spans cost nothing but a flag check.
+"""
+
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+__all__ = ['Tracer', 'get_tracer', 'trace', 'traced']
+
+TRACE_FILE_PREFIX = "trace_"
+# The number of the kept reports(the oldest ones are removed)
+MAX_TRACES = 20
+
+logger = logging.getLogger(__name__)
+
+
+class Span():
+    """A measured phase(with its nested phases)."""
+    def __init__(self, /, **kwargs):
+        self.name = kwargs.get("name", None)
+        self.attributes = kwargs.get("attributes", {})
+        self.start = time.perf_counter_ns()
+        self.end = None
+        self.error = None
+        self.children = []
+
+    def to_dict(self, origin: int) -> dict:
+        """Get the span as a dict.
+
+        Args:
+        origin (int)= the start of the trace(ns)
+
+        Returns:
+        A dict with the times in milliseconds(relative to the origin)
+        """
+        end = self.end if self.end is not None else time.perf_counter_ns()
+        span = {"name": self.name,
+                "start_ms": round((self.start - origin) / 1e6, 3),
+                "duration_ms": round((end - self.start) / 1e6, 3)}
+        if self.attributes:
+            span["attributes"] = self.attributes
+        if self.error:
+            span["error"] = self.error
+        if self.children:
+            span["children"] = [child.to_dict(origin)
+                                for child in self.children]
+        return span
+
+
+class Tracer():
+    """Collects the spans of the launch."""
+    def __init__(self, /, **kwargs):
+        self.enabled = kwargs.get("enabled", False)
+        self.origin = time.perf_counter_ns()
+        self.started_at = datetime.now()
+        self.spans = []
+        self.lock = threading.Lock()
+        # The open spans of every thread
+        self.local = threading.local()
+
+    def enable(self):
+        """Start the tracing(the trace starts now)."""
+        self.enabled = True
+        self.origin = time.perf_counter_ns()
+        self.started_at = datetime.now()
+        self.spans = []
+
+    def is_enabled(self) -> bool:
+        """Check if the tracing is enabled."""
+        return self.enabled
+
+    def get_stack(self) -> list:
+        """Get the open spans of the current thread."""
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def span(self, name: str, /, **attributes):
+        """Measure the phase(a context manager).
+
+        Args:
+        name (str)= the name of the phase
+        attributes = the details of the phase(JSON serializable)
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self.measure(name, attributes)
+
+    @contextmanager
+    def measure(self, name: str, attributes: dict):
+        """Open the span, nested in the current one of the thread."""
+        span = Span(name=name, attributes=attributes)
+        stack = self.get_stack()
+        if stack:
+            stack[-1].children.append(span)
+        else:
+            if threading.current_thread() is not threading.main_thread():
+                span.attributes["thread"] = threading.current_thread().name
+            with self.lock:
+                self.spans.append(span)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            span.end = time.perf_counter_ns()
+            stack.pop()
+
+    def get_report(self) -> dict:
+        """Get the trace of the launch."""
+        with self.lock:
+            spans = list(self.spans)
+        return {"started_at": self.started_at.isoformat(),
+                "pid": os.getpid(),
+                "argv": sys.argv,
+                "total_ms": round(
+                    (time.perf_counter_ns() - self.origin) / 1e6, 3),
+                "spans": [span.to_dict(self.origin) for span in spans]}
+
+    def save(self, folder: str) -> str | None:
+        """Store the trace to the folder.
+
+        Args:
+        folder (str)= the folder of the traces
+
+        Returns:
+        The path of the trace file
+        """
+        if not self.enabled or not folder:
+            return None
+        try:
+            Path(folder).mkdir(parents=True, exist_ok=True)
+            trace_file = Path(folder).joinpath(
+                TRACE_FILE_PREFIX + self.started_at.strftime(
+                    "%Y%m%d%H%M%S%f") + ".json")
+            with open(trace_file, "w", encoding="utf-8") as trace_out:
+                trace_out.write(json.dumps(self.get_report(), indent=4,
+                                           default=str))
+            traces = sorted(Path(folder).glob(TRACE_FILE_PREFIX + "*.json"))
+            for old_trace in traces[:-MAX_TRACES]:
+                old_trace.unlink(missing_ok=True)
+            logger.info("The trace of the launch is stored in %s.",
+                        trace_file)
+            return str(trace_file)
+        except Exception as e:
+            logger.error("Storing the trace failed(%s).", e)
+        return None
+
+
+# The tracer of the launch
+TRACER = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the tracer of the launch."""
+    return TRACER
+
+
+def trace(name: str, /, **attributes):
+    """Measure the phase by the tracer of the launch.
+
+    Args:
+    name (str)= the name of the phase
+    attributes = the details of the phase
+    """
+    return TRACER.span(name, **attributes)
+
+
+def traced(name: str):
+    """Measure every call of the function(a decorator).
+
+    Args:
+    name (str)= the name of the phase
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
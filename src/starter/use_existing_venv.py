@@ -2,11 +2,27 @@
 """Class that manages an existing virtual environment (venv)."""
 
 import logging
+import os
 import traceback
 import venv
+from pathlib import Path
+
+from starter.app_preparation_by_type.manifest import (
+    fingerprint_matches,
+    get_stat_fingerprint
+)
 
 __all__ = ['UseExistingVenv']
 
+# The context key of the stat fingerprint of the venv's interpreter and
+# scripts
+VENV_FINGERPRINT = "venv_fingerprint"
+PYVENV_CONFIG = "pyvenv.cfg"
+# The scripts written by 'setup_scripts'(the rest of the bin folder is
+# changed by the installs)
+ACTIVATION_SCRIPTS = ["activate", "activate.bat", "activate.csh",
+                      "activate.fish", "activate.nu", "Activate.ps1",
+                      "deactivate.bat"]
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +46,21 @@ class UseExistingVenv(venv.EnvBuilder):
             self.context = self.context_handler.get_context()
 
     def create(self):
-        """Hook for an existing virtual environment (venv)."""
+        """Hook for an existing virtual environment (venv).
+
+        The interpreter and the scripts are set up again only if their
+        stat fingerprint differs from the stored one.
+        """
         self.ensure_directories()
         if self.context:
+            if self.venv_unchanged():
+                logger.info("The venv is unchanged, skipping its setup.")
+                self.post_setup()
+                return
             try:
                 self.setup_python(self.context)
                 self.setup_scripts(self.context)
+                self.store_fingerprint()
                 self.post_setup()
             except Exception as e:
                 logger.error(
@@ -44,6 +69,61 @@ class UseExistingVenv(venv.EnvBuilder):
                 logger.error(traceback.format_exc())
                 raise
 
+    def get_fingerprint_files(self) -> list:
+        """Get the files set up by 'setup_python' and 'setup_scripts'.
+
+        Returns:
+        A list of paths(the base interpreter, the venv's interpreter,
+        the activation scripts and the venv config)
+        """
+        files = []
+        for key in ["executable", "env_exe"]:
+            value = getattr(self.context, key, None)
+            if value:
+                files.append(str(value))
+        bin_path = getattr(self.context, "bin_path", None)
+        if bin_path:
+            files += [str(Path(bin_path).joinpath(name))
+                      for name in ACTIVATION_SCRIPTS
+                      if Path(bin_path).joinpath(name).exists()]
+        env_dir = getattr(self.context, "env_dir", None)
+        if env_dir:
+            files.append(str(Path(env_dir).joinpath(PYVENV_CONFIG)))
+        return files
+
+    def get_fingerprint(self) -> dict:
+        """Get the stat fingerprint of the venv's interpreter and scripts.
+
+        Returns:
+        A dict in format '<path>: <stat fingerprint>'(None if missing)
+        """
+        fingerprint = {}
+        for file in self.get_fingerprint_files():
+            try:
+                fingerprint[file] = get_stat_fingerprint(
+                    os.stat(file, follow_symlinks=False))
+            except OSError:
+                fingerprint[file] = None
+        return fingerprint
+
+    def venv_unchanged(self) -> bool:
+        """Check if the venv matches the stored fingerprint."""
+        stored = getattr(self.context, VENV_FINGERPRINT, None)
+        if not isinstance(stored, dict) or not stored:
+            return False
+        current = self.get_fingerprint()
+        return stored.keys() == current.keys() and all(
+            current[file] is not None
+            and fingerprint_matches(stored[file], current[file])
+            for file in current)
+
+    def store_fingerprint(self):
+        """Store the fingerprint of the venv(after its setup)."""
+        if self.context_handler:
+            self.context_handler.set_value_for_key(
+                VENV_FINGERPRINT, self.get_fingerprint())
+            self.context = self.context_handler.get_context()
+
     def post_setup(self):
         """Let do something."""
         logger.info("Successfully loaded the venv context.")
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""Reads the metadata of the distributions installed in the venv.
+
+The '*.dist-info' folders of the venv are read directly(no pip process),
+so the requirements which are already satisfied can be skipped.
+
+The site-packages folders(purelib/platlib) are queried from the venv's
+interpreter once, when the venv is created, and kept in the context.
+"""
+
+import json
+import logging
+import os
+import re
+import subprocess
+from pathlib import Path
+
+from starter.app_preparation_by_type.requirements_lock import (
+    REQUIREMENT_NAME_REGEX,
+    normalize_name
+)
+
+__all__ = ['get_site_packages_folders', 'store_site_packages',
+           'get_installed_distributions', 'requirement_is_satisfied',
+           'get_unsatisfied_requirements']
+
+# The context keys of the site-packages(relative to the venv folder)
+SITE_PACKAGES_KEYS = ["purelib", "platlib"]
+SITE_PACKAGES_QUERY = (
+    "import json, os, sys, sysconfig; "
+    "print(json.dumps({key: os.path.relpath(sysconfig.get_path(key), "
+    "sys.prefix) for key in %s}))" % SITE_PACKAGES_KEYS)
+SITE_PACKAGES_TIMEOUT = 60
+
+METADATA_SUFFIXES = [".dist-info", ".egg-info"]
+SPECIFIER_REGEX = r"^\s*(===|~=|==|!=|<=|>=|<|>)\s*([^\s,;]+)\s*$"
+PLAIN_RELEASE_REGEX = r"^\d+(\.\d+)*$"
+# Compared without pip(the plain releases only)
+SIMPLE_OPERATORS = ["==", ">="]
+
+logger = logging.getLogger(__name__)
+
+
+def query_site_packages(python: str) -> dict:
+    """Query the site-packages folders from the venv's interpreter.
+
+    Args:
+    python (str)= the interpreter of the venv
+
+    Returns:
+    A dict {purelib/platlib: path relative to the venv folder}
+    """
+    result = subprocess.run(
+        [python, "-I", "-c", SITE_PACKAGES_QUERY], capture_output=True,
+        text=True, timeout=SITE_PACKAGES_TIMEOUT, check=True)
+    return json.loads(result.stdout)
+
+
+def store_site_packages(context_handler, python: str) -> bool:
+    """Store the site-packages folders of the venv to the context.
+
+    Args:
+    context_handler = the context handler of the venv
+    python (str)= the interpreter of the venv
+
+    Returns:
+    True if stored
+    """
+    if not context_handler or not python:
+        return False
+    try:
+        for key, value in query_site_packages(python).items():
+            context_handler.set_value_for_key(key, value)
+        return True
+    except Exception as e:
+        logger.warning("Cannot query the site-packages of the venv(%s).", e)
+    return False
+
+
+def get_site_packages_folders(env_dir: str, context_handler=None) -> list:
+    """Get the site-packages folders of the venv.
+
+    The folders stored in the context are used, the known layouts are
+    tried only for the venvs created before.
+
+    Args:
+    env_dir (str)= the root folder of the venv
+    context_handler = the context handler of the venv
+
+    Returns:
+    A list of existing site-packages folders
+    """
+    folders = []
+    if env_dir and Path(env_dir).exists():
+        candidates = []
+        if context_handler:
+            candidates = [Path(os.path.normpath(Path(env_dir).joinpath(
+                context_handler.get_value_for_key(key))))
+                for key in SITE_PACKAGES_KEYS
+                if context_handler.get_value_for_key(key)]
+        if not any(candidate.is_dir() for candidate in candidates):
+            # Windows: Lib/site-packages, POSIX: lib/pythonX.Y/site-packages
+            candidates = [Path(env_dir).joinpath("Lib", "site-packages")]
+            candidates += sorted(
+                Path(env_dir).glob("lib/python*/site-packages"))
+            candidates += sorted(
+                Path(env_dir).glob("lib64/python*/site-packages"))
+        for candidate in candidates:
+            if candidate.is_dir() and candidate.resolve() not in \
+                    [folder.resolve() for folder in folders]:
+                folders.append(candidate)
+    return folders
+
+
+def get_version_from_metadata(metadata_folder: Path) -> str | None:
+    """Read the version from the METADATA/PKG-INFO file."""
+    for name in ["METADATA", "PKG-INFO"]:
+        metadata_file = metadata_folder.joinpath(name)
+        if metadata_file.is_file():
+            with open(metadata_file, "r", encoding="utf-8",
+                      errors="replace") as metadata:
+                for line in metadata:
+                    if line.lower().startswith("version:"):
+                        return line.split(":", 1)[1].strip()
+                    if not line.strip():
+                        # End of the headers
+                        break
+    return None
+
+
+def get_installed_distributions(folders: list) -> dict:
+    """Get the installed distributions.
+
+    Args:
+    folders (list)= the site-packages folders
+
+    Returns:
+    A dict {normalized name: version}
+    """
+    installed = {}
+    for folder in folders:
+        try:
+            for item in Path(folder).iterdir():
+                suffix = next((suffix for suffix in METADATA_SUFFIXES
+                               if item.name.endswith(suffix)), None)
+                if not suffix or not item.is_dir():
+                    continue
+                # name-version.dist-info
+                name, _, version = item.name[:-len(suffix)].partition("-")
+                if not version or suffix != ".dist-info":
+                    version = get_version_from_metadata(item) or version
+                if name and version:
+                    installed.setdefault(normalize_name(name), version)
+        except Exception as e:
+            logger.warning(
+                "Cannot read the installed distributions in %s(%s).",
+                folder, e)
+    return installed
+
+
+def parse_release(version: str) -> tuple | None:
+    """Parse the plain release version(e.g. 1.2.0) to a comparable tuple.
+
+    Args:
+    version (str)= the version
+
+    Returns:
+    The release tuple(1.0 == 1.0.0) or None for the other versions(pre,
+    post, dev and local releases follow pip's rules)
+    """
+    if not re.match(PLAIN_RELEASE_REGEX, version.strip()):
+        return None
+    release = [int(part) for part in version.strip().split(".")]
+    while len(release) > 1 and release[-1] == 0:
+        release.pop()
+    return tuple(release)
+
+
+def requirement_is_satisfied(requirement: str,
+                             installed: dict) -> bool | None:
+    """Check if the requirement is satisfied by the installed version.
+
+    Only '==' and '>=' of the plain releases are compared here. The other
+    specifiers and the markers are checked by pip's rules, the extras, URLs
+    and options are left to pip's install.
+
+    Args:
+    requirement (str)= the requirement, e.g. 'wheel>=0.40'
+    installed (dict)= the installed distributions {name: version}
+
+    Returns:
+    True/False or None if the requirement must be checked by pip's rules
+    """
+    match = re.match(REQUIREMENT_NAME_REGEX, requirement.strip())
+    if not match:
+        return False
+    version = installed.get(normalize_name(match.group(1)))
+    specifiers = match.group(2).strip()
+    if version is None or "[" in specifiers or "@" in specifiers:
+        return False
+    if ";" in specifiers:
+        return None
+    current = parse_release(version)
+    decided = True
+    for specifier in filter(None, specifiers.split(",")):
+        parsed = re.match(SPECIFIER_REGEX, specifier)
+        if not parsed:
+            return False
+        wanted = parse_release(parsed.group(2))
+        if parsed.group(1) not in SIMPLE_OPERATORS or current is None or \
+                wanted is None:
+            decided = False
+        elif (parsed.group(1) == "==" and current != wanted) or \
+                (parsed.group(1) == ">=" and current < wanted):
+            return False
+    return True if decided else None
+
+
+def get_unsatisfied_requirements(requirements, env_dir: str,
+                                 context_handler=None,
+                                 check_requirements=None) -> list:
+    """Filter out the requirements already satisfied in the venv.
+
+    Args:
+    requirements = the requirements
+    env_dir (str)= the root folder of the venv
+    context_handler = the context handler of the venv
+    check_requirements = returns the unsatisfied ones of the requirements
+                         by pip's rules(or None), if exists
+
+    Returns:
+    A list of requirements which need to be installed
+    """
+    requirements = list(requirements)
+    installed = get_installed_distributions(
+        get_site_packages_folders(env_dir, context_handler))
+    satisfied = {requirement: requirement_is_satisfied(requirement, installed)
+                 for requirement in requirements}
+    undecided = [requirement for requirement in requirements
+                 if satisfied[requirement] is None]
+    if undecided:
+        checked = check_requirements(undecided) if check_requirements \
+            else None
+        for requirement in undecided:
+            # Left to pip if can't be checked
+            satisfied[requirement] = checked is not None and \
+                requirement not in checked
+    unsatisfied = [requirement for requirement in requirements
+                   if not satisfied[requirement]]
+    skipped = len(requirements) - len(unsatisfied)
+    if skipped:
+        logger.info("%s requirement(s) already satisfied in the venv.",
+                    skipped)
+    return unsatisfied
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""Golden template venv, cloned instead of building every new venv.
+
+The template(the venv with the PyInstaller's files, pip and setuptools)
+is built once per interpreter and Starter build. A new venv is a clone
+of it: the files are hardlinked(copied if not possible), only the paths
+pointing to the template are rewritten.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import types
+from pathlib import Path
+
+from starter.common import get_interpreter_fingerprint
+
+__all__ = ['VenvTemplate']
+
+TEMPLATE_VENV_FOLDER = "venv"
+TEMPLATE_CONTEXT_FILE = "context.json"
+# Written when the template is complete
+TEMPLATE_READY_FILE = "template_ready"
+# Folders with the scripts/executables of the venv
+SCRIPTS_FOLDERS = ["bin", "Scripts"]
+PYVENV_CONFIG = "pyvenv.cfg"
+# Only the text files are rewritten
+MAX_REWRITE_SIZE = 1024 * 1024
+# The files of the Starter build copied to every venv: the 'maginician'
+# script(with the bundled pip) and the PyInstaller's files
+STARTER_FOLDER = Path(__file__).parent
+MAGINICIAN_FILE = "maginician.py"
+INTERNAL_FOLDER = "_internal"
+
+logger = logging.getLogger(__name__)
+
+
+def get_build_identity() -> str:
+    """Get the identity of the Starter build.
+
+    The files copied to the venv are identified by their stat, so an
+    upgrade installed at the same path changes the identity.
+
+    Returns:
+    The identity in format '<name>:<size>:<mtime>|...'
+    """
+    files = [folder.joinpath(MAGINICIAN_FILE) for folder in
+             [STARTER_FOLDER, STARTER_FOLDER.parent]]
+    internal_folder = STARTER_FOLDER.parents[1].joinpath(INTERNAL_FOLDER)
+    if internal_folder.is_dir():
+        with os.scandir(internal_folder) as entries:
+            files += sorted(Path(entry.path) for entry in entries)
+    identity = []
+    for file in files:
+        try:
+            stat_result = os.stat(file)
+        except OSError:
+            continue
+        identity.append("%s:%s:%s" % (file.name, stat_result.st_size,
+                                      stat_result.st_mtime_ns))
+    return "|".join(identity)
+
+
+def get_template_key() -> str:
+    """Get the key of the template(the interpreter and Starter build)."""
+    identity = "|".join([get_interpreter_fingerprint(),
+                         str(Path(sys.executable).resolve()),
+                         get_build_identity()])
+    return hashlib.blake2b(identity.encode("utf-8"),
+                           digest_size=8).hexdigest()
+
+
+class VenvTemplate():
+    """Builds the template venv and clones it."""
+    def __init__(self, /, **kwargs):
+        self.templates_folder = kwargs.get("templates_folder", None)
+        self.key = kwargs.get("key", None) or get_template_key()
+
+    def get_template_folder(self) -> Path:
+        """Return the folder of the template(venv and its context)."""
+        return Path(self.templates_folder).joinpath(self.key)
+
+    def get_venv_folder(self) -> Path:
+        """Return the venv folder of the template."""
+        return self.get_template_folder().joinpath(TEMPLATE_VENV_FOLDER)
+
+    def get_context_file(self) -> Path:
+        """Return the context file of the template."""
+        return self.get_template_folder().joinpath(TEMPLATE_CONTEXT_FILE)
+
+    def is_ready(self) -> bool:
+        """Check if the template was completely built."""
+        return bool(self.templates_folder) and self.get_template_folder()\
+            .joinpath(TEMPLATE_READY_FILE).exists()
+
+    def prepare(self):
+        """Remove the incomplete template and the templates of other
+        interpreters, and create the folder of the template."""
+        if Path(self.templates_folder).exists():
+            for folder in Path(self.templates_folder).iterdir():
+                if folder.name != self.key:
+                    shutil.rmtree(str(folder), ignore_errors=True)
+        shutil.rmtree(str(self.get_template_folder()), ignore_errors=True)
+        self.get_template_folder().mkdir(parents=True)
+
+    def mark_ready(self):
+        """Mark the template as complete."""
+        self.get_template_folder().joinpath(TEMPLATE_READY_FILE).write_text(
+            get_interpreter_fingerprint(), encoding="utf-8")
+        logger.info("The template venv %s is ready.", self.get_venv_folder())
+
+    def clone(self, target_folder: str, context_handler):
+        """Clone the template to the target folder.
+
+        Args:
+        target_folder (str)= the (empty) folder of the new venv
+        context_handler = the context handler of the new venv
+        """
+        source = str(self.get_venv_folder())
+        target = str(target_folder)
+        replacements = [(source.encode("utf-8"), target.encode("utf-8"))]
+        Path(target).mkdir(parents=True, exist_ok=True)
+        for root, folders, files in os.walk(source):
+            relative = os.path.relpath(root, source)
+            destination = os.path.join(target, relative)
+            os.makedirs(destination, exist_ok=True)
+            for name in list(folders):
+                if os.path.islink(os.path.join(root, name)):
+                    # Symlinked folders(e.g. lib64) aren't walked
+                    folders.remove(name)
+                    files.append(name)
+            for name in files:
+                self.clone_file(os.path.join(root, name),
+                                os.path.join(destination, name),
+                                relative, replacements)
+        self.clone_context(source, target, context_handler)
+        logger.info("The venv %s was cloned from the template.", target)
+
+    def clone_file(self, source: str, target: str, relative: str,
+                   replacements: list):
+        """Clone a single file of the template.
+
+        The scripts and the config are copied(their paths are
+        rewritten), the rest is hardlinked.
+
+        Args:
+        source (str)= the file of the template
+        target (str)= the file of the new venv
+        relative (str)= the folder of the file relative to the venv
+        replacements (list)= the paths to rewrite [(old, new)]
+        """
+        if os.path.islink(source):
+            link = os.readlink(source)
+            for old, new in replacements:
+                link = link.replace(old.decode("utf-8"), new.decode("utf-8"))
+            os.symlink(link, target)
+            return
+        top_level = relative == "." or relative in SCRIPTS_FOLDERS
+        if top_level:
+            # The venv rewrites these files in place(python, activate)
+            with open(source, "rb") as source_file:
+                content = source_file.read(MAX_REWRITE_SIZE + 1)
+            if len(content) <= MAX_REWRITE_SIZE and b"\0" not in content:
+                for old, new in replacements:
+                    content = content.replace(old, new)
+                with open(target, "wb") as target_file:
+                    target_file.write(content)
+                shutil.copymode(source, target)
+            else:
+                shutil.copy2(source, target)
+            return
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def clone_context(self, source: str, target: str, context_handler):
+        """Store the template's context with the paths of the new venv.
+
+        Args:
+        source (str)= the venv folder of the template
+        target (str)= the venv folder of the clone
+        context_handler = the context handler of the new venv
+        """
+        with open(self.get_context_file(), "r", encoding="utf-8") as f_out:
+            content = json.loads(f_out.read())
+        context = types.SimpleNamespace()
+        for key, value in content.items():
+            if isinstance(value, str):
+                value = value.replace(source, target)
+            context.__setattr__(key, value)
+        context_handler.store_context_to_file(context)
+        context_handler.load_context()
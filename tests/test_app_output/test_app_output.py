@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Tests for the output of the started app."""
+
+import sys
+from pathlib import Path
+
+from starter.app_preparation_by_platform.app_output import AppOutput
+from starter.app_preparation_by_platform.platform_handler import (
+    PlatformHandler
+)
+
+# Writes ~1 MiB to both streams(more than the pipe buffer) and fails
+CHATTY_APP = "import sys\n" \
+    "for i in range(8192):\n" \
+    "    print('x' * 60, i)\n" \
+    "    print('e' * 60, i, file=sys.stderr)\n" \
+    "sys.exit(3)\n"
+
+
+def start_chatty_app(tmp_path, mode: str):
+    """Start the chatty app with the given output mode."""
+    app_file = tmp_path.joinpath("chatty.py")
+    app_file.write_text(CHATTY_APP)
+    handler = PlatformHandler(
+        app_output=mode,
+        app_logs_folder=str(tmp_path.joinpath("logs"))).get_handler()
+    started = handler.start_of_app(
+        "app", [sys.executable, str(app_file)], str(tmp_path))
+    return handler, started
+
+
+def test_ring_output_bounded(tmp_path, caplog):
+    """The chatty app doesn't block, only the tail of the output is kept
+    and reported."""
+    handler, started = start_chatty_app(tmp_path, "ring")
+    assert started
+    # The app failed, but it was started
+    assert len(handler.started_apps) == 1
+    assert handler.app_failed
+    assert "8191" in caplog.text and "exit code 3" in caplog.text
+    assert " 0\n" not in caplog.text
+
+
+def test_log_output(tmp_path):
+    """The output is streamed to the rotating log file of the app."""
+    handler, started = start_chatty_app(tmp_path, "log")
+    assert started
+    log_file = tmp_path.joinpath("logs", "chatty.log")
+    content = log_file.read_text()
+    assert content.count("\n") == 2 * 8192
+    assert "x" * 60 + " 8191" in content and "e" * 60 + " 0" in content
+
+
+def test_ring_buffer_size():
+    """The ring keeps at most its size(plus the last chunk)."""
+    output = AppOutput(mode="ring", ring_size=100)
+    for index in range(100):
+        output.write_ring(b"%05d\n" % index)
+    assert output.ring_bytes <= 100
+    assert output.get_tail().endswith("00099\n")
+    assert not AppOutput(mode="log").get_log_file()
+    assert Path(AppOutput(mode="log", logs_folder="logs", name="main")
+                .get_log_file()) == Path("logs", "main.log")
+
+
+def test_after_start_while_running(tmp_path):
+    """The callbacks run while the app runs, the start is recorded."""
+    marker = tmp_path.joinpath("marker")
+    app_file = tmp_path.joinpath("waiting.py")
+    app_file.write_text("import pathlib, sys, time\n"
+                        "while not pathlib.Path(sys.argv[1]).exists():\n"
+                        "    time.sleep(0.01)\n")
+    handler = PlatformHandler(app_output="ring").get_handler()
+    calls = []
+
+    def after_start():
+        calls.append(list(handler.started_apps))
+        # The app waits for the marker
+        marker.write_text("started")
+
+    handler.after_start.append(after_start)
+    assert handler.start_of_app(
+        "app", [sys.executable, str(app_file), str(marker)], str(tmp_path))
+    assert calls == [[{"args": [sys.executable, str(app_file), str(marker)],
+                       "cwd": str(tmp_path)}]]
@@ -5,7 +5,9 @@ from pathlib import Path
 
 import pytest
 
+from starter.app_preparation_by_type.update_planner import UpdatePlan
 from starter.app_run_preparation import AppPreparationAndRun
+from starter.launch_plan import LaunchPlan
 
 
 @pytest.fixture(scope="function")
@@ -51,6 +53,9 @@ def test_ready_and_start_nothing_to_install(app_run_preparation_instance):
 
 def test_ready_and_start_fail(app_run_preparation_instance, monkeypatch):
     """Call ready and start method and they will fail."""
+    # The layout of the app is classified from its files
+    app_folder = app_run_preparation_instance[1].get_path_app_folder()
+    Path(app_folder, "setup.py").write_text("")
     monkeypatch.setattr(Path, "joinpath", Exception("Exception"))
     with pytest.raises(Exception):
         app_run_preparation_instance[0].ready_and_start()
@@ -76,3 +81,117 @@ def test_app_files_changed(app_run_preparation_instance):
     # Check the files
     changed = app_run_preparation_instance[0].app_files_changed()
     assert not changed
+
+
+def test_use_generation_matching_requirements(app_run_preparation_instance):
+    """The venv generation built for the same requirements is reused."""
+    prepare, env_struct = app_run_preparation_instance
+    if not env_struct.generations_supported():
+        pytest.skip("Symlinks are not supported.")
+    app_folder = Path(env_struct.get_path_app_folder())
+    app_folder.joinpath("pyproject.toml").write_text("[project]")
+    requirements = app_folder.joinpath("requirements.txt")
+    generations = {}
+    for version in ["1", "2"]:
+        requirements.write_text("six==1.1%s" % version)
+        prepare.scanner.refresh()
+        key = prepare.get_generation_key()
+        generation = env_struct.prepare_staging_folder()
+        Path(env_struct.get_path_generation_venv_folder(generation))\
+            .joinpath("marker").write_text(version)
+        Path(generation).joinpath("context.json").write_text(
+            '{"env_exe": "python%s"}' % version)
+        prepare.generation_key = key
+        prepare.activate_generation(
+            generation, env_struct.get_path_context_file(),
+            env_struct.get_path_requirements_lock_file())
+        generations[version] = key
+    assert generations["1"] != generations["2"]
+    assert prepare.context_handler.get_value_for_key("env_exe") == "python2"
+    # Rollback to the first version of the requirements
+    requirements.write_text("six==1.11")
+    prepare.scanner.refresh()
+    prepare.app_files_changed()
+    plan = prepare.use_generation(UpdatePlan(install_dependencies=True))
+    assert not plan.rebuild and not plan.install_dependencies
+    assert Path(env_struct.get_path_venv_folder()).joinpath(
+        "marker").read_text() == "1"
+    assert prepare.context_handler.get_value_for_key("env_exe") == "python1"
+
+
+def test_launch_plan_not_stored_with_failed_requirements(
+        app_run_preparation_instance, tmp_path):
+    """The dependencies which failed to install keep the launch plan out."""
+    prepare, env_struct = app_run_preparation_instance
+    app_folder = Path(env_struct.get_path_app_folder())
+    app_folder.joinpath("pyproject.toml").write_text("[project]")
+    app_folder.joinpath("requirements.txt").write_text("six\nbroken\n")
+    prepare.app_files_changed()
+    prepare.platform_handler.started_apps.append(
+        {"args": ["python", "main.py"], "cwd": str(app_folder)})
+    launch_plan = LaunchPlan(plan_file=str(tmp_path.joinpath("plan.json")))
+    prepare.requirements_lock.save(["six"])
+    prepare.save_launch_plan(launch_plan, {})
+    assert not Path(launch_plan.get_plan_file()).exists()
+    prepare.requirements_lock.save(["six", "broken"])
+    prepare.save_launch_plan(launch_plan, {})
+    assert Path(launch_plan.get_plan_file()).exists()
+
+
+def test_use_generation_without_match(app_run_preparation_instance):
+    """The requirements without a venv generation are installed in the
+    active one(a delta, no rebuild)."""
+    prepare, env_struct = app_run_preparation_instance
+    if not env_struct.generations_supported():
+        pytest.skip("Symlinks are not supported.")
+    app_folder = Path(env_struct.get_path_app_folder())
+    app_folder.joinpath("pyproject.toml").write_text("[project]")
+    requirements = app_folder.joinpath("requirements.txt")
+    requirements.write_text("six==1.11")
+    prepare.scanner.refresh()
+    generation = env_struct.prepare_staging_folder()
+    Path(env_struct.get_path_generation_venv_folder(generation))\
+        .joinpath("marker").write_text("1")
+    prepare.generation_key = prepare.get_generation_key()
+    prepare.activate_generation(
+        generation, env_struct.get_path_context_file(),
+        env_struct.get_path_requirements_lock_file())
+    requirements.write_text("six==1.12")
+    prepare.scanner.refresh()
+    prepare.app_files_changed()
+    plan = prepare.use_generation(UpdatePlan(install_dependencies=True))
+    assert plan.install_dependencies
+    assert not plan.rebuild
+    # The key is stored right before the start
+    assert env_struct.get_generation_key(generation) != \
+        prepare.get_generation_key()
+    prepare.platform_handler.before_start()
+    assert env_struct.get_generation_key(generation) == \
+        prepare.get_generation_key()
+
+
+def test_launch_plan_of_processed_files(app_run_preparation_instance,
+                                        tmp_path):
+    """The edits made while the app runs aren't recorded as validated and
+    the failed app doesn't keep the plan."""
+    prepare, env_struct = app_run_preparation_instance
+    app_folder = Path(env_struct.get_path_app_folder())
+    app_folder.joinpath("pyproject.toml").write_text("[project]")
+    requirements = app_folder.joinpath("requirements.txt")
+    requirements.write_text("six\n")
+    prepare.app_files_changed()
+    prepare.requirements_lock.save(["six"])
+    prepare.platform_handler.started_apps.append(
+        {"args": ["python", "main.py"], "cwd": str(app_folder)})
+    launch_plan = LaunchPlan(plan_file=str(tmp_path.joinpath("plan.json")))
+    prepare.save_launch_plan(launch_plan, {})
+    assert launch_plan.is_valid({})
+    # Edited while the app runs
+    requirements.write_text("six\nwheel\n")
+    prepare.requirements_lock.save(["six", "wheel"])
+    prepare.save_launch_plan(launch_plan, {})
+    assert not launch_plan.is_valid({})
+    launch_plan.remove()
+    prepare.platform_handler.app_failed = True
+    prepare.save_launch_plan(launch_plan, {})
+    assert not Path(launch_plan.get_plan_file()).exists()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Tests for the detection of the entry point."""
+
+import pytest
+
+from starter.app_preparation_by_type.entry_point import (
+    detect_entry_points,
+    has_entry_point
+)
+
+
+@pytest.mark.parametrize("content, expected", [
+    ('if __name__ == "__main__":\n    pass\n', True),
+    ("if __name__ == '__main__':\n    pass\n", True),
+    ('if "__main__" == __name__:\n    pass\n', True),
+    ('"""Run as:\n\nif __name__ == "__main__":\n"""\nVALUE = 1\n', False),
+    ('# if __name__ == "__main__":\nVALUE = 1\n', False),
+    ("VALUE = 1\n", False),
+    ("", False),
+    # Not valid for the ast(python 2), confirmed by the tokens
+    ('print "hello"\nif __name__ == "__main__":\n    pass\n', True),
+])
+def test_entry_point_detected(tmp_path, content, expected):
+    """Only the real guard counts, in both quote styles."""
+    file_path = tmp_path.joinpath("module.py")
+    file_path.write_text(content)
+
+    assert has_entry_point(str(file_path)) is expected
+
+
+def test_encoding_declared(tmp_path):
+    """The file in the declared encoding is parsed."""
+    file_path = tmp_path.joinpath("module.py")
+    file_path.write_bytes(
+        "# -*- coding: latin-1 -*-\nNAME = 'café'\n"
+        "if __name__ == '__main__':\n    pass\n".encode("latin-1"))
+
+    assert has_entry_point(str(file_path))
+
+
+def test_detected_in_parallel(tmp_path):
+    """Every file gets its result."""
+    files = []
+    for number in range(10):
+        file_path = tmp_path.joinpath("module_%s.py" % number)
+        file_path.write_text(
+            'if __name__ == "__main__":\n    pass\n' if number % 2 else "")
+        files.append(str(file_path))
+
+    detected = detect_entry_points(files)
+
+    assert [detected[file] for file in files] == [False, True] * 5
@@ -264,3 +264,76 @@ def test_folder_is_not_empty(environment_structure_designated):
     # Prepare the struct
     env_struct.prepare_env_structure()
     assert not env_struct.folder_is_empty(root_location)
+
+
+def test_wheelhouse_survives_clear(environment_structure_designated):
+    """The wheelhouse is kept when the venv and config are cleared."""
+    env_struct = environment_structure_designated[0]
+    env_struct.prepare_env_structure()
+    wheelhouse = Path(env_struct.get_path_wheelhouse_folder())
+    wheelhouse.mkdir()
+    wheelhouse.joinpath("six-1.0-py3-none-any.whl").write_text("")
+    env_struct.clear_environment_exclude_app_folder()
+    assert wheelhouse.joinpath("six-1.0-py3-none-any.whl").exists()
+
+
+def test_activate_generation_keeps_previous(
+        environment_structure_designated):
+    """The venv is switched to the new generation, the previous one is
+    kept and the older ones are removed."""
+    env_struct = environment_structure_designated[0]
+    env_struct.prepare_env_structure()
+    if not env_struct.generations_supported():
+        pytest.skip("Symlinks are not supported.")
+    env_struct.max_generations = 2
+    venv_link = Path(env_struct.get_path_venv_folder())
+    # The venv built in place is replaced by the first generation
+    venv_link.joinpath("legacy_file").write_text("legacy")
+    generations = []
+    for _ in range(3):
+        generation = env_struct.prepare_staging_folder()
+        Path(env_struct.get_path_generation_venv_folder(generation))\
+            .joinpath("marker").write_text(generation)
+        env_struct.activate_generation(generation)
+        generations.append(generation)
+        assert venv_link.is_symlink()
+        assert venv_link.joinpath("marker").read_text() == generation
+        assert env_struct.get_active_generation() == generation
+    assert not venv_link.joinpath("legacy_file").exists()
+    assert not Path(generations[0]).exists()
+    assert Path(generations[1]).exists()
+    # Removing the venv removes all generations
+    env_struct.remove_venv_folder()
+    assert not venv_link.exists() and not venv_link.is_symlink()
+    assert not Path(env_struct.get_path_generations_folder()).exists()
+
+
+def test_find_generation_least_recently_used_evicted(
+        environment_structure_designated):
+    """The generations are found by the key, the least recently used one
+    is evicted over the limit."""
+    env_struct = environment_structure_designated[0]
+    env_struct.prepare_env_structure()
+    if not env_struct.generations_supported():
+        pytest.skip("Symlinks are not supported.")
+    env_struct.max_generations = 3
+    generations = {}
+    for key in ["first", "second", "third"]:
+        generation = env_struct.prepare_staging_folder()
+        Path(env_struct.get_path_generation_venv_folder(generation))\
+            .joinpath("marker").write_text(key)
+        env_struct.activate_generation(generation, key)
+        generations[key] = generation
+    assert env_struct.find_generation("second") == generations["second"]
+    assert not env_struct.find_generation("unknown")
+    # "first" is used again, "second" becomes the least recently used
+    env_struct.activate_generation(generations["first"])
+    assert env_struct.get_generation_key(generations["first"]) == "first"
+    generation = env_struct.prepare_staging_folder()
+    Path(env_struct.get_path_generation_venv_folder(generation))\
+        .joinpath("marker").write_text("fourth")
+    env_struct.activate_generation(generation, "fourth")
+    assert env_struct.find_generation("first") == generations["first"]
+    assert env_struct.find_generation("third") == generations["third"]
+    assert not env_struct.find_generation("second")
+    assert not Path(generations["second"]).exists()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Tests for the incremental sync of the PyInstaller's files."""
+
+import os
+from pathlib import Path
+
+from starter.app_preparation_by_platform import folder_sync
+from starter.app_preparation_by_platform.folder_sync import sync_folder
+
+
+def test_sync_folder(tmp_path):
+    """Only the missing/stale files are copied, the removed deleted."""
+    source = Path(tmp_path).joinpath("_internal")
+    target = Path(tmp_path).joinpath("venv", "_internal")
+    source.joinpath("lib").mkdir(parents=True)
+    source.joinpath("base_library.zip").write_text("zip")
+    source.joinpath("lib", "module.py").write_text("print('hello')")
+    source.joinpath("python").write_text("binary")
+    counts = sync_folder(source, target, exclude=["python"])
+    assert counts["copied"] == 2
+    assert not target.joinpath("python").exists()
+
+    # Nothing changed
+    assert sync_folder(source, target, exclude=["python"])["kept"] == 2
+
+    # Touched(same content), changed and removed
+    stat = source.joinpath("base_library.zip").stat()
+    os.utime(source.joinpath("base_library.zip"),
+             ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    source.joinpath("lib", "module.py").write_text("print('hello world')")
+    source.joinpath("lib", "new.py").write_text("")
+    counts = sync_folder(source, target, exclude=["python"])
+    assert counts == {"copied": 2, "linked": 0, "kept": 1, "removed": 0}
+    assert target.joinpath("lib", "module.py").read_text() == \
+        "print('hello world')"
+    source.joinpath("lib", "new.py").unlink()
+    assert sync_folder(source, target)["removed"] == 1
+    assert not target.joinpath("lib", "new.py").exists()
+
+
+def test_sync_folder_links_libraries(tmp_path, monkeypatch):
+    """The large shared libraries are hardlinked."""
+    monkeypatch.setattr(folder_sync, "LINK_MIN_SIZE", 1)
+    source = Path(tmp_path).joinpath("_internal")
+    target = Path(tmp_path).joinpath("venv", "_internal")
+    source.mkdir()
+    source.joinpath("libpython3.12.so.1.0").write_text("library")
+    assert sync_folder(source, target)["linked"] == 1
+    assert os.path.samefile(source.joinpath("libpython3.12.so.1.0"),
+                            target.joinpath("libpython3.12.so.1.0"))
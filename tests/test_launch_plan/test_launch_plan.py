@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Tests for the launch plan."""
+
+import os
+
+import pytest
+
+from starter.launch_plan import LaunchPlan
+
+ARGUMENTS = {"app_path": "", "main_file": "main.py"}
+
+
+class RecordingPlatform():
+    """Records the started commands."""
+    def __init__(self):
+        self.started = []
+
+    def launch_app(self, name, args, cwd):
+        self.started.append((args, cwd))
+        return True
+
+
+@pytest.fixture(scope="function")
+def saved_plan(tmp_path):
+    """The plan of the started app."""
+    app_folder = tmp_path.joinpath("app")
+    app_folder.mkdir()
+    main_file = app_folder.joinpath("main.py")
+    main_file.write_text("print('hello')")
+    starts = [{"args": ["python", str(main_file), "--debug"],
+               "cwd": str(app_folder)}]
+    launch_plan = LaunchPlan(plan_file=str(tmp_path.joinpath("plan.json")))
+    launch_plan.save(starts, ARGUMENTS, [str(app_folder), str(main_file)])
+
+    yield (LaunchPlan(plan_file=launch_plan.get_plan_file()), app_folder)
+
+
+def test_valid_plan_starts_app(saved_plan):
+    """The unchanged app is started by the plan."""
+    launch_plan, app_folder = saved_plan
+    platform = RecordingPlatform()
+    assert launch_plan.is_valid(ARGUMENTS)
+    assert launch_plan.start(platform)
+    assert platform.started == [
+        (["python", str(app_folder.joinpath("main.py")), "--debug"],
+         str(app_folder))]
+    assert launch_plan.plan["starts"][0]["params"] == ["--debug"]
+
+
+def test_plan_invalidated(saved_plan):
+    """Changed arguments, files or folders invalidate the plan."""
+    launch_plan, app_folder = saved_plan
+    assert not launch_plan.is_valid({"app_path": "", "main_file": "app.py"})
+    main_file = app_folder.joinpath("main.py")
+    stat = os.stat(main_file)
+    os.utime(main_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert not launch_plan.is_valid(ARGUMENTS)
+
+
+def test_removed_plan(saved_plan):
+    """There is nothing to start without the plan."""
+    launch_plan = saved_plan[0]
+    launch_plan.remove()
+    assert not launch_plan.is_valid(ARGUMENTS)
+    assert not launch_plan.start(RecordingPlatform())
+
+
+def test_plan_recorded_stats(tmp_path):
+    """The stat taken before the preparation is recorded, the later edits
+    invalidate the plan."""
+    main_file = tmp_path.joinpath("main.py")
+    main_file.write_text("print('hello')")
+    scanned = os.stat(main_file)
+    stat = main_file.stat()
+    os.utime(main_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    launch_plan = LaunchPlan(plan_file=str(tmp_path.joinpath("plan.json")))
+    starts = [{"args": ["python", str(main_file)], "cwd": str(tmp_path)}]
+    launch_plan.save(starts, ARGUMENTS, [str(main_file)],
+                     {str(main_file): scanned})
+    assert not launch_plan.is_valid(ARGUMENTS)
+    launch_plan.save(starts, ARGUMENTS, [str(main_file)])
+    assert launch_plan.is_valid(ARGUMENTS)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Tests for the layout probe of the app folder."""
+
+import pytest
+
+from starter.app_preparation_by_type.common import (
+    get_all_dependencies_setuptools_approach
+)
+from starter.app_preparation_by_type.layout_probe import AppLayoutProbe
+from starter.app_preparation_by_type.other import OtherProcessing
+from starter.app_preparation_by_type.scanner import TreeScanner
+
+
+@pytest.fixture(scope="function")
+def app_folder(tmp_path):
+    """The app with packages, requirements and a wheel."""
+    folder = tmp_path.joinpath("app")
+    for package in ["src/first", "src/first/sub", "second"]:
+        folder.joinpath(package).mkdir(parents=True)
+        folder.joinpath(package, "__init__.py").write_text("")
+    folder.joinpath("app-1.0-py3-none-any.whl").write_text("")
+    folder.joinpath("setup.py").write_text("")
+    folder.joinpath("requirements.txt").write_text("six\n")
+    folder.joinpath("src", "tool.toml").write_text("")
+    folder.joinpath(".env").write_text("")
+
+    yield folder
+
+
+def test_layout_classified(app_folder):
+    """The app folder is classified from the single scan."""
+    probe = AppLayoutProbe(app_path=str(app_folder))
+
+    assert probe.get_wheel_file() == \
+        str(app_folder.joinpath("app-1.0-py3-none-any.whl"))
+    assert probe.get_setup_file() == str(app_folder.joinpath("setup.py"))
+    assert probe.get_pyproject_file() is None
+    assert probe.get_toml_files() == [str(app_folder.joinpath(
+        "src", "tool.toml"))]
+    assert probe.get_requirement_files() == [str(app_folder.joinpath(
+        "requirements.txt"))]
+    assert probe.get_package_roots() == ["second", "src/first"]
+    assert probe.get_extra_files() == [
+        str(app_folder.joinpath(name)) for name in
+        ["requirements.txt", "second", "setup.py", "src"]]
+
+
+def test_layout_follows_scanner(app_folder):
+    """The layout is classified again after the refresh of the scanner."""
+    scanner = TreeScanner(root_folder=str(app_folder))
+    probe = AppLayoutProbe(app_path=str(app_folder), scanner=scanner)
+    assert probe.get_pyproject_file() is None
+    app_folder.joinpath("pyproject.toml").write_text("")
+    # The scan is cached
+    assert probe.get_pyproject_file() is None
+
+    scanner.refresh()
+
+    assert probe.get_pyproject_file() == \
+        str(app_folder.joinpath("pyproject.toml"))
+
+
+def test_requirements_from_probe(app_folder):
+    """The requirement files are taken from the probe."""
+    scanner = TreeScanner(root_folder=str(app_folder))
+    probe = AppLayoutProbe(app_path=str(app_folder), scanner=scanner)
+    assert get_all_dependencies_setuptools_approach(
+        str(app_folder), layout_probe=probe) == {"six"}
+    app_folder.joinpath("requirements-dev.txt").write_text("pytest\n")
+    # The scan is cached
+    assert get_all_dependencies_setuptools_approach(
+        str(app_folder), layout_probe=probe) == {"six"}
+    scanner.refresh()
+    assert get_all_dependencies_setuptools_approach(
+        str(app_folder), layout_probe=probe) == {"six", "pytest"}
+
+
+def test_root_folder_from_probe(app_folder):
+    """The folder containing the package roots is the root of the app."""
+    probe = AppLayoutProbe(app_path=str(app_folder))
+    other = OtherProcessing(app_path=str(app_folder), layout_probe=probe)
+    # The roots in different folders('second', 'src/first')
+    assert other.search_common_root_folder() == str(app_folder)
+
+    app_folder.joinpath("second", "__init__.py").unlink()
+    probe.scanner.refresh()
+
+    assert other.search_common_root_folder() == \
+        str(app_folder.joinpath("src"))
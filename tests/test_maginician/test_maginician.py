@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Tests for the 'maginician' script."""
+
+import zipfile
+from pathlib import Path
+
+from starter import maginician
+
+
+def test_prepare_pip_cache(tmp_path, monkeypatch):
+    """The pip wheel is built once and reused without decoding."""
+    wheel = maginician.prepare_pip_cache(str(tmp_path))
+    assert Path(wheel).parent.name == maginician.get_pip_cache_key()
+    with zipfile.ZipFile(wheel) as archive:
+        names = archive.namelist()
+    assert "pip/__init__.py" in names
+    assert any(name.endswith(".dist-info/RECORD") for name in names)
+
+    def no_decode(data):
+        raise AssertionError("PIP_DATA decoded again")
+
+    monkeypatch.setattr(maginician, "b85decode", no_decode)
+    assert maginician.prepare_pip_cache(str(tmp_path)) == wheel
+
+
+def test_prepare_pip_cache_prunes(tmp_path):
+    """Entries of other pip versions are removed."""
+    Path(tmp_path).joinpath("old_key").mkdir()
+    maginician.prepare_pip_cache(str(tmp_path))
+    assert not Path(tmp_path).joinpath("old_key").exists()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Tests for the index of the main files."""
+
+import os
+
+import pytest
+
+from starter.app_preparation_by_type import entry_point
+from starter.app_preparation_by_type.main_file_index import MainFileIndex
+
+MAIN_CONTENT = 'if __name__ == "__main__":\n    print("main")\n'
+
+
+@pytest.fixture(scope="function")
+def app_folder(tmp_path):
+    """The app with a main file and a module."""
+    folder = tmp_path.joinpath("app")
+    folder.joinpath("package").mkdir(parents=True)
+    folder.joinpath("main.py").write_text(MAIN_CONTENT)
+    folder.joinpath("package", "module.py").write_text("VALUE = 1\n")
+
+    yield folder
+
+
+def test_main_files_found(app_folder, tmp_path):
+    """Only the files with the entry point are returned."""
+    index = MainFileIndex(index_file=str(tmp_path.joinpath("index.json")))
+
+    assert index.get_main_files(str(app_folder)) == \
+        [str(app_folder.joinpath("main.py"))]
+    assert os.path.exists(index.get_index_file())
+
+
+def test_unchanged_files_not_read(app_folder, tmp_path, monkeypatch):
+    """The next launch reads only the changed files."""
+    index_file = str(tmp_path.joinpath("index.json"))
+    MainFileIndex(index_file=index_file).get_main_files(str(app_folder))
+    read_files = []
+    original = entry_point.has_entry_point
+
+    def recording(file_path):
+        read_files.append(file_path)
+        return original(file_path)
+
+    monkeypatch.setattr(entry_point, "has_entry_point", recording)
+    module = app_folder.joinpath("package", "module.py")
+    module.write_text(MAIN_CONTENT + "# changed\n")
+
+    main_files = MainFileIndex(index_file=index_file).get_main_files(
+        str(app_folder))
+
+    assert read_files == [str(module)]
+    assert main_files == [str(app_folder.joinpath("main.py")), str(module)]
+
+
+def test_removed_file_dropped(app_folder, tmp_path):
+    """The removed main file is not served from the index."""
+    index_file = str(tmp_path.joinpath("index.json"))
+    MainFileIndex(index_file=index_file).get_main_files(str(app_folder))
+    app_folder.joinpath("main.py").unlink()
+
+    assert MainFileIndex(index_file=index_file).get_main_files(
+        str(app_folder)) == []
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Tests for the manifest of the app files."""
+
+import os
+from pathlib import Path
+
+from starter.app_preparation_by_type.manifest import (
+    MANIFEST_HASH,
+    get_change_set,
+    get_change_set_by_manifest,
+    get_manifest_of_files,
+    manifest_changed
+)
+
+
+def test_get_manifest_of_files(tmp_path):
+    """Get the manifest - every file has a fingerprint and a hash."""
+    Path(tmp_path).joinpath("main.py").write_text("print('hello')")
+    Path(tmp_path).joinpath("readme.txt").write_text("readme")
+    manifest = get_manifest_of_files(str(tmp_path), ["*.py"])
+    assert list(manifest.keys()) == ["main.py"]
+    assert manifest["main.py"][MANIFEST_HASH]
+
+
+def test_manifest_mtime_changed_only(tmp_path):
+    """Touching the file (new mtime, same content) isn't a change."""
+    file = Path(tmp_path).joinpath("main.py")
+    file.write_text("print('hello')")
+    previous = get_manifest_of_files(str(tmp_path), ["*.py"])
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    current = get_manifest_of_files(str(tmp_path), ["*.py"], previous)
+    assert current != previous
+    assert not manifest_changed(previous, current)
+
+
+def test_manifest_content_changed(tmp_path):
+    """Changing the content is detected."""
+    file = Path(tmp_path).joinpath("main.py")
+    file.write_text("print('hello')")
+    previous = get_manifest_of_files(str(tmp_path), ["*.py"])
+    file.write_text("print('hello world')")
+    current = get_manifest_of_files(str(tmp_path), ["*.py"], previous)
+    assert manifest_changed(previous, current)
+
+
+def test_get_change_set_by_manifest_refresh(config_handler, tmp_path):
+    """Unchanged content refreshes the stored fingerprints."""
+    app_folder = Path(tmp_path).joinpath("my_app")
+    app_folder.mkdir()
+    file = app_folder.joinpath("main.py")
+    file.write_text("print('hello')")
+    config_handler.set_app_files(
+        get_manifest_of_files(str(app_folder), ["*.py"]))
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not get_change_set_by_manifest(
+        config_handler, str(app_folder), ["*.py"])
+    assert config_handler.get_app_files()["main.py"]["mtime_ns"] == \
+        file.stat().st_mtime_ns
+
+
+def test_get_change_set(tmp_path):
+    """Added, removed and modified files are classified."""
+    Path(tmp_path).joinpath("main.py").write_text("print('hello')")
+    Path(tmp_path).joinpath("old.py").write_text("print('old')")
+    Path(tmp_path).joinpath("requirements.txt").write_text("wheel")
+    filters = ["*.py", "*requirement*"]
+    previous = get_manifest_of_files(str(tmp_path), filters)
+    Path(tmp_path).joinpath("old.py").unlink()
+    Path(tmp_path).joinpath("new.py").write_text("print('new')")
+    Path(tmp_path).joinpath("requirements.txt").write_text("wheel==0.45.1")
+    current = get_manifest_of_files(str(tmp_path), filters, previous)
+    change_set = get_change_set(previous, current)
+    assert change_set.added == {"new.py": "source"}
+    assert change_set.removed == {"old.py": "source"}
+    assert change_set.modified == {"requirements.txt": "dependency"}
@@ -2,11 +2,14 @@
 """Tests for the by_platform logic."""
 
 import platform
+import sys
+from pathlib import Path
 
 from starter.app_preparation_by_platform.linux import LinuxPlatform
 from starter.app_preparation_by_platform.platform_handler import \
     PlatformHandler
 from starter.app_preparation_by_platform.windows import WindowsPlatform
+from starter.app_preparation_by_platform.worker import MaginicianWorker
 
 
 def test_init():
@@ -21,3 +24,85 @@ def test_init():
         assert isinstance(handler, WindowsPlatform)
     if platform.system().lower() == "linux":
         assert isinstance(handler, LinuxPlatform)
+
+
+def test_install_dependencies_batch(monkeypatch):
+    """One pip run for all; one by one only if the batch fails."""
+    handler = PlatformHandler().get_handler()
+    runs = []
+
+    def run_maginician(names, uninstall=False):
+        runs.append(list(names))
+        return "broken" not in names
+
+    monkeypatch.setattr(handler, "context_handler", object())
+    monkeypatch.setattr(handler, "run_maginician", run_maginician)
+    monkeypatch.setattr(handler, "get_unsatisfied_dependencies", list)
+    assert handler.install_dependencies(["wheel", "six"]) == []
+    assert runs == [["wheel", "six"]]
+    runs.clear()
+    assert handler.install_dependencies(["wheel", "broken"]) == ["broken"]
+    assert runs == [["wheel", "broken"], ["wheel"], ["broken"]]
+
+
+def test_worker():
+    """The worker processes several commands in one process."""
+    script = Path(__file__).parents[2].joinpath(
+        "src", "starter", "maginician.py")
+    worker = MaginicianWorker(python=sys.executable, script=str(script))
+    try:
+        assert worker.unsatisfied(["pytest", "not-installed-pkg"]) == \
+            ["not-installed-pkg"]
+        pid = worker.process.pid
+        response = worker.request("uninstall", ["not-installed-pkg"])
+        assert any("not-installed-pkg" in line
+                   for line in response["output"])
+        # The output of the previous request doesn't leak into the next
+        assert worker.request("satisfied", ["pytest"])["output"] == []
+        assert worker.process.pid == pid
+    finally:
+        worker.stop()
+    assert not worker.is_running()
+
+
+def test_wheelhouse_find_links(tmp_path):
+    """The wheelhouse is a find-links source of every pip run."""
+    handler = PlatformHandler(wheelhouse_folder=str(tmp_path)).get_handler()
+    assert handler.get_pip_environment()["PIP_FIND_LINKS"] == str(tmp_path)
+    assert handler.get_wheelhouse_args() == ["--wheelhouse", str(tmp_path)]
+
+
+def test_exec_app(tmp_path, monkeypatch):
+    """The Starter is replaced by the app, the child process is used only
+    if the exec fails."""
+    handler = LinuxPlatform(exec_app=True)
+    calls = []
+    handler.before_exec.append(lambda: calls.append("before_exec"))
+    monkeypatch.setattr(handler, "start_of_app",
+                        lambda name, args, cwd: calls.append("child"))
+
+    def execv(path, args):
+        calls.append(("exec", path, args, str(Path.cwd())))
+        raise SystemExit(0)
+
+    monkeypatch.setattr("os.execv", execv)
+    command = [sys.executable, "main.py"]
+    cwd = Path.cwd()
+    try:
+        handler.launch_app("app", command, str(tmp_path))
+    except SystemExit:
+        pass
+    finally:
+        monkeypatch.chdir(cwd)
+    assert calls == ["before_exec",
+                     ("exec", sys.executable, command, str(tmp_path))]
+    assert handler.started_apps == [{"args": command, "cwd": str(tmp_path)}]
+
+    def failing_execv(path, args):
+        raise OSError("not executable")
+
+    calls.clear()
+    monkeypatch.setattr("os.execv", failing_execv)
+    handler.launch_app("app", command, str(tmp_path))
+    assert calls == ["before_exec", "child"]
+    assert Path.cwd() == cwd
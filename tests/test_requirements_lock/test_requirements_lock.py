@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Tests for the lock of the installed requirements."""
+
+from pathlib import Path
+
+from starter.app_preparation_by_type.common import (
+    install_dependencies_delta
+)
+from starter.app_preparation_by_type.requirements_lock import (
+    RequirementsLock,
+    get_requirement_name,
+    normalize_requirement
+)
+
+
+class RecordingPlatform():
+    """Platform handler recording the (un)installed dependencies."""
+    def __init__(self, failing=[]):
+        self.installed = []
+        self.uninstalled = []
+        self.failing = failing
+
+    def install_dependencies(self, dependencies):
+        self.installed.extend(dependencies)
+        return [item for item in dependencies if item in self.failing]
+
+    def uninstall_dependencies(self, dependencies):
+        self.uninstalled.extend(dependencies)
+        return []
+
+
+def test_normalize_requirement():
+    """The names and whitespaces are normalized."""
+    assert normalize_requirement("Django >= 4.0") == "django>=4.0"
+    assert normalize_requirement("zope.interface==6.0") == \
+        "zope-interface==6.0"
+    assert get_requirement_name("requests[socks]>=2.0") == "requests"
+    assert get_requirement_name("-r other.txt") is None
+
+
+def test_get_delta(tmp_path):
+    """Only the added/changed are installed, the removed uninstalled."""
+    lock = RequirementsLock(lock_file=str(Path(tmp_path).joinpath("l.json")))
+    to_install, to_uninstall = lock.get_delta(["wheel", "six==1.0"])
+    assert to_install == {"wheel", "six==1.0"}
+    assert not to_uninstall
+    lock.save(["wheel", "six==1.0"])
+    to_install, to_uninstall = lock.get_delta(["Wheel", "attrs"])
+    assert to_install == {"attrs"}
+    assert to_uninstall == {"six"}
+
+
+def test_install_dependencies_delta(tmp_path):
+    """The failed dependencies are not locked(retried next time)."""
+    lock = RequirementsLock(lock_file=str(Path(tmp_path).joinpath("l.json")))
+    platform = RecordingPlatform(failing=["six"])
+    failed = install_dependencies_delta(platform, lock, {"wheel", "six"})
+    assert failed == ["six"]
+    assert lock.load() == {"wheel"}
+    platform = RecordingPlatform()
+    install_dependencies_delta(platform, lock, {"six"})
+    assert platform.installed == ["six"]
+    assert platform.uninstalled == ["wheel"]
+    assert lock.load() == {"six"}
+
+
+def test_original_lines_installed(tmp_path):
+    """The lines for pip keep their markers and URLs as written."""
+    lock = RequirementsLock(lock_file=str(Path(tmp_path).joinpath("l.json")))
+    marker = 'numpy==1.26; platform_machine not in "arm64"'
+    url = 'pkg @ https://x/y.whl ; python_version>"3"'
+    platform = RecordingPlatform()
+    install_dependencies_delta(platform, lock, {marker, url})
+    assert sorted(platform.installed) == sorted([marker, url])
+    # The spacing doesn't matter for the lock
+    platform = RecordingPlatform()
+    install_dependencies_delta(
+        platform, lock,
+        {'numpy==1.26 ; platform_machine not in "arm64"', url})
+    assert platform.installed == []
+    assert platform.uninstalled == []
+
+
+def test_lock_removed_with_venv(environment_structure_designated):
+    """The lock is removed together with the venv."""
+    env_struct = environment_structure_designated[0]
+    env_struct.prepare_env_structure()
+    lock = RequirementsLock(
+        lock_file=env_struct.get_path_requirements_lock_file())
+    lock.save(["wheel"])
+    env_struct.remove_venv_folder()
+    assert not Path(lock.get_lock_file()).exists()
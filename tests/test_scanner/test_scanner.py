@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Tests for the single-pass tree scanner."""
+
+from pathlib import Path
+
+import pytest
+
+from starter.app_preparation_by_type.scanner import TreeScanner
+
+
+@pytest.fixture(scope="function")
+def app_tree(tmp_path):
+    """Prepare an app folder with some folders to prune."""
+    for item in ["main.py",
+                 "requirements.txt",
+                 "pkg/module.py",
+                 "pkg/data/config.toml",
+                 ".git/hooks/hook.py",
+                 "pkg/__pycache__/module.py",
+                 "node_modules/lib/lib.py",
+                 "nested_venv/pyvenv.cfg",
+                 "nested_venv/lib/site.py"]:
+        file = Path(tmp_path).joinpath(item)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text("# content")
+
+    yield tmp_path
+
+
+def test_scan_prunes_folders(app_tree):
+    """Pruned folders and nested venvs are skipped."""
+    scanner = TreeScanner(root_folder=str(app_tree))
+    assert sorted(scanner.get_files(["*.py"])) == \
+        ["main.py", "pkg/module.py"]
+
+
+def test_scan_patterns_and_root_only(app_tree):
+    """Several patterns at once and the root level only search."""
+    scanner = TreeScanner(root_folder=str(app_tree))
+    assert sorted(scanner.get_files(["*.py", "*.toml"])) == \
+        ["main.py", "pkg/data/config.toml", "pkg/module.py"]
+    assert scanner.get_paths(["*requirement*"], root_only=True) == \
+        [str(Path(app_tree).joinpath("requirements.txt"))]
+    assert list(scanner.get_files(["pkg/module.py"])) == ["pkg/module.py"]
+
+
+def test_scan_is_cached(app_tree):
+    """The tree is walked only once, until refreshed."""
+    scanner = TreeScanner(root_folder=str(app_tree))
+    scanner.scan()
+    Path(app_tree).joinpath("new.py").write_text("# content")
+    assert "new.py" not in scanner.get_files(["*.py"])
+    scanner.refresh()
+    assert "new.py" in scanner.get_files(["*.py"])
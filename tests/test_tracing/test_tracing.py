@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Tests for the tracing of the launch."""
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from starter.tracing import Tracer
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    """The spans of the disabled tracer are no-ops."""
+    tracer = Tracer()
+    with tracer.span("phase") as span:
+        assert span is None
+    assert tracer.get_report()["spans"] == []
+    assert not tracer.save(str(tmp_path))
+
+
+def test_nested_spans_saved(tmp_path):
+    """The nested spans are stored to the JSON trace."""
+    tracer = Tracer()
+    tracer.enable()
+    with tracer.span("root"):
+        with tracer.span("child", name="pip"):
+            pass
+        with pytest.raises(ValueError):
+            with tracer.span("failed"):
+                raise ValueError("broken")
+
+    def worker():
+        with tracer.span("worker"):
+            pass
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    trace_file = tracer.save(str(tmp_path))
+    with open(trace_file, "r", encoding="utf-8") as trace_in:
+        report = json.loads(trace_in.read())
+    root = report["spans"][0]
+    assert root["name"] == "root"
+    assert [child["name"] for child in root["children"]] == \
+        ["child", "failed"]
+    assert root["children"][0]["attributes"] == {"name": "pip"}
+    assert "broken" in root["children"][1]["error"]
+    assert root["duration_ms"] >= root["children"][0]["duration_ms"] >= 0
+    # The spans of other threads are roots
+    assert report["spans"][1]["attributes"]["thread"] == thread.name
+    assert Path(trace_file).parent == tmp_path
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Tests for the venv update planner."""
+
+import pytest
+
+from starter.app_preparation_by_type.change_set import ChangeSet
+from starter.app_preparation_by_type.layout_probe import AppLayoutProbe
+from starter.app_preparation_by_type.requirements_lock import (
+    RequirementsLock
+)
+from starter.app_preparation_by_type.update_planner import UpdatePlanner
+
+
+@pytest.fixture(scope="function")
+def update_planner(monkeypatch):
+    """Planner of a venv created with the current interpreter."""
+    planner = UpdatePlanner()
+    monkeypatch.setattr(planner, "interpreter_changed", lambda: False)
+
+    yield planner
+
+    del planner
+
+
+def test_plan_source_only_editable(update_planner):
+    """Source edits of an editable install - nothing to do."""
+    plan = update_planner.plan(ChangeSet(modified=["pkg/module.py"]))
+    assert not plan
+    assert plan.has_changes()
+
+
+def test_plan_source_only_not_editable(update_planner):
+    """Source edits of a non-editable install - reinstall the app."""
+    plan = update_planner.plan(
+        ChangeSet(modified=["app-0.1-py3-none-any.whl"]), editable=False)
+    assert plan.install_app
+    assert not plan.install_dependencies
+    assert not plan.rebuild
+
+
+def test_plan_new_package(update_planner):
+    """A new package - reinstall the app even if it's editable."""
+    plan = update_planner.plan(ChangeSet(added=["pkg/sub/__init__.py"]))
+    assert plan.install_app
+    assert not plan.rebuild
+
+
+def test_plan_package_roots(update_planner, tmp_path):
+    """Only the package roots of the probe need a reinstall."""
+    for package in ["pkg/sub", "new"]:
+        tmp_path.joinpath(package).mkdir(parents=True)
+        tmp_path.joinpath(package, "__init__.py").write_text("")
+    tmp_path.joinpath("pkg", "__init__.py").write_text("")
+    update_planner.layout_probe = AppLayoutProbe(app_path=str(tmp_path))
+
+    assert not update_planner.plan(ChangeSet(added=["pkg/sub/__init__.py"]))
+    assert update_planner.plan(
+        ChangeSet(added=["new/__init__.py"])).install_app
+    assert not update_planner.plan(
+        ChangeSet(removed=["pkg/old/__init__.py"]))
+    assert update_planner.plan(
+        ChangeSet(removed=["old/__init__.py"])).install_app
+
+
+def test_plan_requirements(update_planner):
+    """Requirement edits - install the dependencies only."""
+    plan = update_planner.plan(ChangeSet(modified=["requirements.txt"]))
+    assert plan.install_dependencies
+    assert not plan.install_app
+    assert not plan.rebuild
+
+
+def test_plan_build_metadata(update_planner):
+    """pyproject.toml edits - reinstall the app only."""
+    plan = update_planner.plan(ChangeSet(modified=["pyproject.toml"]))
+    assert plan.install_app
+    assert not plan.install_dependencies
+    assert not plan.rebuild
+
+
+def test_plan_rebuild():
+    """No venv or a different interpreter - full rebuild."""
+    planner = UpdatePlanner()
+    assert planner.plan(ChangeSet(), venv_ready=False).rebuild
+    assert planner.plan(ChangeSet(modified=["main.py"])).rebuild
+
+
+def test_plan_failed_requirements(update_planner, tmp_path):
+    """The requirements which failed to install last time are installed
+    again without any change of the app files."""
+    update_planner.requirements_lock = RequirementsLock(
+        lock_file=str(tmp_path.joinpath("requirements_lock.json")))
+    update_planner.requirements_lock.save(["six"])
+    plan = update_planner.plan(ChangeSet(), requirements=["six", "broken"])
+    assert plan.install_dependencies
+    assert not plan.install_app
+    assert not plan.rebuild
+    assert not update_planner.plan(ChangeSet(), requirements=["six"])
+    assert not update_planner.plan(ChangeSet())
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Tests for loading the existing venv."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from starter.context import ContextHandler
+from starter.use_existing_venv import VENV_FINGERPRINT, UseExistingVenv
+
+
+@pytest.fixture(scope="function")
+def existing_venv(tmp_path, monkeypatch):
+    """The context of a venv and the counted setup calls."""
+    env_dir = tmp_path.joinpath("venv")
+    bin_path = env_dir.joinpath("bin")
+    bin_path.mkdir(parents=True)
+    env_dir.joinpath("pyvenv.cfg").write_text("home = /usr/bin")
+    for name in ["python", "activate"]:
+        bin_path.joinpath(name).write_text(name)
+    context_file = tmp_path.joinpath("context.json")
+    context_file.write_text(json.dumps({
+        "env_dir": str(env_dir),
+        "bin_path": str(bin_path),
+        "env_exe": str(bin_path.joinpath("python"))}))
+    calls = []
+    monkeypatch.setattr(UseExistingVenv, "setup_python",
+                        lambda self, context: calls.append("python"))
+    monkeypatch.setattr(UseExistingVenv, "setup_scripts",
+                        lambda self, context: calls.append("scripts"))
+
+    yield (ContextHandler(context_file=str(context_file)), bin_path, calls)
+
+
+def test_unchanged_venv_skips_setup(existing_venv):
+    """The setup runs only once for the unchanged venv."""
+    context_handler, _, calls = existing_venv
+    UseExistingVenv(context_handler=context_handler).create()
+    assert calls == ["python", "scripts"]
+    assert context_handler.get_value_for_key(VENV_FINGERPRINT)
+    UseExistingVenv(context_handler=context_handler).create()
+    assert calls == ["python", "scripts"]
+
+
+def test_changed_venv_runs_setup(existing_venv):
+    """A modified, removed or added interpreter/script breaks the
+    fingerprint."""
+    context_handler, bin_path, calls = existing_venv
+    UseExistingVenv(context_handler=context_handler).create()
+    # Modified
+    stat = os.stat(bin_path.joinpath("activate"))
+    os.utime(bin_path.joinpath("activate"),
+             ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    UseExistingVenv(context_handler=context_handler).create()
+    assert len(calls) == 4
+    # Removed
+    Path(bin_path.joinpath("python")).unlink()
+    UseExistingVenv(context_handler=context_handler).create()
+    assert len(calls) == 6
+    # Added
+    bin_path.joinpath("python").write_text("python")
+    UseExistingVenv(context_handler=context_handler).create()
+    assert len(calls) == 8
+    UseExistingVenv(context_handler=context_handler).create()
+    assert len(calls) == 8
+
+
+def test_installed_scripts_ignored(existing_venv):
+    """The scripts of the installed dependencies don't break the
+    fingerprint."""
+    context_handler, bin_path, calls = existing_venv
+    UseExistingVenv(context_handler=context_handler).create()
+    bin_path.joinpath("maginician.py").write_text("maginician")
+    bin_path.joinpath("console-script").write_text("console-script")
+    UseExistingVenv(context_handler=context_handler).create()
+    assert calls == ["python", "scripts"]
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Tests for reading the metadata of the venv."""
+
+import sys
+from pathlib import Path
+
+from starter import maginician
+from starter.context import ContextHandler
+from starter.venv_metadata import (
+    get_site_packages_folders,
+    get_unsatisfied_requirements,
+    requirement_is_satisfied,
+    store_site_packages
+)
+
+
+def test_requirement_is_satisfied():
+    """Only '==' and '>=' of the plain releases are compared."""
+    installed = {"wheel": "0.45.1", "zope-interface": "6.0rc1",
+                 "six": "1.0.post1", "idna": "1"}
+    assert requirement_is_satisfied("wheel", installed)
+    assert requirement_is_satisfied("Wheel>=0.40", installed)
+    assert requirement_is_satisfied("wheel==0.45.1.0", installed)
+    assert requirement_is_satisfied("wheel>=0.40,==0.45.1", installed)
+    assert requirement_is_satisfied("wheel==0.45", installed) is False
+    assert requirement_is_satisfied("wheel>=0.46", installed) is False
+    # Checked by pip's rules
+    assert requirement_is_satisfied("wheel==0.45.*", installed) is None
+    assert requirement_is_satisfied("wheel>=0.40,<1.0", installed) is None
+    assert requirement_is_satisfied("six>1.0", installed) is None
+    assert requirement_is_satisfied("six>=1.0", installed) is None
+    assert requirement_is_satisfied("zope.interface<6.0", installed) is None
+    assert requirement_is_satisfied("idna==1.0.*", installed) is None
+    assert requirement_is_satisfied(
+        "wheel; python_version>'3.8'", installed) is None
+    # Left to pip
+    assert requirement_is_satisfied("pytest", installed) is False
+    assert requirement_is_satisfied("wheel[extra]", installed) is False
+    assert requirement_is_satisfied("-r other.txt", installed) is False
+
+
+def test_get_unsatisfied_requirements(tmp_path):
+    """The dist-info folders of the venv are read, the rest is checked by
+    pip's rules."""
+    site_packages = Path(tmp_path).joinpath(
+        "lib", "python3.12", "site-packages")
+    site_packages.joinpath("wheel-0.45.1.dist-info").mkdir(parents=True)
+    site_packages.joinpath("six-1.0.post1.dist-info").mkdir(parents=True)
+    site_packages.joinpath("idna-1.dist-info").mkdir(parents=True)
+    site_packages.joinpath("attrs-1.0rc1.dist-info").mkdir(parents=True)
+    requirements = ["wheel>=0.40", "six", "wheel<0.40", "six>1.0",
+                    "attrs<1.0", "idna==1.0.*"]
+    checked = []
+
+    def check_requirements(undecided):
+        checked.extend(undecided)
+        return ["wheel<0.40", "idna==1.0.*"]
+
+    # Not checked, left to pip
+    assert get_unsatisfied_requirements(requirements, str(tmp_path)) == \
+        ["wheel<0.40", "six>1.0", "attrs<1.0", "idna==1.0.*"]
+    assert get_unsatisfied_requirements(
+        requirements, str(tmp_path), None, check_requirements) == \
+        ["wheel<0.40", "idna==1.0.*"]
+    assert checked == ["wheel<0.40", "six>1.0", "attrs<1.0", "idna==1.0.*"]
+
+
+def test_pip_rules(monkeypatch):
+    """The post and pre releases and the prefixes follow pip's rules."""
+    monkeypatch.setattr(maginician, "installed_distributions", lambda: {
+        "six": "1.0.post1", "attrs": "1.0rc1", "idna": "1"})
+    # 1 == 1.0(zero padding)
+    assert maginician.unsatisfied_requirements(
+        ["six>1.0", "attrs<1.0", "idna==1.0.*", "idna==1.1.*",
+         "six>=1.0"]) == ["six>1.0", "attrs<1.0", "idna==1.1.*"]
+
+
+def test_site_packages_from_context(tmp_path):
+    """The site-packages queried from the interpreter are used."""
+    context_file = tmp_path.joinpath("context.json")
+    context_file.write_text('{"env_dir": "%s"}' % tmp_path.as_posix())
+    context_handler = ContextHandler(context_file=str(context_file))
+    assert store_site_packages(context_handler, sys.executable)
+    purelib = context_handler.get_value_for_key("purelib")
+    site_packages = Path(tmp_path).joinpath(purelib)
+    site_packages.mkdir(parents=True)
+    # Not used, the stored folder exists
+    Path(tmp_path).joinpath("Lib", "site-packages").mkdir(parents=True)
+
+    assert not Path(purelib).is_absolute()
+    assert get_site_packages_folders(str(tmp_path), context_handler) == \
+        [site_packages]
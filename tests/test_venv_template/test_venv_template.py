@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Tests for the template venv."""
+
+import json
+import os
+from pathlib import Path
+
+from starter import venv_template
+from starter.venv_template import VenvTemplate, get_template_key
+
+
+def test_clone(context_handler, tmp_path):
+    """The files are hardlinked, the paths of the scripts rewritten."""
+    template = VenvTemplate(templates_folder=str(tmp_path.joinpath("t")),
+                            key="key")
+    template.prepare()
+    venv = template.get_venv_folder()
+    venv.joinpath("bin").mkdir(parents=True)
+    venv.joinpath("bin", "pip").write_text("#!%s/bin/python\n" % venv)
+    site_packages = venv.joinpath("lib", "site-packages")
+    site_packages.mkdir(parents=True)
+    site_packages.joinpath("module.py").write_text("print('hello')")
+    template.get_context_file().write_text(json.dumps(
+        {"env_dir": str(venv), "bin_path": str(venv.joinpath("bin"))}))
+    template.mark_ready()
+    assert template.is_ready()
+
+    target = tmp_path.joinpath("app_venv")
+    template.clone(str(target), context_handler)
+    assert target.joinpath("bin", "pip").read_text() == \
+        "#!%s/bin/python\n" % target
+    assert os.path.samefile(
+        site_packages.joinpath("module.py"),
+        target.joinpath("lib", "site-packages", "module.py"))
+    assert context_handler.get_value_for_key("env_dir") == str(target)
+    assert Path(context_handler.get_value_for_key("bin_path")) == \
+        target.joinpath("bin")
+
+
+def test_template_key_follows_build(tmp_path, monkeypatch):
+    """An upgrade of the Starter at the same path changes the key."""
+    starter_folder = tmp_path.joinpath("app_starter", "_internal", "starter")
+    starter_folder.mkdir(parents=True)
+    maginician = starter_folder.joinpath("maginician.py")
+    maginician.write_text("PIP_DATA = b'1'")
+    monkeypatch.setattr(venv_template, "STARTER_FOLDER", starter_folder)
+    key = get_template_key()
+    assert get_template_key() == key
+    maginician.write_text("PIP_DATA = b'22'")
+    assert get_template_key() != key
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Tests for the parallel build of the wheels."""
+
+import threading
+import time
+from pathlib import Path
+
+from starter.app_preparation_by_type.wheel_builder import WheelBuilder
+
+
+class BuildingPlatform():
+    """Platform handler 'building' the wheels concurrently."""
+    def __init__(self):
+        self.built = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def build_wheel(self, requirement, wheelhouse_folder):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+            self.built.append(requirement)
+        return requirement != "broken"
+
+
+def test_get_missing(tmp_path):
+    """Only the requirements without a matching wheel are built."""
+    Path(tmp_path).joinpath("six-1.16.0-py2.py3-none-any.whl").write_text("")
+    builder = WheelBuilder(wheelhouse_folder=str(tmp_path))
+    assert builder.get_missing(
+        ["six", "Six==1.16.0", "six==1.17.0", "wheel", "-r other.txt"]) == \
+        ["six==1.17.0", "wheel"]
+
+
+def test_build_parallel(tmp_path):
+    """The builds run concurrently, bounded by the workers."""
+    platform = BuildingPlatform()
+    builder = WheelBuilder(platform_handler=platform,
+                           wheelhouse_folder=str(tmp_path),
+                           max_workers=2)
+    failed = builder.build(["a", "b", "c", "broken"])
+    assert failed == ["broken"]
+    assert sorted(platform.built) == ["a", "b", "broken", "c"]
+    assert platform.max_running == 2
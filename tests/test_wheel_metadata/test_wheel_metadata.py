@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Tests for the metadata of the wheel app."""
+
+import zipfile
+
+import pytest
+
+from starter.app_preparation_by_type.requirements_lock import (
+    RequirementsLock
+)
+from starter.app_preparation_by_type.update_planner import UpdatePlan
+from starter.app_preparation_by_type.wheel import WheelProcessing
+from starter.app_preparation_by_type.wheel_metadata import (
+    read_installed_metadata,
+    read_wheel_metadata
+)
+
+DIST_INFO = "demo_app-1.0.dist-info"
+METADATA = ("Metadata-Version: 2.1\nName: demo-app\nVersion: 1.0\n"
+            "Requires-Dist: six>=1.0\n"
+            "Requires-Dist: pytest; extra == \"test\"\n\nAbout\n")
+ENTRY_POINTS = "[console_scripts]\nDemo-Run = demo_app.cli:main\n"
+RECORD = ("demo_app/__init__.py,,\n"
+          "demo_app/cli.py,,\n"
+          "demo_app/__pycache__/cli.cpython-311.pyc,,\n"
+          "helper.py,,\n"
+          "../../../bin/Demo-Run,,\n" +
+          DIST_INFO + "/METADATA,,\n" +
+          DIST_INFO + "/RECORD,,\n")
+
+
+class RecordingPlatform():
+    """Records the installs."""
+    def __init__(self):
+        self.installed_apps = []
+        self.installed_dependencies = []
+
+    def install_app(self, cwd, app_args):
+        self.installed_apps.append(app_args)
+
+    def install_dependencies(self, dependencies):
+        self.installed_dependencies.append(sorted(dependencies))
+        return []
+
+    def uninstall_dependencies(self, dependencies):
+        pass
+
+    def get_unsatisfied_dependencies(self, dependencies):
+        return list(dependencies)
+
+
+def write_wheel(wheel_file):
+    """Write the wheel of the demo app."""
+    with zipfile.ZipFile(wheel_file, "w") as wheel:
+        wheel.writestr("demo_app/__init__.py", "")
+        wheel.writestr(DIST_INFO + "/METADATA", METADATA)
+        wheel.writestr(DIST_INFO + "/entry_points.txt", ENTRY_POINTS)
+        wheel.writestr(DIST_INFO + "/RECORD", RECORD)
+
+
+@pytest.fixture(scope="function")
+def venv(tmp_path):
+    """The venv with the installed app."""
+    site_packages = tmp_path.joinpath(
+        "venv", "lib", "python3.11", "site-packages")
+    dist_info = site_packages.joinpath(DIST_INFO)
+    dist_info.mkdir(parents=True)
+    dist_info.joinpath("METADATA").write_text(METADATA)
+    dist_info.joinpath("entry_points.txt").write_text(ENTRY_POINTS)
+    dist_info.joinpath("RECORD").write_text(RECORD)
+    site_packages.joinpath("demo_app").mkdir()
+    bin_folder = tmp_path.joinpath("venv", "bin")
+    bin_folder.mkdir()
+    bin_folder.joinpath("Demo-Run").write_text("#!python\n")
+
+    yield site_packages
+
+
+def test_wheel_metadata_from_zip(tmp_path):
+    """The metadata is read from the wheel without installing it."""
+    wheel_file = tmp_path.joinpath("demo_app-1.0-py3-none-any.whl")
+    write_wheel(wheel_file)
+
+    metadata = read_wheel_metadata(str(wheel_file))
+
+    assert (metadata.name, metadata.version) == ("demo-app", "1.0")
+    assert metadata.requires_dist == ["six>=1.0"]
+    assert metadata.console_scripts == {"Demo-Run": "demo_app.cli:main"}
+    assert metadata.top_level == ["demo_app", "helper.py"]
+
+
+def test_not_a_wheel(tmp_path):
+    """The broken wheel has no metadata."""
+    wheel_file = tmp_path.joinpath("broken-1.0-py3-none-any.whl")
+    wheel_file.write_text("not a zip")
+
+    assert read_wheel_metadata(str(wheel_file)) is None
+
+
+def test_installed_metadata(venv):
+    """The installed location and the console script are found."""
+    metadata, site_packages = read_installed_metadata(
+        [str(venv)], "Demo_App")
+
+    assert site_packages == str(venv)
+    assert metadata.get_package_folder(site_packages) == \
+        str(venv.joinpath("demo_app"))
+    assert metadata.get_console_script("Demo-Run", site_packages) == \
+        str(venv.parents[2].joinpath("bin", "Demo-Run"))
+
+
+def test_not_installed(venv):
+    """The missing distribution has no metadata."""
+    assert read_installed_metadata([str(venv)], "other") == (None, None)
+
+
+def test_wheel_reinstalled_once(tmp_path, config_handler):
+    """The incremental update reinstalls the wheel by a single pip run."""
+    app_folder = tmp_path.joinpath("wheel_app")
+    app_folder.mkdir()
+    wheel_file = app_folder.joinpath("demo_app-1.0-py3-none-any.whl")
+    write_wheel(wheel_file)
+    platform = RecordingPlatform()
+    processing = WheelProcessing(
+        app_path=str(app_folder),
+        config_handler=config_handler,
+        platform_handler=platform,
+        requirements_lock=RequirementsLock(
+            lock_file=str(tmp_path.joinpath("lock.json"))))
+
+    processing.install_and_start(
+        update_plan=UpdatePlan(install_app=True))
+
+    assert platform.installed_apps == [
+        ["-m", "pip", "install", "--force-reinstall", "--no-deps",
+         str(wheel_file)]]
+    # The dependencies of the wheel are installed as the delta
+    assert platform.installed_dependencies == [["six>=1.0"]]